@@ -6,10 +6,11 @@ Main Flask backend application
 Connects frontend to smart contract
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
+import time
 
 # Load environment variables
 load_dotenv()
@@ -17,28 +18,68 @@ load_dotenv()
 # Create Flask app
 app = Flask(__name__)
 
+# Frontends allowed to call the API (also used by the ASGI app in asgi.py)
+CORS_ORIGINS = [
+    "http://localhost:8000",
+    "http://localhost:5000",
+    "http://localhost:3000"
+]
+
 # Enable CORS - allow frontend to make requests
 CORS(app, resources={
     r"/api/*": {
-        "origins": [
-            "http://localhost:8000",
-            "http://localhost:5000",
-            "http://localhost:3000"
-        ],
+        "origins": CORS_ORIGINS,
         "methods": ["GET", "POST", "OPTIONS"],
         "allow_headers": ["Content-Type"]
     }
 })
 
+from backend.database.links import cache_stats
+from backend.utils import metrics
+from backend.utils.contract_stats import CLIENT_MAX_AGE, contract_stats
+
 # Import routes
 from backend.routes.create_link import create_link_bp
 from backend.routes.pay import pay_bp
 from backend.routes.verify import verify_bp
+from backend.routes.events import events_bp
+from backend.routes.analytics import analytics_bp
+from backend.routes.links import links_bp
 
 # Register blueprints
 app.register_blueprint(create_link_bp)
 app.register_blueprint(pay_bp)
 app.register_blueprint(verify_bp)
+app.register_blueprint(events_bp)
+app.register_blueprint(analytics_bp)
+app.register_blueprint(links_bp)
+
+
+@app.before_request
+def start_timer():
+    """Record when the request started (for /metrics)"""
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_latency(response):
+    """Add the request to the per-blueprint/route latency histogram"""
+    started = g.get('request_started')
+    if started is not None:
+        rule = request.url_rule
+        metrics.http_histogram(
+            request.blueprint or 'app',
+            rule.rule if rule is not None else 'unmatched',
+            request.method,
+            response.status_code
+        ).observe(time.perf_counter() - started)
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Latency histograms, cache hit rates and algod health in Prometheus format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 
 @app.route('/health', methods=['GET'])
@@ -47,22 +88,24 @@ def health_check():
     return jsonify({
         'status': 'ok',
         'service': 'Instant Checkout Link Backend',
-        'version': '1.0'
+        'version': '1.0',
+        'link_cache': cache_stats()
     }), 200
 
 
 @app.route('/api/contract-stats', methods=['GET'])
 def get_contract_stats():
-    """Get contract statistics from blockchain"""
+    """Get contract statistics from blockchain (cached, refreshed once per round)"""
     try:
-        # For now, return mock data
-        # Later: Connect to smart contract client
-        return jsonify({
-            'success': True,
-            'total_algo_received': 0,
-            'total_payments_processed': 0,
-            'contract_version': '1.0'
-        }), 200
+        snapshot = contract_stats.get()
+        if request.if_none_match.contains(snapshot.etag):
+            response = Response(status=304)
+        else:
+            response = Response(snapshot.body, mimetype='application/json')
+        response.set_etag(snapshot.etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = CLIENT_MAX_AGE
+        return response
     except Exception as e:
         return jsonify({
             'success': False,
@@ -0,0 +1,377 @@
+# ============================================
+# FILE: backend/asgi.py
+# ============================================
+"""
+ASGI entry point for high-concurrency verify and pay traffic
+
+Serves the same endpoints and JSON as backend/app.py, but one process
+can hold thousands of open requests instead of one per worker thread:
+  - GET /api/verify, GET /api/pay/<link_id> and the SSE/long-poll
+    GET /api/links/<link_id>/events run as coroutines on the event
+    loop; link lookups that miss the cache go through the async link
+    API (database/async_links.py)
+  - the confirmation watcher and the suggested-params refresher follow
+    rounds as asyncio tasks using AsyncAlgodClient, not threads
+  - every other route is handed to the Flask app on a thread pool
+
+Run with any ASGI server, e.g.
+    uvicorn backend.asgi:app --workers 2
+"""
+
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from backend.app import CORS_ORIGINS, app as flask_app
+from backend.database import async_links, links
+from backend.routes.events import (
+    LONG_POLL_MAX_TIMEOUT, LONG_POLL_TIMEOUT, SSE_HEARTBEAT, SSE_MAX_SECONDS
+)
+from backend.routes.pay import check_sender, payment_response
+from backend.routes.verify import WATCHER_FULL, check_txid, verify_response
+from backend.utils import metrics
+from backend.utils.algorand import params_cache
+from backend.utils.async_algod import get_async_algod_client
+from backend.utils.link_events import (
+    SSE_KEEPALIVE, TERMINAL_STATUSES, hub, sse_message, status_event, wants_event_stream
+)
+from backend.utils.tx_watcher import WatcherFullError, watcher
+
+# Threads running Flask views for routes without a native handler
+WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', 16))
+
+# Bridged response bodies are forwarded in pieces of about this size
+_STREAM_CHUNK = 64 * 1024
+
+_wsgi_executor = ThreadPoolExecutor(max_workers=WSGI_THREADS, thread_name_prefix='asgi-wsgi')
+
+_background = []
+
+
+def _start_background():
+    """Run the watcher and params refresher as tasks on this event loop"""
+    if _background:
+        return
+    client = get_async_algod_client()
+    _background.append(watcher.start_async(client))
+    _background.append(params_cache.start_async(client))
+
+
+# ---------- native handlers: (scope, query) -> (body, status) ----------
+
+async def _verify(scope, query):
+    txid = query.get('txid')
+    link_id = query.get('link_id')
+
+    error = check_txid(txid) or await _register(txid, link_id)
+    if error:
+        return error
+    return verify_response(txid, watcher.lookup(txid), get_async_algod_client().breaker)
+
+
+async def _register(txid: str, link_id: str):
+    """Hand txid to the watcher; (body, status) if it is full, else None"""
+    result = watcher.lookup(txid)
+    try:
+        if link_id and result is not None and result['status'] == 'confirmed':
+            # register() marks the link confirmed, which writes to the store
+            await async_links.run_blocking(watcher.register, txid, link_id)
+        else:
+            watcher.register(txid, link_id)
+    except WatcherFullError:
+        return WATCHER_FULL
+    return None
+
+
+async def _pay(scope, query, link_id):
+    try:
+        sender_address = query.get('user_address')
+
+        error = check_sender(sender_address)
+        if error:
+            return error
+
+        link_data = await async_links.get_link_for_payment(link_id)
+        if link_data and params_cache.stale:
+            # Building the transaction would wait on algod for fresh params
+            return await async_links.run_blocking(payment_response, link_id,
+                                                  sender_address, link_data)
+        return payment_response(link_id, sender_address, link_data)
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': f'Failed to get payment details: {str(e)}'
+        }, 500
+
+
+async def _events(scope, query, link_id):
+    """
+    Same as routes/events.py, but a waiting browser costs a queue, not a thread
+
+    Returns (body, status) for long-polls, or (async generator, 200) for SSE.
+    """
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+
+    def deliver(event):
+        loop.call_soon_threadsafe(events.put_nowait, event)
+
+    # Watch before reading the link so no change can slip in between
+    hub.watch(link_id, deliver)
+    streaming = False
+    try:
+        link = await async_links.get_link(link_id)
+
+        if not link:
+            return {
+                'success': False,
+                'error': 'Checkout link not found'
+            }, 404
+
+        if query.get('txid'):
+            error = check_txid(query['txid']) or await _register(query['txid'], link_id)
+            if error:
+                return error
+
+        current = status_event(link_id, link['status'], link.get('txid'))
+
+        accept = dict(scope['headers']).get(b'accept', b'').decode('latin-1')
+        if wants_event_stream(accept, query.get('mode')):
+            streaming = True
+            return _sse(link_id, events, deliver, current), 200
+
+        since = query.get('since')
+        try:
+            timeout = min(float(query.get('timeout', LONG_POLL_TIMEOUT)), LONG_POLL_MAX_TIMEOUT)
+        except ValueError:
+            return {
+                'success': False,
+                'error': 'timeout must be a number of seconds'
+            }, 400
+
+        if since is None or since != current['status'] or current['status'] in TERMINAL_STATUSES:
+            changed = since is not None and since != current['status']
+            return {'success': True, 'changed': changed, **current}, 200
+
+        try:
+            event = await asyncio.wait_for(events.get(), max(0.0, timeout))
+        except asyncio.TimeoutError:
+            return {'success': True, 'changed': False, **current}, 200
+        return {'success': True, 'changed': event['status'] != since, **event}, 200
+
+    finally:
+        if not streaming:
+            hub.unwatch(link_id, deliver)
+
+
+async def _sse(link_id: str, events, deliver, current: dict):
+    try:
+        yield sse_message(current)
+        if current['status'] in TERMINAL_STATUSES:
+            return
+
+        deadline = time.monotonic() + SSE_MAX_SECONDS
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                event = await asyncio.wait_for(events.get(), min(SSE_HEARTBEAT, remaining))
+            except asyncio.TimeoutError:
+                yield SSE_KEEPALIVE
+                continue
+            yield sse_message(event)
+            if event['status'] in TERMINAL_STATUSES:
+                return
+    finally:
+        hub.unwatch(link_id, deliver)
+
+
+async def _send_stream(send, scope, stream):
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', b'text/event-stream; charset=utf-8'),
+                    (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no')] + _cors_headers(scope)
+    })
+    try:
+        async for message in stream:
+            await send({'type': 'http.response.body', 'body': message.encode(), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        # Client gone: send() raised, stop watching the link
+        await stream.aclose()
+
+
+def _route(method: str, path: str):
+    """(blueprint, rule, handler, args) for natively served requests, else None"""
+    if method != 'GET':
+        return None
+    if path == '/api/verify':
+        return 'verify', '/api/verify', _verify, ()
+    if path.startswith('/api/links/') and path.endswith('/events'):
+        link_id = path[len('/api/links/'):-len('/events')]
+        if link_id and '/' not in link_id:
+            return 'events', '/api/links/<link_id>/events', _events, (link_id,)
+    if path.startswith('/api/pay/'):
+        link_id = path[len('/api/pay/'):]
+        if link_id and '/' not in link_id:
+            return 'pay', '/api/pay/<link_id>', _pay, (link_id,)
+    return None
+
+
+def _cors_headers(scope) -> list:
+    """Same Access-Control headers Flask-CORS adds for /api/* routes"""
+    for name, value in scope['headers']:
+        if name == b'origin':
+            if value.decode('latin-1') in CORS_ORIGINS:
+                return [(b'access-control-allow-origin', value), (b'vary', b'Origin')]
+            break
+    return [(b'vary', b'Origin')]
+
+
+async def _send_json(send, scope, body, status: int):
+    # Matches flask.jsonify output outside debug mode
+    payload = (json.dumps(body, sort_keys=True, separators=(',', ':')) + '\n').encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(payload)).encode())] + _cors_headers(scope)
+    })
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+# ---------- Flask bridge ----------
+
+def _wsgi_environ(scope, body: bytes) -> dict:
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': 'HTTP/' + scope.get('http_version', '1.1'),
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = 'HTTP_' + name
+        value = value.decode('latin-1')
+        environ[name] = environ[name] + ',' + value if name in environ else value
+    # The body has been read in full, whether or not it came chunked
+    environ['CONTENT_LENGTH'] = str(len(body))
+    return environ
+
+
+def _wsgi_start(environ: dict):
+    """Call the Flask app; returns (status, headers, result, first chunk, iterator)"""
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1'))
+                              for k, v in headers]
+
+    result = flask_app(environ, start_response)
+    iterator = iter(result)
+    first = next(iterator, b'')
+    return started['status'], started['headers'], result, first, iterator
+
+
+def _wsgi_read(iterator) -> bytes:
+    chunks, size = [], 0
+    for chunk in iterator:
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= _STREAM_CHUNK:
+            break
+    return b''.join(chunks)
+
+
+async def _bridge(scope, receive, send):
+    body = []
+    while True:
+        message = await receive()
+        body.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+
+    loop = asyncio.get_running_loop()
+    environ = _wsgi_environ(scope, b''.join(body))
+    status, headers, result, chunk, iterator = await loop.run_in_executor(
+        _wsgi_executor, _wsgi_start, environ)
+    try:
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        while chunk:
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            # Streamed responses (bulk create) are generated off the loop too
+            chunk = await loop.run_in_executor(_wsgi_executor, _wsgi_read, iterator)
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        if hasattr(result, 'close'):
+            await loop.run_in_executor(_wsgi_executor, result.close)
+
+
+# ---------- ASGI callable ----------
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            _start_background()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            watcher.stop()
+            params_cache.stop()
+            for task in _background:
+                task.cancel()
+            links.flush_click_counts()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    # Servers without lifespan support: start on the first request
+    _start_background()
+
+    route = _route(scope['method'], scope['path'])
+    if route is None:
+        return await _bridge(scope, receive, send)
+
+    blueprint, rule, handler, args = route
+    started = time.perf_counter()
+    query = {k: v[0] for k, v in parse_qs(scope['query_string'].decode('latin-1')).items()}
+    try:
+        body, status = await handler(scope, query, *args)
+    except Exception as e:
+        body, status = {'success': False, 'error': str(e)}, 500
+    if isinstance(body, dict):
+        await _send_json(send, scope, body, status)
+    metrics.http_histogram(blueprint, rule, scope['method'], status).observe(
+        time.perf_counter() - started)
+    if not isinstance(body, dict):
+        await _send_stream(send, scope, body)
@@ -0,0 +1,411 @@
+# ============================================
+# FILE: backend/database/analytics.py
+# ============================================
+"""
+Precomputed rollups for merchant analytics
+
+Counts of links created, clicks and confirmed payments, and confirmed
+volume, are kept per receiver and for everyone, both as running totals
+and in hourly and daily buckets, so queries read a handful of rows
+instead of scanning every link.
+
+The rollups are a SQLite table (in the SQLite link store, or in a file
+next to the log; see links.ANALYTICS_FILE) shared by every process that
+writes links: links.py feeds each process's changes in from its change
+hook, and they are added to the stored counters in one transaction
+every FLUSH_INTERVAL seconds. Queries see other processes' changes once
+those flush.
+
+The first flush against an empty table backfills it once from the store
+and the cold archive, inside that same write transaction, and records
+the moment its scan finished: links created and payments confirmed
+before then are counted from the records, later ones from the change
+hook. A record stamped shortly before the scan may only be written after
+it, so the ids counted from the last BACKFILL_OVERLAP seconds are kept
+and the hook's changes from that window are counted unless the backfill
+already had them. Clicks made before the backfill have no timestamp of
+their own and are counted in their link's creation bucket.
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+# How many hourly and daily buckets are kept per series
+HOURLY_RETENTION = int(os.getenv('ANALYTICS_HOURLY_RETENTION', 24 * 31))
+DAILY_RETENTION = int(os.getenv('ANALYTICS_DAILY_RETENTION', 366 * 2))
+
+# Seconds a change waits in memory before it is added to the stored rollups
+FLUSH_INTERVAL = float(os.getenv('ANALYTICS_FLUSH_INTERVAL', 1.0))
+
+# Seconds before the backfill within which a record's timestamp may
+# precede its write; changes stamped in this window are matched by link_id
+BACKFILL_OVERLAP = float(os.getenv('ANALYTICS_BACKFILL_OVERLAP', 300))
+
+HOUR = 3600
+DAY = 86400
+
+# Bucket size of the running totals (stored with start 0)
+TOTAL = 0
+
+# Receiver of the rollups covering everyone
+EVERYONE = ''
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analytics_rollups (
+    receiver  TEXT NOT NULL,
+    size      INTEGER NOT NULL,
+    start     INTEGER NOT NULL,
+    links     INTEGER NOT NULL DEFAULT 0,
+    clicks    INTEGER NOT NULL DEFAULT 0,
+    confirmed INTEGER NOT NULL DEFAULT 0,
+    volume    INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (receiver, size, start)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_analytics_rollups_age ON analytics_rollups (size, start);
+CREATE TABLE IF NOT EXISTS analytics_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analytics_backfilled (
+    field   TEXT NOT NULL,
+    link_id TEXT NOT NULL,
+    PRIMARY KEY (field, link_id)
+) WITHOUT ROWID;
+"""
+
+_ADD = ("INSERT INTO analytics_rollups (receiver, size, start, links, clicks, confirmed, volume) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (receiver, size, start) DO UPDATE SET "
+        "links = links + excluded.links, clicks = clicks + excluded.clicks, "
+        "confirmed = confirmed + excluded.confirmed, volume = volume + excluded.volume")
+_PRUNE = 'DELETE FROM analytics_rollups WHERE size = ? AND start < ?'
+_SELECT_ONE = ('SELECT links, clicks, confirmed, volume FROM analytics_rollups '
+               'WHERE receiver = ? AND size = ? AND start = ?')
+_SELECT_RANGE = ('SELECT start, links, clicks, confirmed, volume FROM analytics_rollups '
+                 'WHERE receiver = ? AND size = ? AND start BETWEEN ? AND ? ORDER BY start')
+_GET_META = 'SELECT value FROM analytics_meta WHERE key = ?'
+_SET_META = 'INSERT OR REPLACE INTO analytics_meta (key, value) VALUES (?, ?)'
+_ADD_BACKFILLED = 'INSERT OR IGNORE INTO analytics_backfilled (field, link_id) VALUES (?, ?)'
+_GET_BACKFILLED = 'SELECT 1 FROM analytics_backfilled WHERE field = ? AND link_id = ?'
+
+# Counted fields, in column order; volume is added alongside
+_FIELDS = ('links', 'clicks', 'confirmed')
+
+
+class Counts:
+    __slots__ = ('links', 'clicks', 'confirmed', 'volume')
+
+    def __init__(self, links: int = 0, clicks: int = 0, confirmed: int = 0, volume: int = 0):
+        self.links = links
+        self.clicks = clicks
+        self.confirmed = confirmed
+        self.volume = volume     # microAlgos, confirmed payments only
+
+    def to_dict(self) -> dict:
+        return {
+            'links': self.links,
+            'clicks': self.clicks,
+            'confirmed': self.confirmed,
+            'conversion': self.confirmed / self.clicks if self.clicks else 0.0,
+            'volume_algo': self.volume / 1_000_000
+        }
+
+
+def _timestamp(value) -> float:
+    """Seconds since the epoch for an isoformat string (local time, like 'created')"""
+    if not value:
+        return datetime.now().timestamp()
+    return datetime.fromisoformat(value).timestamp()
+
+
+# size -> (start, end) of the bucket most recently computed; nearly every
+# event lands in the current hour/day, so the datetime math is skipped
+_last_bucket = {HOUR: (0, 0), DAY: (0, 0)}
+
+
+def _bucket_start(ts: float, size: int) -> int:
+    start, end = _last_bucket[size]
+    if start <= ts < end:
+        return start
+
+    # Local-time buckets so a "day" matches the dates shown in 'created'
+    local = datetime.fromtimestamp(ts)
+    if size == DAY:
+        first = local.replace(hour=0, minute=0, second=0, microsecond=0)
+        following = first + timedelta(days=1)
+    else:
+        first = local.replace(minute=0, second=0, microsecond=0)
+        following = first + timedelta(hours=1)
+    start = int(first.timestamp())
+    _last_bucket[size] = (start, int(following.timestamp()))
+    return start
+
+
+def _all_links():
+    # Imported here: links.py imports this module to subscribe the rollups
+    from backend.database.links import list_links
+    return list_links(include_archived=True).items()
+
+
+class AnalyticsRollups:
+    """Totals plus hourly and daily buckets, per receiver and overall, in SQLite"""
+
+    def __init__(self, path: str = None, source=_all_links,
+                 hourly_retention: int = HOURLY_RETENTION,
+                 daily_retention: int = DAILY_RETENTION,
+                 flush_interval: float = FLUSH_INTERVAL):
+        """
+        Args:
+            path: SQLite file holding the rollups; None reads it from
+                links.ANALYTICS_FILE on first use
+            source: Returns every (link_id, record) pair, for the one-time backfill
+            hourly_retention, daily_retention: Buckets kept per series
+            flush_interval: Max seconds a change waits before it is stored
+        """
+        self.path = path
+        self._source = source
+        self.retention = {HOUR: hourly_retention, DAY: daily_retention}
+        self.flush_interval = flush_interval
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._events = []           # (receiver, ts, field, value, volume, link_id) not yet stored
+        self._backfilled_at = None  # known once this process has seen the marker
+        self._pruned = {}           # size -> newest bucket start pruned for
+
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if self.path is None:
+                from backend.database.links import ANALYTICS_FILE
+                self.path = ANALYTICS_FILE
+            # Autocommit mode; flushes open their own IMMEDIATE transaction
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=30000')
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ---------- updates ----------
+
+    def on_link_change(self, event: str, link_id: str, fields):
+        """
+        links.subscribe() callback; only queues the change in memory
+
+        'clicked' and 'updated' events carry the link's receiver (and
+        amount_micro), so no link is read here.
+        """
+        if event == 'created':
+            queued = [(fields['receiver'], _timestamp(fields['created']), 'links', 1, 0, link_id)]
+        elif event == 'clicked' and fields:
+            queued = [(fields['receiver'], time.time(), 'clicks', 1, 0, link_id)]
+        elif event == 'updated' and fields.get('status') == 'confirmed' and 'receiver' in fields:
+            queued = [(fields['receiver'], _timestamp(fields.get('txn_timestamp')), 'confirmed', 1,
+                       fields['amount_micro'], link_id)]
+        else:
+            # Deletes leave history as it happened
+            return
+        with self._lock:
+            self._events.extend(queued)
+        if self._thread is None:
+            self._start()
+
+    def flush(self):
+        """Add queued changes to the stored rollups (backfilling them first if new)"""
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, []
+            if not events and self._backfilled_at is not None:
+                return
+
+            conn = self._conn()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Read under the write lock, so only one process backfills
+                row = conn.execute(_GET_META, ('backfilled_at',)).fetchone()
+                if row is None:
+                    overlap_from = time.time() - BACKFILL_OVERLAP
+                    backfilled_at = self._backfill(conn, overlap_from)
+                    conn.execute(_SET_META, ('backfilled_at', repr(backfilled_at)))
+                    conn.execute(_SET_META, ('overlap_from', repr(overlap_from)))
+                else:
+                    backfilled_at = float(row[0])
+                    row = conn.execute(_GET_META, ('overlap_from',)).fetchone()
+                    overlap_from = float(row[0]) if row else backfilled_at
+
+                rows = {}
+                for receiver, ts, field, value, volume, link_id in events:
+                    if ts < backfilled_at:
+                        # Counted from the records, unless written after the scan
+                        if (ts < overlap_from or field == 'clicks' or
+                                conn.execute(_GET_BACKFILLED, (field, link_id)).fetchone()):
+                            continue
+                    _add(rows, receiver, ts, field, value, volume)
+                _write(conn, rows)
+                self._prune(conn)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                # Keep the changes so the next flush retries them
+                with self._lock:
+                    self._events[:0] = events
+                raise
+            self._backfilled_at = backfilled_at
+
+    def _backfill(self, conn, overlap_from: float) -> float:
+        """
+        Count every record the scan saw; returns the moment it finished
+
+        Ids counted from overlap_from on are kept in analytics_backfilled.
+        """
+        records = list(self._source())
+        backfilled_at = time.time()
+
+        rows = {}
+        seen = []
+        for link_id, link in records:
+            created = _timestamp(link['created'])
+            if created < backfilled_at:
+                _add(rows, link['receiver'], created, 'links', 1, 0)
+                if link.get('click_count'):
+                    _add(rows, link['receiver'], created, 'clicks', link['click_count'], 0)
+                if created >= overlap_from:
+                    seen.append(('links', link_id))
+            if link.get('status') == 'confirmed':
+                confirmed = _timestamp(link.get('txn_timestamp'))
+                if confirmed < backfilled_at:
+                    _add(rows, link['receiver'], confirmed, 'confirmed', 1, link['amount_micro'])
+                    if confirmed >= overlap_from:
+                        seen.append(('confirmed', link_id))
+        _write(conn, rows)
+        conn.executemany(_ADD_BACKFILLED, seen)
+        return backfilled_at
+
+    def _prune(self, conn):
+        """Drop buckets past retention, once per new hour or day"""
+        now = time.time()
+        for size in (HOUR, DAY):
+            start = _bucket_start(now, size)
+            if self._pruned.get(size) != start:
+                conn.execute(_PRUNE, (size, start - self.retention[size] * size))
+                self._pruned[size] = start
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='analytics-flush',
+                                            daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                # Database busy or unavailable; changes were kept
+                pass
+
+    def stop(self):
+        """Stop the background thread and store whatever is left"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    # ---------- queries (cost depends on buckets asked for, not on links) ----------
+
+    def _counts(self, receiver, size: int, start: int) -> Counts:
+        row = self._conn().execute(_SELECT_ONE, (receiver or EVERYONE, size, start)).fetchone()
+        return Counts(*row) if row else Counts()
+
+    def _range(self, size: int, receiver, since: float, until: float) -> list:
+        return self._conn().execute(
+            _SELECT_RANGE,
+            (receiver or EVERYONE, size, _bucket_start(since, size), _bucket_start(until, size))
+        ).fetchall()
+
+    def summary(self, receiver: str) -> dict:
+        """Totals, today and the last 24 hours for one receiver"""
+        self.flush()
+        now = datetime.now().timestamp()
+        last_day = Counts()
+        for _, links, clicks, confirmed, volume in self._range(HOUR, receiver,
+                                                               now - DAY + HOUR, now):
+            last_day.links += links
+            last_day.clicks += clicks
+            last_day.confirmed += confirmed
+            last_day.volume += volume
+        return {
+            'receiver': receiver,
+            'total': self._counts(receiver, TOTAL, 0).to_dict(),
+            'today': self._counts(receiver, DAY, _bucket_start(now, DAY)).to_dict(),
+            'last_24h': last_day.to_dict()
+        }
+
+    def series(self, size: int, since: float, until: float, receiver: str = None) -> list:
+        """Non-empty buckets between since and until, oldest first"""
+        self.flush()
+        return [
+            {'start': datetime.fromtimestamp(start).isoformat(), **Counts(*counts).to_dict()}
+            for start, *counts in self._range(size, receiver, since, until)
+        ]
+
+
+def _add(rows: dict, receiver: str, ts: float, field: str, value: int, volume: int):
+    """Add one change to the totals and buckets it counts in, for receiver and everyone"""
+    column = _FIELDS.index(field)
+    for who in (receiver, EVERYONE):
+        for size in (TOTAL, HOUR, DAY):
+            key = (who, size, _bucket_start(ts, size) if size else 0)
+            counts = rows.get(key)
+            if counts is None:
+                counts = rows[key] = [0, 0, 0, 0]
+            counts[column] += value
+            counts[3] += volume
+
+
+def _write(conn, rows: dict):
+    conn.executemany(_ADD, [key + tuple(counts) for key, counts in rows.items()])
+
+
+rollups = AnalyticsRollups()
+
+
+def merchant_summary(receiver: str) -> dict:
+    return rollups.summary(receiver)
+
+
+def analytics_series(bucket: str, since: datetime = None, until: datetime = None,
+                     receiver: str = None) -> list:
+    """
+    Bucketed counts for everyone, or for one receiver
+
+    bucket is 'hour' or 'day'; the range defaults to the last 24 hours
+    (hourly) or the last 30 days (daily).
+    """
+    size = HOUR if bucket == 'hour' else DAY
+    until = until or datetime.now()
+    since = since or until - (timedelta(hours=23) if size == HOUR else timedelta(days=29))
+    return rollups.series(size, since.timestamp(), until.timestamp(), receiver)
@@ -0,0 +1,344 @@
+# ============================================
+# FILE: backend/database/archive.py
+# ============================================
+"""
+Cold archive for closed checkout links
+
+Confirmed and expired links are hardly ever read again, so a background
+mover (see links.archive_closed_links) copies them here and deletes them
+from the live store, which then only holds open and recently closed
+links. get_link() falls back to the archive on a live-store miss.
+
+The archive is a directory of monthly segments, one month per link ID
+creation time (link_ids.created_ms), with older random IDs in 'legacy':
+
+    links-2026-10.seg   compressed blocks, append-only
+    links-2026-10.idx   link_id -> block, append-only
+
+A block is a batch of records compressed together:
+    I  crc32 of the compressed bytes
+    I  compressed length
+    zlib data: per link, B id length, id, I record length, record
+records encoded by link_record.py. An index entry is
+    B id length, id, Q block offset, I block length
+with length 0 marking a deleted link. Later entries win, so a link that
+was archived again after coming back to life reads its newest copy.
+
+A lookup derives the segment from the link ID and reads that month's
+index into memory once (a few recently used months are kept, and
+re-read from where they stopped when another process appended). Only
+one block is read and decompressed per lookup.
+
+Writers hold an flock on <dir>/.lock, write and fsync the blocks, then
+the index entries, so a crash leaves at most an unreferenced block; a
+torn index entry at the tail is cut off by the next writer.
+"""
+
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:     # not available on Windows: single process only
+    fcntl = None
+
+from backend.database.link_ids import created_ms
+from backend.database.link_record import decode_record, encode_record
+
+# Records compressed together; bigger blocks compress better, smaller
+# ones are quicker to decompress for a single lookup
+BLOCK_RECORDS = 256
+
+# Monthly indexes kept in memory
+INDEX_CACHE_MONTHS = 12
+
+LEGACY_SEGMENT = 'legacy'
+
+_BLOCK = struct.Struct('<II')
+_ENTRY = struct.Struct('<QI')
+_LENGTH = struct.Struct('<I')
+
+
+def segment_of(link_id: str) -> str:
+    """'2026-10' for a generated ID, LEGACY_SEGMENT for older ones"""
+    ms = created_ms(link_id)
+    if ms is None:
+        return LEGACY_SEGMENT
+    moment = time.gmtime(ms // 1000)
+    return '%04d-%02d' % (moment.tm_year, moment.tm_mon)
+
+
+def _pack_block(records: dict) -> bytes:
+    parts = []
+    for link_id, record in records.items():
+        raw_id = link_id.encode('utf-8')
+        data = encode_record(record)
+        parts.append(bytes((len(raw_id),)) + raw_id + _LENGTH.pack(len(data)) + data)
+    compressed = zlib.compress(b''.join(parts))
+    return _BLOCK.pack(zlib.crc32(compressed), len(compressed)) + compressed
+
+
+def _unpack_block(block: bytes) -> dict:
+    crc, size = _BLOCK.unpack_from(block)
+    compressed = block[_BLOCK.size:_BLOCK.size + size]
+    if len(compressed) != size or zlib.crc32(compressed) != crc:
+        raise ValueError('Damaged archive block')
+    data = memoryview(zlib.decompress(compressed))
+    records = {}
+    pos = 0
+    while pos < len(data):
+        id_end = pos + 1 + data[pos]
+        link_id = bytes(data[pos + 1:id_end]).decode('utf-8')
+        (length,) = _LENGTH.unpack_from(data, id_end)
+        start = id_end + _LENGTH.size
+        records[link_id] = decode_record(data[start:start + length])
+        pos = start + length
+    return records
+
+
+class _SegmentIndex:
+    """link_id -> (block offset, block length) for one month, read so far"""
+
+    __slots__ = ('entries', 'read_to')
+
+    def __init__(self):
+        self.entries = {}
+        self.read_to = 0
+
+
+class LinkArchive:
+    """Monthly compressed segments of closed links"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_fd = os.open(os.path.join(directory, '.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+        self._indexes = OrderedDict()   # segment -> _SegmentIndex, most recent last
+
+    def _path(self, segment: str, suffix: str) -> str:
+        return os.path.join(self.directory, f'links-{segment}{suffix}')
+
+    def close(self):
+        with self._lock:
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+
+    @contextmanager
+    def locked(self):
+        """Exclusive write access across threads and processes"""
+        with self._lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and fcntl is not None:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    # ---------- indexes ----------
+
+    def _index(self, segment: str) -> _SegmentIndex:
+        """The segment's index, with any entries appended since it was last read"""
+        index = self._indexes.get(segment)
+        if index is None:
+            index = self._indexes[segment] = _SegmentIndex()
+            while len(self._indexes) > INDEX_CACHE_MONTHS:
+                self._indexes.popitem(last=False)
+        else:
+            self._indexes.move_to_end(segment)
+
+        path = self._path(segment, '.idx')
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            return index
+        if size > index.read_to:
+            with open(path, 'rb') as f:
+                f.seek(index.read_to)
+                data = f.read()
+            pos = 0
+            while pos < len(data):
+                end = pos + 1 + data[pos] + _ENTRY.size
+                if end > len(data):
+                    # Torn entry, or another process mid-append
+                    break
+                link_id = data[pos + 1:pos + 1 + data[pos]].decode('utf-8')
+                offset, length = _ENTRY.unpack_from(data, end - _ENTRY.size)
+                if length:
+                    index.entries[link_id] = (offset, length)
+                else:
+                    index.entries.pop(link_id, None)
+                pos = end
+            index.read_to += pos
+        return index
+
+    def _append_index(self, segment: str, entries: list):
+        """Append (link_id, offset, length) entries; caller holds the lock"""
+        index = self._index(segment)
+        path = self._path(segment, '.idx')
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            # Nobody else is writing: bytes past the last whole entry are torn
+            if os.fstat(fd).st_size > index.read_to:
+                os.truncate(fd, index.read_to)
+            parts = []
+            for link_id, offset, length in entries:
+                raw_id = link_id.encode('utf-8')
+                parts.append(bytes((len(raw_id),)) + raw_id + _ENTRY.pack(offset, length))
+            os.pwrite(fd, b''.join(parts), index.read_to)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self._index(segment)
+
+    # ---------- public API ----------
+
+    def put_many(self, records: dict):
+        """Archive records ({link_id: record}); durable when this returns"""
+        by_segment = {}
+        for link_id, record in records.items():
+            by_segment.setdefault(segment_of(link_id), {})[link_id] = record
+
+        with self.locked():
+            for segment, segment_records in by_segment.items():
+                path = self._path(segment, '.seg')
+                created = not os.path.exists(path)
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                try:
+                    offset = os.fstat(fd).st_size
+                    items = list(segment_records.items())
+                    blocks, entries = [], []
+                    for i in range(0, len(items), BLOCK_RECORDS):
+                        chunk = dict(items[i:i + BLOCK_RECORDS])
+                        block = _pack_block(chunk)
+                        entries.extend((link_id, offset, len(block)) for link_id in chunk)
+                        blocks.append(block)
+                        offset += len(block)
+                    data = b''.join(blocks)
+                    if os.write(fd, data) != len(data):
+                        raise OSError(f'Short write to {path}')
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                if created:
+                    _fsync_dir(self.directory)
+                self._append_index(segment, entries)
+
+    def get(self, link_id: str):
+        segment = segment_of(link_id)
+        with self._lock:
+            location = self._index(segment).entries.get(link_id)
+        if location is None:
+            return None
+        offset, length = location
+        fd = os.open(self._path(segment, '.seg'), os.O_RDONLY)
+        try:
+            block = os.pread(fd, length, offset)
+        finally:
+            os.close(fd)
+        return _unpack_block(block).get(link_id)
+
+    def contains(self, link_id: str) -> bool:
+        with self._lock:
+            return link_id in self._index(segment_of(link_id)).entries
+
+    def delete(self, link_id: str) -> bool:
+        segment = segment_of(link_id)
+        with self.locked():
+            if link_id not in self._index(segment).entries:
+                return False
+            self._append_index(segment, [(link_id, 0, 0)])
+        return True
+
+    def segments(self) -> list:
+        """Segment names present on disk, oldest first"""
+        return sorted(name[len('links-'):-len('.idx')] for name in os.listdir(self.directory)
+                      if name.startswith('links-') and name.endswith('.idx'))
+
+    def all(self) -> dict:
+        """Every archived link; reads and decompresses the whole archive"""
+        found = {}
+        for segment in self.segments():
+            with self._lock:
+                entries = dict(self._index(segment).entries)
+            blocks = {}
+            for link_id, location in entries.items():
+                blocks.setdefault(location, []).append(link_id)
+            with open(self._path(segment, '.seg'), 'rb') as f:
+                for (offset, length), link_ids in sorted(blocks.items()):
+                    f.seek(offset)
+                    records = _unpack_block(f.read(length))
+                    for link_id in link_ids:
+                        found[link_id] = records[link_id]
+        return found
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(self._index(segment).entries) for segment in self.segments())
+
+
+class ArchiveMover:
+    """Background thread that moves closed links to the archive in batches"""
+
+    def __init__(self, move_fn, batch: int = 1000, interval: float = 60.0):
+        """
+        Args:
+            move_fn: Called with a batch size; archives up to that many
+                links per status and returns how many it moved
+            batch: Links per status per move
+            interval: Seconds between moves once nothing is left to move
+        """
+        self._move_fn = move_fn
+        self.batch = batch
+        self.interval = interval
+        self.moved = 0
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='link-archiver',
+                                                daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                moved = self._move_fn(self.batch)
+            except Exception:
+                moved = 0
+            self.moved += moved
+            if moved < self.batch:
+                self._stop.wait(self.interval)
+
+
+def _fsync_dir(directory: str):
+    """Make a new file's directory entry durable"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,45 @@
+# ============================================
+# FILE: backend/database/async_links.py
+# ============================================
+"""
+Awaitable link storage API for the ASGI app
+
+Cache hits and click counting are in-memory and answered on the event
+loop. Anything that reads or writes the store (a pread on the log, a
+SQLite query, an fsync) runs on a small dedicated thread pool, so slow
+disk I/O never stalls the other requests sharing the loop.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.database import links
+from backend.database.cache import MISS
+
+# Threads doing store I/O for the event loop
+STORE_WORKERS = int(os.getenv('LINKS_ASYNC_WORKERS', 8))
+
+_executor = ThreadPoolExecutor(max_workers=STORE_WORKERS, thread_name_prefix='links-io')
+
+
+async def run_blocking(fn, *args):
+    """Run a blocking storage call on the store thread pool"""
+    return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+
+
+async def get_link(link_id: str):
+    """Same result as links.get_link()"""
+    link = links.get_cached_link(link_id)
+    if link is MISS:
+        link = await run_blocking(links.load_link, link_id)
+    return link
+
+
+async def get_link_for_payment(link_id: str):
+    """Same result as links.get_link_for_payment()"""
+    link = links.get_cached_link(link_id)
+    if not links.is_closed(link):
+        link = await run_blocking(links.load_link, link_id)
+    return link
+
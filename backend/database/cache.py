@@ -0,0 +1,106 @@
+# ============================================
+# FILE: backend/database/cache.py
+# ============================================
+"""
+Bounded in-process cache for hot link lookups
+
+Least-recently-used entries are evicted once max_size is reached, and
+entries older than ttl seconds are treated as misses. The TTL also
+bounds how stale a link can be when another worker process changes it.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+# Returned by get() when the key is not cached (None is a valid cached value)
+MISS = object()
+
+
+class LinkCache:
+    """Thread-safe LRU cache with per-entry TTL and hit/miss counters"""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return the cached value, or MISS"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISS
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISS
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self) -> int:
+        """
+        Token to take before reading the store on a miss
+
+        Passing it back to put() drops the fill if any invalidation
+        happened in between, so a slow reader cannot cache stale data.
+        """
+        return self._generation
+
+    def put(self, key, value, generation: int = None):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def invalidate_many(self, keys):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
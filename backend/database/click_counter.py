@@ -0,0 +1,138 @@
+# ============================================
+# FILE: backend/database/click_counter.py
+# ============================================
+"""
+Write-behind click counter for checkout links
+
+/api/pay bumps a link's click_count on every visit. Instead of one
+store write per click, increments are collected in memory and written
+in batches: every FLUSH_INTERVAL seconds, as soon as FLUSH_THRESHOLD
+clicks are waiting, and once more at interpreter shutdown.
+
+Counters are split across shards, each with its own lock, so requests
+for different links rarely contend with each other.
+"""
+
+import atexit
+import threading
+import zlib
+
+
+class _Shard:
+    __slots__ = ('lock', 'pending', 'inflight')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}    # link_id -> clicks not yet handed to the store
+        self.inflight = {}   # link_id -> clicks being written right now
+
+
+class ShardedClickCounter:
+    """Per-link click deltas, flushed to the store in batches"""
+
+    def __init__(self, flush_fn, shards: int = 16, flush_interval: float = 1.0,
+                 flush_threshold: int = 1000):
+        """
+        Args:
+            flush_fn: Called with {link_id: delta}; must apply all deltas
+            shards: Number of independently locked counter shards
+            flush_interval: Max seconds a click waits before being written
+            flush_threshold: Pending clicks that trigger an early flush
+        """
+        self._flush_fn = flush_fn
+        self._shards = [_Shard() for _ in range(shards)]
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+
+        self._waiting = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _shard(self, link_id: str) -> _Shard:
+        # crc32 is stable across processes, unlike hash() on str
+        return self._shards[zlib.crc32(link_id.encode()) % len(self._shards)]
+
+    def add(self, link_id: str, delta: int = 1):
+        """Record clicks for a link without touching the store"""
+        shard = self._shard(link_id)
+        with shard.lock:
+            shard.pending[link_id] = shard.pending.get(link_id, 0) + delta
+
+        # Unlocked counter: an off-by-a-few early or late flush is harmless
+        self._waiting += delta
+        if self._waiting >= self.flush_threshold:
+            self._wake.set()
+
+        if self._thread is None:
+            self._start()
+
+    def pending(self, link_id: str) -> int:
+        """Clicks recorded for a link that the store does not have yet"""
+        shard = self._shard(link_id)
+        with shard.lock:
+            return shard.pending.get(link_id, 0) + shard.inflight.get(link_id, 0)
+
+    def discard(self, link_id: str):
+        """Forget pending clicks for a deleted link"""
+        shard = self._shard(link_id)
+        with shard.lock:
+            shard.pending.pop(link_id, None)
+
+    def flush(self):
+        """Write all pending clicks to the store in one batch"""
+        with self._flush_lock:
+            self._waiting = 0
+            batch = {}
+            for shard in self._shards:
+                with shard.lock:
+                    # Keep swapped-out deltas visible to pending() until written
+                    shard.inflight, shard.pending = shard.pending, {}
+                    batch.update(shard.inflight)
+
+            if not batch:
+                return
+
+            try:
+                self._flush_fn(batch)
+            except Exception:
+                # Put the clicks back so the next flush retries them
+                for shard in self._shards:
+                    with shard.lock:
+                        for link_id, delta in shard.inflight.items():
+                            shard.pending[link_id] = shard.pending.get(link_id, 0) + delta
+                        shard.inflight = {}
+                raise
+
+            for shard in self._shards:
+                with shard.lock:
+                    shard.inflight = {}
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name='click-counter-flush', daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Store unavailable; deltas were kept, try again next tick
+                pass
+
+    def stop(self):
+        """Stop the background thread and write whatever is left"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
@@ -0,0 +1,82 @@
+# ============================================
+# FILE: backend/database/expiry.py
+# ============================================
+"""
+Background reaper for expiring checkout links
+
+Links created with expires_in carry an expires_at timestamp. The stores
+keep their unused, expiring links ordered by expires_at (a heap in the
+log store, a partial index in SQLite), so the reaper never scans: it
+asks the store to expire whatever is due, then sleeps until the next
+expires_at. Each round costs O(expired log n).
+
+Links created in this process wake the reaper early when they expire
+before its current deadline. Links created by other worker processes
+are picked up when the reaper next looks at the store, at most
+max_sleep seconds later; /api/pay checks expires_at itself, so a link
+is never payable past its expiry in the meantime.
+"""
+
+import threading
+import time
+
+
+class LinkReaper:
+    """Expires links in batches at their expires_at"""
+
+    def __init__(self, expire_fn, next_fn, batch: int = 1000, max_sleep: float = 5.0):
+        """
+        Args:
+            expire_fn: Called with a batch size; expires due links and
+                returns their link_ids
+            next_fn: Returns the next expires_at as epoch seconds, or None
+            batch: Most links expired per store write
+            max_sleep: Longest wait between looks at the store
+        """
+        self._expire_fn = expire_fn
+        self._next_fn = next_fn
+        self.batch = batch
+        self.max_sleep = max_sleep
+        self.expired = 0
+
+        self._deadline = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='link-reaper',
+                                                daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def schedule(self, when: float):
+        """A link now expires at when (epoch seconds): wake up early if needed"""
+        if when < self._deadline:
+            self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                expired = self._expire_fn(self.batch)
+                self.expired += len(expired)
+                if len(expired) >= self.batch:
+                    # More may be due already
+                    continue
+                when = self._next_fn()
+            except Exception:
+                when = None
+
+            now = time.time()
+            delay = self.max_sleep if when is None else min(max(when - now, 0), self.max_sleep)
+            self._deadline = now + delay
+            self._wake.wait(delay)
+            self._wake.clear()
@@ -0,0 +1,100 @@
+# ============================================
+# FILE: backend/database/link_ids.py
+# ============================================
+"""
+Time-ordered link IDs
+
+An ID is 60 bits written as 12 lowercase Crockford base32 characters
+(no i, l, o or u, so it survives being read aloud or retyped):
+
+    40 bits  milliseconds since 2024-01-01 UTC (good until 2058)
+     8 bits  counter, started at a random value each millisecond and
+             incremented for every further ID in the same millisecond
+    12 bits  random, drawn afresh for every ID
+
+IDs from one process are strictly increasing, and because the alphabet
+is in ASCII order they sort as strings in creation order, which keeps
+index inserts at the end of the secondary indexes and the SQLite
+B-trees. The random low bits keep IDs made in the same millisecond
+from being consecutive, so one link ID does not give away its
+neighbours. Separate worker processes only collide if they draw the
+same counter start and random bits in the same millisecond; the store's
+insert-if-absent check (put_new / put_many with replace=False) catches
+that case and the caller just takes the next ID.
+"""
+
+import secrets
+import threading
+import time
+
+ALPHABET = '0123456789abcdefghjkmnpqrstvwxyz'
+ID_LENGTH = 12
+
+# 2024-01-01T00:00:00Z in milliseconds
+EPOCH_MS = 1704067200000
+
+# Bits after the timestamp: counter, then random
+COUNTER_BITS = 8
+RANDOM_BITS = 12
+SEQUENCE_BITS = COUNTER_BITS + RANDOM_BITS
+_COUNTER_MASK = (1 << COUNTER_BITS) - 1
+_RANDOM_MASK = (1 << RANDOM_BITS) - 1
+
+# Random starts leave this much headroom for IDs within one millisecond
+_START_MASK = _COUNTER_MASK >> 1
+
+_DECODE = {c: i for i, c in enumerate(ALPHABET)}
+
+
+def _encode(value: int) -> str:
+    chars = []
+    for _ in range(ID_LENGTH):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+
+class LinkIdGenerator:
+    """Thread-safe, monotonic ID source for one process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._counter = 0
+
+    def next(self) -> str:
+        with self._lock:
+            now = time.time_ns() // 1_000_000 - EPOCH_MS
+            if now > self._last_ms:
+                self._last_ms = now
+                self._counter = secrets.randbits(COUNTER_BITS) & _START_MASK
+            else:
+                # Same millisecond, or the clock stepped back: stay monotonic
+                self._counter += 1
+                if self._counter > _COUNTER_MASK:
+                    self._last_ms += 1
+                    self._counter = secrets.randbits(COUNTER_BITS) & _START_MASK
+            random_bits = secrets.randbits(RANDOM_BITS) & _RANDOM_MASK
+            sequence = (self._counter << RANDOM_BITS) | random_bits
+            return _encode((self._last_ms << SEQUENCE_BITS) | sequence)
+
+
+_generator = LinkIdGenerator()
+
+
+def new_link_id() -> str:
+    """Next ID from the process-wide generator"""
+    return _generator.next()
+
+
+def created_ms(link_id: str):
+    """Unix time in milliseconds encoded in a generated ID, or None for older IDs"""
+    if len(link_id) != ID_LENGTH:
+        return None
+    value = 0
+    for char in link_id:
+        digit = _DECODE.get(char)
+        if digit is None:
+            return None
+        value = (value << 5) | digit
+    return (value >> SEQUENCE_BITS) + EPOCH_MS
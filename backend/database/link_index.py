@@ -0,0 +1,140 @@
+# ============================================
+# FILE: backend/database/link_index.py
+# ============================================
+"""
+In-memory index entries and secondary indexes for the log store
+
+Each live link costs one IndexEntry (a __slots__ object, not a dict):
+where its latest record sits in the log, plus the three fields the
+secondary indexes sort and filter on. created is epoch microseconds,
+status a link_record.STATUSES code, and receivers are interned, so a
+merchant's links all share one string.
+
+Links are kept in (created, link_id) order three ways: all links, per
+receiver and per status. The lists hold the link_id strings themselves
+and bisect through the entries (bisect's key=), so ordering costs one
+pointer per list rather than a key tuple per link. Each write moves a
+link between lists with a bisect, and writes that don't change
+created/receiver/status (click count flushes) skip the lists entirely.
+
+page() walks one list newest-first from a keyset cursor, so a page
+costs O(log n + page size) and links inserted while someone is paging
+never shift or repeat the pages after their cursor.
+"""
+
+from bisect import bisect_left, insort
+
+
+class IndexEntry:
+    """Where a link's latest record is, and what the secondary indexes need"""
+
+    __slots__ = ('offset', 'length', 'created', 'receiver', 'status')
+
+    def __init__(self, offset: int, length: int, created: int, receiver: str, status):
+        self.offset = offset
+        self.length = length
+        self.created = created
+        self.receiver = receiver
+        self.status = status
+
+    def same_keys(self, other) -> bool:
+        return (self.created == other.created and self.receiver == other.receiver
+                and self.status == other.status)
+
+
+class SecondaryIndex:
+    """
+    created-ordered link lists: overall, by receiver and by status
+
+    The store calls remove() while the link's entry is still in its
+    index and add() once the new entry is, so every list stays sorted
+    by the entries it points at.
+    """
+
+    def __init__(self, entries: dict):
+        self._entries = entries  # link_id -> IndexEntry, owned by the store
+        self._all = []           # [link_id] sorted by (created, link_id)
+        self._by_receiver = {}   # receiver -> [link_id]
+        self._by_status = {}     # status -> [link_id]
+
+    def _key(self, link_id: str) -> tuple:
+        return self._entries[link_id].created, link_id
+
+    def _insert(self, ids: list, link_id: str):
+        # New links are almost always the newest: append without a search
+        if not ids or self._key(ids[-1]) < self._key(link_id):
+            ids.append(link_id)
+        else:
+            insort(ids, link_id, key=self._key)
+
+    def _remove(self, ids: list, link_id: str, created: int):
+        i = bisect_left(ids, (created, link_id), key=self._key)
+        if i < len(ids) and ids[i] == link_id:
+            del ids[i]
+
+    def add(self, link_id: str, entry: IndexEntry):
+        self._insert(self._all, link_id)
+        self._insert(self._by_receiver.setdefault(entry.receiver, []), link_id)
+        self._insert(self._by_status.setdefault(entry.status, []), link_id)
+
+    def remove(self, link_id: str, entry: IndexEntry):
+        self._remove(self._all, link_id, entry.created)
+        for lists, name in ((self._by_receiver, entry.receiver), (self._by_status, entry.status)):
+            ids = lists.get(name)
+            if ids is not None:
+                self._remove(ids, link_id, entry.created)
+                if not ids:
+                    del lists[name]
+
+    def clear(self):
+        self._all = []
+        self._by_receiver = {}
+        self._by_status = {}
+
+    def rebuild(self):
+        """Build every list from the entries with one sort (after a full log scan)"""
+        entries = self._entries
+        self._all = sorted(entries, key=self._key)
+        self._by_receiver = {}
+        self._by_status = {}
+        for link_id in self._all:
+            entry = entries[link_id]
+            self._by_receiver.setdefault(entry.receiver, []).append(link_id)
+            self._by_status.setdefault(entry.status, []).append(link_id)
+
+    def page(self, receiver: str = None, status=None, created_from: int = None,
+             created_to: int = None, after: tuple = None, limit: int = 50) -> list:
+        """
+        Link ids newest first
+
+        created_from is inclusive, created_to exclusive; after is the
+        (created, link_id) of the last link on the previous page.
+        """
+        candidates = [self._all]
+        if receiver is not None:
+            candidates.append(self._by_receiver.get(receiver, []))
+        if status is not None:
+            candidates.append(self._by_status.get(status, []))
+        # Walk the shortest list, check the other filters per link
+        ids = min(candidates, key=len)
+
+        hi = len(ids)
+        if created_to is not None:
+            hi = bisect_left(ids, (created_to,), key=self._key)
+        if after is not None:
+            hi = min(hi, bisect_left(ids, tuple(after), key=self._key))
+        lo = bisect_left(ids, (created_from,), key=self._key) if created_from is not None else 0
+
+        found = []
+        index = self._entries
+        for i in range(hi - 1, lo - 1, -1):
+            link_id = ids[i]
+            entry = index[link_id]
+            if receiver is not None and entry.receiver != receiver:
+                continue
+            if status is not None and entry.status != status:
+                continue
+            found.append(link_id)
+            if len(found) >= limit:
+                break
+        return found
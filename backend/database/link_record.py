@@ -0,0 +1,317 @@
+# ============================================
+# FILE: backend/database/link_record.py
+# ============================================
+"""
+Compact binary encoding of link records
+
+A record is a fixed 34-byte header followed by a few variable fields:
+
+    B  flags (see below)
+    B  status code (index into STATUSES)
+    q  amount_micro
+    q  created, microseconds since the epoch
+    q  txn_timestamp, microseconds since the epoch (if TXN_TIME)
+    q  click_count
+    expires_at   q microseconds since the epoch (if EXPIRES)
+    receiver     32-byte public key (RECEIVER_KEY), else H length + UTF-8
+    txid         32-byte hash (TXID_HASH), else H length + UTF-8 (if TXID)
+    description  I length + UTF-8
+
+Timestamps are the naive local times the rest of the code uses,
+converted to and from epoch integers. Receivers and txids are decoded
+from base32 once per distinct value (lru_cache), so repeated merchants
+cost a dict lookup. Anything that doesn't fit this schema exactly (an
+unknown status, extra fields, an address whose checksum fails, a value
+too large for its field) is stored as JSON instead, flagged by a leading 0xff, so every record
+round-trips unchanged.
+
+Records written before amounts were integers carry 'amount' in ALGO;
+upgrade_record() turns that into 'amount_micro' wherever old records
+are read.
+"""
+
+import base64
+import functools
+import json
+import struct
+import sys
+from datetime import datetime
+
+from algosdk.encoding import decode_address, encode_address
+
+STATUSES = ('unused', 'pending', 'confirmed', 'expired')
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+FIELDS = frozenset(('amount_micro', 'receiver', 'description', 'created', 'status', 'txid',
+                    'txn_timestamp', 'click_count', 'expires_at'))
+
+# flags
+RECEIVER_KEY = 0x01
+TXID = 0x02
+TXID_HASH = 0x04
+TXN_TIME = 0x08
+# 0x10 marked whole-ALGO amounts in older logs and is ignored
+EXPIRES = 0x20
+JSON_RECORD = 0xff
+
+_HEADER = struct.Struct('<BBqqqq')
+_SHORT = struct.Struct('<H')
+_LONG = struct.Struct('<I')
+_TIME = struct.Struct('<q')
+
+MICRO = 1_000_000      # microseconds per second
+
+
+# ---------- field codecs ----------
+
+def to_epoch_us(value: str) -> int:
+    """Naive local isoformat string -> microseconds since the epoch"""
+    moment = datetime.fromisoformat(value)
+    return int(moment.replace(microsecond=0).timestamp()) * MICRO + moment.microsecond
+
+
+def from_epoch_us(value: int) -> str:
+    seconds, micros = divmod(value, MICRO)
+    return datetime.fromtimestamp(seconds).replace(microsecond=micros).isoformat()
+
+
+def _exact_epoch_us(value: str) -> int:
+    """to_epoch_us(), but only if from_epoch_us() gives the same string back"""
+    micros = to_epoch_us(value)
+    if from_epoch_us(micros) != value:
+        raise ValueError('Timestamp does not round-trip')
+    return micros
+
+
+@functools.lru_cache(maxsize=65536)
+def _address_key(address: str):
+    """32-byte public key, or None if the address doesn't round-trip"""
+    try:
+        return decode_address(address)
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=65536)
+def _key_address(key: bytes) -> str:
+    return sys.intern(encode_address(key))
+
+
+def _txid_hash(txid: str):
+    """32 raw bytes of a 52-character base32 transaction id, or None"""
+    if len(txid) != 52:
+        return None
+    try:
+        raw = base64.b32decode(txid + '====')
+    except ValueError:
+        return None
+    if base64.b32encode(raw).decode('ascii').rstrip('=') != txid:
+        return None
+    return raw
+
+
+def _hash_txid(raw: bytes) -> str:
+    return base64.b32encode(raw).decode('ascii').rstrip('=')
+
+
+def _text(value: str, length: struct.Struct) -> bytes:
+    data = value.encode('utf-8')
+    return length.pack(len(data)) + data
+
+
+# ---------- records ----------
+
+class LinkRecord:
+    """One link, with amounts, times and status held as integers"""
+
+    __slots__ = ('amount_micro', 'receiver', 'description', 'created', 'status', 'txid',
+                 'txn_timestamp', 'click_count', 'expires_at')
+
+    def __init__(self, amount_micro: int, receiver: str, description: str, created: int,
+                 status: int, txid: str = None, txn_timestamp: int = None,
+                 click_count: int = 0, expires_at: int = None):
+        self.amount_micro = amount_micro
+        self.receiver = receiver
+        self.description = description
+        self.created = created              # epoch microseconds
+        self.status = status                # STATUSES index
+        self.txid = txid
+        self.txn_timestamp = txn_timestamp  # epoch microseconds or None
+        self.click_count = click_count
+        self.expires_at = expires_at        # epoch microseconds or None
+
+    @classmethod
+    def from_dict(cls, record: dict):
+        """The compact form of a record dict, or None if it doesn't fit the schema"""
+        if record.keys() != FIELDS:
+            return None
+        amount_micro = record['amount_micro']
+        receiver = record['receiver']
+        description = record['description']
+        created = record['created']
+        txid = record['txid']
+        txn_timestamp = record['txn_timestamp']
+        click_count = record['click_count']
+        expires_at = record['expires_at']
+        if not (type(amount_micro) is int and isinstance(receiver, str)
+                and isinstance(description, str) and isinstance(created, str)
+                and (txid is None or isinstance(txid, str))
+                and (txn_timestamp is None or isinstance(txn_timestamp, str))
+                and (expires_at is None or isinstance(expires_at, str))
+                and type(click_count) is int and record['status'] in STATUS_CODES):
+            return None
+        try:
+            return cls(amount_micro, receiver, description, _exact_epoch_us(created),
+                       STATUS_CODES[record['status']], txid,
+                       _exact_epoch_us(txn_timestamp) if txn_timestamp is not None else None,
+                       click_count,
+                       _exact_epoch_us(expires_at) if expires_at is not None else None)
+        except (ValueError, OverflowError):
+            return None
+
+    def to_dict(self) -> dict:
+        return {
+            'amount_micro': self.amount_micro,
+            'receiver': self.receiver,
+            'description': self.description,
+            'created': from_epoch_us(self.created),
+            'status': STATUSES[self.status],
+            'txid': self.txid,
+            'txn_timestamp': (from_epoch_us(self.txn_timestamp)
+                              if self.txn_timestamp is not None else None),
+            'click_count': self.click_count,
+            'expires_at': (from_epoch_us(self.expires_at)
+                           if self.expires_at is not None else None)
+        }
+
+    def encode(self) -> bytes:
+        flags = 0
+        parts = []
+        if self.expires_at is not None:
+            flags |= EXPIRES
+            parts.append(_TIME.pack(self.expires_at))
+        key = _address_key(self.receiver)
+        if key is not None:
+            flags |= RECEIVER_KEY
+            parts.append(key)
+        else:
+            parts.append(_text(self.receiver, _SHORT))
+        if self.txid is not None:
+            flags |= TXID
+            raw = _txid_hash(self.txid)
+            if raw is not None:
+                flags |= TXID_HASH
+                parts.append(raw)
+            else:
+                parts.append(_text(self.txid, _SHORT))
+        if self.txn_timestamp is not None:
+            flags |= TXN_TIME
+        parts.append(_text(self.description, _LONG))
+        header = _HEADER.pack(flags, self.status, self.amount_micro, self.created,
+                              self.txn_timestamp or 0, self.click_count)
+        return header + b''.join(parts)
+
+    @classmethod
+    def decode(cls, data: bytes):
+        flags, status, amount_micro, created, txn_time, clicks = _HEADER.unpack_from(data)
+        expires_at, pos = _read_expiry(data, flags)
+        receiver, pos = _read_receiver(data, pos, flags)
+        txid = None
+        if flags & TXID:
+            if flags & TXID_HASH:
+                txid = _hash_txid(bytes(data[pos:pos + 32]))
+                pos += 32
+            else:
+                txid, pos = _read_text(data, pos, _SHORT)
+        description, pos = _read_text(data, pos, _LONG)
+        return cls(amount_micro, receiver, description, created, status, txid,
+                   txn_time if flags & TXN_TIME else None, clicks, expires_at)
+
+
+def _read_text(data: bytes, pos: int, length: struct.Struct):
+    (size,) = length.unpack_from(data, pos)
+    pos += length.size
+    return str(data[pos:pos + size], 'utf-8'), pos + size
+
+
+def _read_expiry(data: bytes, flags: int):
+    """(expires_at or None, position of the receiver)"""
+    if flags & EXPIRES:
+        return _TIME.unpack_from(data, _HEADER.size)[0], _HEADER.size + _TIME.size
+    return None, _HEADER.size
+
+
+def _read_receiver(data: bytes, pos: int, flags: int):
+    if flags & RECEIVER_KEY:
+        return _key_address(bytes(data[pos:pos + 32])), pos + 32
+    receiver, pos = _read_text(data, pos, _SHORT)
+    return sys.intern(receiver), pos
+
+
+def encode_record(record: dict) -> bytes:
+    """Binary form of a record dict (JSON for records outside the schema)"""
+    compact = LinkRecord.from_dict(record)
+    if compact is not None:
+        try:
+            return compact.encode()
+        except struct.error:
+            # A number or text too large for its field
+            pass
+    return b'\xff' + json.dumps(record, separators=(',', ':')).encode('utf-8')
+
+
+def decode_record(data: bytes) -> dict:
+    if data[0] == JSON_RECORD:
+        return upgrade_record(json.loads(bytes(data[1:])))
+    return LinkRecord.decode(data).to_dict()
+
+
+def upgrade_record(record: dict) -> dict:
+    """
+    Bring a record from an older version up to the current fields: a
+    float 'amount' in ALGO becomes 'amount_micro', and links from before
+    expiry get 'expires_at': None
+    """
+    amount = record.get('amount')
+    if 'amount_micro' not in record and isinstance(amount, (int, float)):
+        record = dict(record)
+        del record['amount']
+        record['amount_micro'] = int(round(amount * 1_000_000))
+    if 'expires_at' not in record:
+        record = dict(record, expires_at=None)
+    return record
+
+
+def peek_index_fields(data: bytes) -> tuple:
+    """
+    (created, receiver, status, expires_at) for the in-memory indexes,
+    without decoding the rest: times in epoch microseconds (expires_at
+    None if the link never expires), status as its STATUSES code (or
+    the raw string for statuses outside it)
+    """
+    if data[0] == JSON_RECORD:
+        return index_fields(json.loads(bytes(data[1:])))
+    flags, status, _, created, _, _ = _HEADER.unpack_from(data)
+    expires_at, pos = _read_expiry(data, flags)
+    receiver, _ = _read_receiver(data, pos, flags)
+    return created, receiver, status, expires_at
+
+
+def created_key(created) -> int:
+    """Epoch microseconds of a 'created' value; 0 for missing or unparseable ones"""
+    try:
+        return to_epoch_us(created) if created else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def index_fields(record: dict) -> tuple:
+    """peek_index_fields() for a record dict"""
+    created = created_key(record.get('created'))
+    receiver = record.get('receiver')
+    if isinstance(receiver, str):
+        receiver = sys.intern(receiver)
+    status = record.get('status')
+    expires_at = record.get('expires_at')
+    return (created, receiver, STATUS_CODES.get(status, status),
+            created_key(expires_at) if expires_at else None)
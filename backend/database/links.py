@@ -3,119 +3,506 @@
 # ============================================
 """
 Database for storing checkout links
-Uses JSON file for MVP (can upgrade to MongoDB/PostgreSQL later)
+Storage engine is chosen with LINKS_BACKEND:
+    log    - append-only log with an in-memory index (default, log_store.py)
+    sqlite - SQLite in WAL mode (sqlite_store.py)
+Both can be shared by several worker processes.
+
+Confirmed and expired links are moved in the background to a cold
+archive (archive.py); lookups fall back to it, so the live store only
+holds open and recently closed links.
 """
 
-import json
 import os
-from datetime import datetime
-import uuid
+import threading
+from datetime import datetime, timedelta
+
+from backend.database.analytics import rollups
+from backend.database.archive import ArchiveMover, LinkArchive
+from backend.database.cache import LinkCache, MISS
+from backend.database.click_counter import ShardedClickCounter
+from backend.database.expiry import LinkReaper
+from backend.database.link_ids import new_link_id
+from backend.database.log_store import LinkLogStore
+from backend.database.sqlite_store import LinkSQLiteStore
+from backend.utils.metrics import register_gauges, timed
 
+# Old whole-file JSON database, imported once into the log on first start
 DATABASE_FILE = 'links_database.json'
 
+LINKS_BACKEND = os.getenv('LINKS_BACKEND', 'log')
+
+# Append-only record log
+LOG_FILE = os.getenv('LINKS_LOG_FILE', 'links_database.log')
+
+# SQLite database
+SQLITE_FILE = os.getenv('LINKS_SQLITE_FILE', 'links_database.sqlite3')
+
+# Analytics rollups (see analytics.py): tables in the SQLite store, or a
+# SQLite file next to the log
+ANALYTICS_FILE = os.getenv('LINKS_ANALYTICS_FILE', SQLITE_FILE if LINKS_BACKEND == 'sqlite'
+                           else os.path.splitext(LOG_FILE)[0] + '.analytics.sqlite3')
+
+# Click counts are batched in memory and written behind (see click_counter.py)
+CLICK_FLUSH_INTERVAL = float(os.getenv('LINKS_CLICK_FLUSH_INTERVAL', 1.0))
+CLICK_FLUSH_THRESHOLD = int(os.getenv('LINKS_CLICK_FLUSH_THRESHOLD', 1000))
+
+# Read-through cache for get_link (see cache.py); size 0 disables it
+CACHE_SIZE = int(os.getenv('LINKS_CACHE_SIZE', 10000))
+CACHE_TTL = float(os.getenv('LINKS_CACHE_TTL', 30))
+
+# Background expiry of links created with expires_in (see expiry.py)
+REAPER_ENABLED = os.getenv('LINKS_REAPER', '1') == '1'
+REAPER_BATCH = int(os.getenv('LINKS_REAPER_BATCH', 1000))
+REAPER_MAX_SLEEP = float(os.getenv('LINKS_REAPER_MAX_SLEEP', 5.0))
+
+# Cold archive of closed links (see archive.py): confirmed and expired
+# links created more than ARCHIVE_AFTER seconds ago are moved there
+ARCHIVE_ENABLED = os.getenv('LINKS_ARCHIVE', '1') == '1'
+ARCHIVE_DIR = os.getenv('LINKS_ARCHIVE_DIR', 'links_archive')
+ARCHIVE_AFTER = float(os.getenv('LINKS_ARCHIVE_AFTER', 24 * 3600))
+ARCHIVE_INTERVAL = float(os.getenv('LINKS_ARCHIVE_INTERVAL', 60))
+ARCHIVE_BATCH = int(os.getenv('LINKS_ARCHIVE_BATCH', 1000))
+ARCHIVED_STATUSES = ('confirmed', 'expired')
+
+_store = None
+_store_lock = threading.Lock()
+_archive = None
+
+# Serializes update_link_status so a repeated status change is a no-op
+_status_lock = threading.Lock()
+
+_cache = LinkCache(max_size=CACHE_SIZE, ttl=CACHE_TTL)
+
+# In-process callbacks told about every link change (see subscribe())
+_listeners = []
+
+
+@timed('storage', 'click_batch_write')
+def _flush_clicks(deltas: dict):
+    _get_store().increment_many('click_count', deltas)
+    _cache.invalidate_many(deltas)
 
-def _load_database():
-    """Load all links from JSON file"""
-    if not os.path.exists(DATABASE_FILE):
-        return {}
-    
-    try:
-        with open(DATABASE_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return {}
 
+_clicks = ShardedClickCounter(
+    _flush_clicks,
+    flush_interval=CLICK_FLUSH_INTERVAL,
+    flush_threshold=CLICK_FLUSH_THRESHOLD
+)
 
-def _save_database(data):
-    """Save all links to JSON file"""
-    with open(DATABASE_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
 
+def _get_store():
+    """Open the link store on first use"""
+    global _store, _archive
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if LINKS_BACKEND == 'sqlite':
+                    store = LinkSQLiteStore(SQLITE_FILE, legacy_json_path=DATABASE_FILE)
+                elif LINKS_BACKEND == 'log':
+                    store = LinkLogStore(LOG_FILE, legacy_json_path=DATABASE_FILE)
+                else:
+                    raise ValueError(f"Unknown LINKS_BACKEND: {LINKS_BACKEND}")
+                if ARCHIVE_ENABLED:
+                    _archive = LinkArchive(ARCHIVE_DIR)
+                _store = store
+                if REAPER_ENABLED:
+                    _reaper.start()
+                if ARCHIVE_ENABLED:
+                    _mover.start()
+    return _store
 
-def create_link(amount: float, receiver_address: str, description: str = ""):
+
+@timed('storage', 'expire_links')
+def expire_due_links(limit: int = 1000):
+    """Mark unused links past their expires_at as 'expired'; returns their link_ids"""
+    expired = _get_store().expire_due(datetime.now().isoformat(), limit)
+    _cache.invalidate_many(expired)
+    for link_id in expired:
+        _notify('updated', link_id, {'status': 'expired'})
+    return expired
+
+
+def _next_expiry():
+    expires_at = _get_store().next_expiry()
+    return datetime.fromisoformat(expires_at).timestamp() if expires_at else None
+
+
+_reaper = LinkReaper(expire_due_links, _next_expiry, batch=REAPER_BATCH,
+                     max_sleep=REAPER_MAX_SLEEP)
+
+
+@timed('storage', 'archive_links')
+def archive_closed_links(limit: int = 1000) -> int:
+    """
+    Move up to limit links per closed status, created more than
+    ARCHIVE_AFTER seconds ago, from the live store to the archive
+
+    Found through the store's status index, so the cost is the batch,
+    not the store. A link that changed since it was read stays live
+    (its archived copy is simply never read). Returns how many moved.
+    """
+    store = _get_store()
+    if _archive is None:
+        return 0
+    cutoff = (datetime.now() - timedelta(seconds=ARCHIVE_AFTER)).isoformat()
+    moved = 0
+    # One mover at a time across worker processes
+    with _archive.locked():
+        for status in ARCHIVED_STATUSES:
+            records = dict(store.page(status=status, created_to=cutoff, limit=limit))
+            if not records:
+                continue
+            _archive.put_many(records)
+            deleted = store.delete_unchanged(records)
+            _cache.invalidate_many(deleted)
+            moved += len(deleted)
+    return moved
+
+
+_mover = ArchiveMover(archive_closed_links, batch=ARCHIVE_BATCH, interval=ARCHIVE_INTERVAL)
+
+
+def _restore(link_id: str, fields: dict) -> bool:
+    """Bring an archived link back into the live store with fields applied"""
+    record = _archive.get(link_id) if _archive is not None else None
+    if record is None:
+        return False
+    record.update(fields)
+    return _get_store().put_new(link_id, record)
+
+
+def is_expired(link: dict) -> bool:
+    """True once a link is past its expires_at, even before the reaper marks it"""
+    if link['status'] == 'expired':
+        return True
+    expires_at = link.get('expires_at')
+    return (link['status'] == 'unused' and expires_at is not None
+            and expires_at <= datetime.now().isoformat())
+
+
+def subscribe(callback):
+    """
+    Register callback(event, link_id, fields) for link changes
+
+    event is 'created' (fields = full record), 'updated' (fields = the
+    changed fields, plus the link's receiver and amount_micro on a
+    status change), 'clicked' (fields = {'receiver': ...} when the
+    caller knew it, else None; one per click) or 'deleted' (fields =
+    None). Callbacks run on the writer's thread and must be quick;
+    errors in them are ignored.
+    """
+    _listeners.append(callback)
+
+
+def _notify(event: str, link_id: str, fields):
+    for callback in _listeners:
+        try:
+            callback(event, link_id, fields)
+        except Exception:
+            pass
+
+
+# Every process that writes links feeds the shared analytics rollups
+subscribe(rollups.on_link_change)
+
+
+def _new_record(amount_micro: int, receiver_address: str, description: str,
+                expires_in: float = None):
+    created = datetime.now()
+    return {
+        'amount_micro': amount_micro,
+        'receiver': receiver_address,
+        'description': description,
+        'created': created.isoformat(),
+        'status': 'unused',  # unused, pending, confirmed, expired
+        'txid': None,
+        'txn_timestamp': None,
+        'click_count': 0,
+        'expires_at': ((created + timedelta(seconds=expires_in)).isoformat()
+                       if expires_in is not None else None)
+    }
+
+
+def _schedule_expiry(record: dict):
+    if record['expires_at'] is not None:
+        _reaper.schedule(datetime.fromisoformat(record['expires_at']).timestamp())
+
+
+@timed('storage', 'create_link')
+def create_link(amount_micro: int, receiver_address: str, description: str = "",
+                expires_in: float = None):
     """
     Create a new checkout link
-    
+
     Args:
-        amount: Amount in ALGO
+        amount_micro: Amount in microAlgos
         receiver_address: Where the payment goes
         description: Optional description
-    
+        expires_in: Seconds until the link expires (None: never)
+
     Returns:
         Dictionary with link_id and details
     """
-    db = _load_database()
-    
-    # Generate unique ID
-    link_id = str(uuid.uuid4())[:8]
-    
+    store = _get_store()
+
     # Store link with metadata
-    db[link_id] = {
-        'amount': amount,
-        'receiver': receiver_address,
-        'description': description,
-        'created': datetime.now().isoformat(),
-        'status': 'unused',  # unused, used, confirmed
-        'txid': None,
-        'txn_timestamp': None,
-        'click_count': 0
-    }
-    
-    _save_database(db)
-    
+    record = _new_record(amount_micro, receiver_address, description, expires_in)
+
+    # Generate unique ID; the insert only succeeds if nobody has it yet
+    link_id = new_link_id()
+    while not store.put_new(link_id, record):
+        link_id = new_link_id()
+    _cache.invalidate(link_id)
+    _notify('created', link_id, record)
+    _schedule_expiry(record)
+
     return {
         'link_id': link_id,
-        'amount': amount,
+        'amount_micro': amount_micro,
         'receiver': receiver_address,
-        'created': db[link_id]['created']
+        'created': record['created'],
+        'expires_at': record['expires_at']
     }
 
 
+@timed('storage', 'create_links')
+def create_links(entries: list):
+    """
+    Create many checkout links in one storage transaction
+
+    Args:
+        entries: List of (amount_micro, receiver_address, description[,
+            expires_in]) tuples, already validated
+
+    Returns:
+        List of dictionaries with link_id and details, in input order
+    """
+    link_ids = [new_link_id() for _ in entries]
+    new_records = [_new_record(*entry) for entry in entries]
+
+    # IDs taken by another worker in the meantime get fresh ones
+    skipped = _get_store().put_many(dict(zip(link_ids, new_records)), replace=False)
+    while skipped:
+        taken = set(skipped)
+        retry = {}
+        for i, link_id in enumerate(link_ids):
+            if link_id in taken:
+                link_ids[i] = new_link_id()
+                retry[link_ids[i]] = new_records[i]
+        skipped = _get_store().put_many(retry, replace=False)
+
+    records = dict(zip(link_ids, new_records))
+    _cache.invalidate_many(records)
+
+    results = []
+    for link_id, record in records.items():
+        _notify('created', link_id, record)
+        _schedule_expiry(record)
+        results.append({
+            'link_id': link_id,
+            'amount_micro': record['amount_micro'],
+            'receiver': record['receiver'],
+            'created': record['created'],
+            'expires_at': record['expires_at']
+        })
+    return results
+
+
+def _with_pending_clicks(link_id: str, link: dict):
+    """Add clicks that are still waiting to be flushed"""
+    pending = _clicks.pending(link_id)
+    if pending:
+        link['click_count'] = link.get('click_count', 0) + pending
+    return link
+
+
+@timed('storage', 'get_link')
 def get_link(link_id: str):
     """Get link details by ID"""
-    db = _load_database()
-    
-    if link_id not in db:
+    link = get_cached_link(link_id)
+    if link is MISS:
+        link = load_link(link_id)
+    return link
+
+
+def get_cached_link(link_id: str):
+    """
+    get_link() answered from the cache only, never touching the store
+
+    Returns MISS when the store would have to be read; the async API
+    then runs load_link() off the event loop.
+    """
+    link = _cache.get(link_id)
+    if link is MISS or link is None:
+        return link
+    # Copy so callers can't modify the cached record
+    return _with_pending_clicks(link_id, dict(link))
+
+
+def is_closed(link) -> bool:
+    """True for a link that was paid or expired; those never become payable again"""
+    return bool(link) and link['status'] in ARCHIVED_STATUSES
+
+
+@timed('storage', 'get_link_for_payment')
+def get_link_for_payment(link_id: str):
+    """
+    get_link() for deciding whether a link can still be paid
+
+    Cache invalidation only reaches this process, so a cached open link
+    may have been confirmed or expired by another worker up to CACHE_TTL
+    ago. Only closed links are answered from the cache; anything else is
+    read from the store.
+    """
+    link = get_cached_link(link_id)
+    if not is_closed(link):
+        link = load_link(link_id)
+    return link
+
+
+@timed('storage', 'load_link')
+def load_link(link_id: str):
+    """Read a link from the store and cache it (the miss half of get_link)"""
+    generation = _cache.generation()
+    link = _get_store().get(link_id)
+    if link is None and _archive is not None:
+        link = _archive.get(link_id)
+    _cache.put(link_id, link, generation)
+    if link is None:
         return None
-    
-    return db[link_id]
+    return _with_pending_clicks(link_id, dict(link))
 
 
+@timed('storage', 'update_link_status')
 def update_link_status(link_id: str, status: str, txid: str = None):
     """Update link status after transaction"""
-    db = _load_database()
-    
-    if link_id in db:
-        db[link_id]['status'] = status
-        if txid:
-            db[link_id]['txid'] = txid
-            db[link_id]['txn_timestamp'] = datetime.now().isoformat()
-    
-    _save_database(db)
+    fields = {'status': status}
+    if txid:
+        fields['txid'] = txid
+        fields['txn_timestamp'] = datetime.now().isoformat()
+
+    # The watcher and the payment indexer can both confirm the same link;
+    # only the first confirmation is written and announced
+    with _status_lock:
+        link = get_link(link_id)
+        if link is None or (link['status'] == status and (not txid or link['txid'] == txid)):
+            return
+
+        # An archived link (say, paid after it expired) comes back to life
+        if _get_store().update(link_id, fields) or _restore(link_id, fields):
+            _cache.invalidate(link_id)
+            _notify('updated', link_id, {**fields, 'receiver': link['receiver'],
+                                         'amount_micro': link['amount_micro']})
+
+
+@timed('storage', 'increment_click_count')
+def increment_click_count(link_id: str, receiver: str = None):
+    """Track how many times a link was clicked (written in batches)"""
+    _clicks.add(link_id)
+    _notify('clicked', link_id, {'receiver': receiver} if receiver else None)
+
 
+@timed('storage', 'flush_click_counts')
+def flush_click_counts():
+    """Write pending click counts to the store now"""
+    _clicks.flush()
 
-def increment_click_count(link_id: str):
-    """Track how many times a link was clicked"""
-    db = _load_database()
-    
-    if link_id in db:
-        db[link_id]['click_count'] = db[link_id].get('click_count', 0) + 1
-    
-    _save_database(db)
 
+def cache_stats():
+    """Hit/miss/eviction counters for the get_link cache"""
+    return _cache.stats()
 
-def list_links():
-    """Get all links (for debugging)"""
-    return _load_database()
+
+def _cache_metrics():
+    stats = _cache.stats()
+    return {
+        'checkout_link_cache_hits_total': stats['hits'],
+        'checkout_link_cache_misses_total': stats['misses'],
+        'checkout_link_cache_evictions_total': stats['evictions'],
+        'checkout_link_cache_expirations_total': stats['expirations'],
+        'checkout_link_cache_size': stats['size'],
+        'checkout_link_cache_hit_ratio': stats['hit_rate']
+    }
+
+
+register_gauges(_cache_metrics)
+
+
+def _log_metrics():
+    if not isinstance(_store, LinkLogStore):
+        return {}
+    stats = _store.sync_stats()
+    return {
+        'checkout_link_log_durable_writes_total': stats['writes'],
+        'checkout_link_log_fsyncs_total': stats['syncs']
+    }
+
+
+register_gauges(_log_metrics)
+
+
+def _tier_metrics():
+    return {
+        'checkout_links_expired_total': _reaper.expired,
+        'checkout_links_archived_total': _mover.moved
+    }
 
 
+register_gauges(_tier_metrics)
+
+
+@timed('storage', 'list_links')
+def list_links(include_archived: bool = False):
+    """
+    Get all live links (for debugging)
+
+    include_archived also reads the whole archive; archived copies of
+    links that are live again are overridden by the live record.
+    """
+    found = {}
+    store = _get_store()
+    if include_archived and _archive is not None:
+        found.update(_archive.all())
+    for link_id, link in store.all().items():
+        found[link_id] = _with_pending_clicks(link_id, link)
+    return found
+
+
+@timed('storage', 'list_links_page')
+def list_links_page(receiver: str = None, status: str = None, created_from: str = None,
+                    created_to: str = None, after: tuple = None, limit: int = 50):
+    """
+    One page of live links, newest first, from the store's secondary
+    indexes (archived links are only reachable by link_id)
+
+    Args:
+        receiver, status: Exact-match filters
+        created_from, created_to: ISO timestamps; from inclusive, to exclusive
+        after: (created, link_id) of the last link on the previous page
+        limit: Page size
+
+    Returns:
+        (links, next_after): list of link dicts (with link_id), and the
+        cursor for the following page or None on the last page
+    """
+    rows = _get_store().page(receiver, status, created_from, created_to, after, limit + 1)
+    more = len(rows) > limit
+    page = []
+    for link_id, link in rows[:limit]:
+        page.append({'link_id': link_id, **_with_pending_clicks(link_id, link)})
+    next_after = (page[-1]['created'], page[-1]['link_id']) if more else None
+    return page, next_after
+
+
+@timed('storage', 'delete_link')
 def delete_link(link_id: str):
     """Delete a link"""
-    db = _load_database()
-    
-    if link_id in db:
-        del db[link_id]
-        _save_database(db)
-        return True
-    
-    return False
\ No newline at end of file
+    _clicks.discard(link_id)
+    deleted = _get_store().delete(link_id)
+    if _archive is not None:
+        deleted = _archive.delete(link_id) or deleted
+    _cache.invalidate(link_id)
+    if deleted:
+        _notify('deleted', link_id, None)
+    return deleted
\ No newline at end of file
@@ -0,0 +1,720 @@
+# ============================================
+# FILE: backend/database/log_store.py
+# ============================================
+"""
+Append-only log storage engine for checkout links
+
+Every write appends one record to the log file, and an in-memory hash
+index maps each link_id to the offset of its latest record. Point reads
+and updates therefore cost the same no matter how many links exist.
+Secondary indexes (link_index.py) keep links ordered by creation time
+overall, per receiver and per status for paginated listing, and a heap
+of (expires_at, link_id) over unused links with an expiry lets
+expire_due() find due links without scanning the rest.
+
+Record format (binary, little-endian):
+    B  0xa7 marker
+    I  crc32 of the length and body
+    I  body length
+    body: B op (0 put, 1 delete), B id length, id, record (puts only)
+
+Records are encoded by link_record.py. The checksum lets recovery tell
+a torn write at the tail of the log (crash mid-append) from a valid
+record. Logs written before the binary format hold text lines,
+    <crc32 as 8 hex chars> <json payload>\n
+with payload {"op": "put", "id": ..., "rec": {...}} or {"op": "del",
+"id": ...}; these are still read, and compaction rewrites them as
+binary records.
+
+Several worker processes can share one log. Writers take an advisory
+flock on <log>.lock, first read any records other processes appended
+since they last looked (or rescan, if another process compacted the
+log into a new file), then append. Reads pick up other processes'
+appends the same way without taking the lock; they only ever consume
+complete, checksummed records.
+
+Appends reach the disk through group commit: a writer returns once an
+fdatasync covering its record has finished, and every writer that
+finished while one fdatasync was running shares the next one.
+"""
+
+import heapq
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:     # not available on Windows: single process only
+    fcntl = None
+
+from backend.database.link_index import IndexEntry, SecondaryIndex
+from backend.database.link_record import (
+    STATUS_CODES, created_key, decode_record, encode_record, from_epoch_us, index_fields,
+    peek_index_fields, to_epoch_us, upgrade_record
+)
+
+# Compact once dead records take up this many bytes AND outweigh live ones
+COMPACT_MIN_BYTES = int(os.getenv('LINKS_COMPACT_MIN_BYTES', 4 * 1024 * 1024))
+
+# 'group' waits for an fdatasync shared with concurrent writers; 'off'
+# leaves flushing to the OS (a crash of the machine can lose recent writes)
+FSYNC_MODE = os.getenv('LINKS_FSYNC', 'group')
+
+# Extra time a group commit leader waits for more writers to join
+FSYNC_WINDOW = float(os.getenv('LINKS_FSYNC_WINDOW_MS', 0)) / 1000
+
+
+class CorruptRecordError(Exception):
+    """Raised when a log record fails its checksum or cannot be parsed"""
+
+
+_MARKER = 0xa7
+_FRAME = struct.Struct('<BII')
+_OPS = ('put', 'del')
+_OP_CODES = {'put': 0, 'del': 1}
+_HEX_DIGITS = frozenset(b'0123456789abcdef')
+
+# A length beyond this is a damaged header, not a record
+MAX_RECORD_BYTES = 1024 * 1024
+
+# How much of the log recovery reads at a time
+_SCAN_CHUNK = 1024 * 1024
+
+_UNUSED = STATUS_CODES['unused']
+
+
+def _encode_record(payload: dict) -> bytes:
+    link_id = payload['id'].encode('utf-8')
+    body = bytes((_OP_CODES[payload['op']], len(link_id))) + link_id
+    if payload['op'] == 'put':
+        body += encode_record(payload['rec'])
+    length = struct.pack('<I', len(body))
+    return _FRAME.pack(_MARKER, zlib.crc32(body, zlib.crc32(length)), len(body)) + body
+
+
+def _split_body(body) -> tuple:
+    """(op, link_id, record bytes) of a checked binary record body"""
+    id_end = 2 + body[1]
+    return _OPS[body[0]], bytes(body[2:id_end]).decode('utf-8'), body[id_end:]
+
+
+def _decode_text_record(line: bytes) -> dict:
+    """Payload of one line from a log written before the binary format"""
+    if len(line) < 10 or line[8:9] != b' ' or not line.endswith(b'\n'):
+        raise CorruptRecordError('Malformed record')
+    body = line[9:-1]
+    try:
+        crc = int(line[:8], 16)
+    except ValueError:
+        raise CorruptRecordError('Malformed checksum')
+    if zlib.crc32(body) != crc:
+        raise CorruptRecordError('Checksum mismatch')
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise CorruptRecordError('Invalid JSON payload')
+    if isinstance(payload, dict) and isinstance(payload.get('rec'), dict):
+        payload['rec'] = upgrade_record(payload['rec'])
+    return payload
+
+
+def _decode_record(data: bytes) -> dict:
+    """{'op', 'id', 'rec'} from one whole record, binary or text"""
+    if data[0] != _MARKER:
+        return _decode_text_record(data)
+    op, link_id, record = _split_body(memoryview(data)[_FRAME.size:])
+    return {'op': op, 'id': link_id, 'rec': decode_record(record) if op == 'put' else None}
+
+
+# _parse() length when the record runs past the end of the buffer
+_NEED_MORE = -1
+
+
+def _parse(buf: bytes, pos: int, eof: bool) -> tuple:
+    """
+    (length, payload) of the record starting at buf[pos]
+
+    payload is (op, link_id, index fields), or None for a damaged
+    stretch, whose length then runs to the next place a record could
+    start.
+    """
+    first = buf[pos]
+    if first == _MARKER:
+        if len(buf) - pos < _FRAME.size:
+            return _NEED_MORE, None
+        _, crc, size = _FRAME.unpack_from(buf, pos)
+        end = pos + _FRAME.size + size
+        if size <= MAX_RECORD_BYTES:
+            if end > len(buf):
+                return _NEED_MORE, None
+            body = memoryview(buf)[pos + _FRAME.size:end]
+            if zlib.crc32(body, zlib.crc32(buf[pos + 5:pos + 9])) == crc:
+                op, link_id, record = _split_body(body)
+                return end - pos, (op, link_id, peek_index_fields(record) if op == 'put' else None)
+
+    elif first in _HEX_DIGITS:
+        newline = buf.find(b'\n', pos)
+        if newline < 0:
+            return _NEED_MORE, None
+        try:
+            payload = _decode_text_record(buf[pos:newline + 1])
+            fields = index_fields(payload['rec']) if payload['op'] == 'put' else None
+            return newline + 1 - pos, (payload['op'], payload['id'], fields)
+        except (CorruptRecordError, KeyError, TypeError):
+            pass
+
+    start = _next_start(buf, pos)
+    if start == len(buf) and not eof:
+        return _NEED_MORE, None
+    return start - pos, None
+
+
+def _next_start(buf: bytes, pos: int) -> int:
+    """Where the next record could start after pos: a marker or a line start"""
+    marker = buf.find(b'\xa7', pos + 1)
+    newline = buf.find(b'\n', pos)
+    starts = [i for i in (marker, newline + 1 if newline >= 0 else -1) if 0 <= i]
+    return min(starts) if starts else len(buf)
+
+
+def _next_record(buf: bytes, pos: int):
+    """
+    Distance from buf[pos] to the next intact record, or None if there
+    is none: an unfinished record at the very end is a torn write (or
+    another process mid-append), while one followed by intact records
+    has a damaged length
+    """
+    start = pos
+    while True:
+        start = _next_start(buf, start)
+        if start >= len(buf):
+            return None
+        length, payload = _parse(buf, start, True)
+        if payload is not None:
+            return start - pos
+
+
+class GroupCommit:
+    """
+    Shares one fdatasync between all writes that are waiting for one
+
+    Writes are numbered in the order they were appended. The first
+    writer to wait becomes the leader and syncs everything appended so
+    far; writers arriving meanwhile wait for the leader, and one of them
+    leads the next sync for the whole batch.
+    """
+
+    def __init__(self, sync, window: float = FSYNC_WINDOW):
+        self._sync = sync           # () -> number of the last write it covered
+        self._window = window
+        self._cond = threading.Condition()
+        self._synced = 0
+        self._syncing = False
+        self.syncs = 0
+        self.writes = 0
+
+    def wait(self, seq: int):
+        """Return once write number seq is on disk"""
+        with self._cond:
+            self.writes += 1
+            while self._synced < seq:
+                if self._syncing:
+                    self._cond.wait()
+                    continue
+                self._syncing = True
+                self._cond.release()
+                try:
+                    if self._window:
+                        time.sleep(self._window)
+                    covered = self._sync()
+                finally:
+                    self._cond.acquire()
+                    self._syncing = False
+                    self._cond.notify_all()
+                self._synced = max(self._synced, covered)
+                self.syncs += 1
+
+    def mark_synced(self, seq: int):
+        """Everything up to seq reached the disk some other way (compaction)"""
+        with self._cond:
+            self._synced = max(self._synced, seq)
+            self._cond.notify_all()
+
+
+class LinkLogStore:
+    """Append-only record log with an in-memory link_id -> IndexEntry index"""
+
+    def __init__(self, path: str, legacy_json_path: str = None, fsync: str = FSYNC_MODE):
+        self.path = path
+        self._lock = threading.RLock()
+        self._index = {}        # link_id -> IndexEntry
+        self._secondary = SecondaryIndex(self._index)
+        self._expires = {}      # link_id -> expires_at (epoch us), unused links only
+        self._expiry = []       # heap of (expires_at, link_id); stale pairs are skipped
+        self._live_bytes = 0
+        self._dead_bytes = 0
+        self._fd = None
+        self._inode = None
+        self._end = 0           # offset just past the last record read or written
+        self._seq = 0           # number of appends made by this process
+        self._lock_depth = 0
+        self._indexing = True   # False while a full scan defers the secondary indexes
+        self._commit = GroupCommit(self._sync) if fsync == 'group' else None
+
+        self._lock_fd = os.open(path + '.lock', os.O_RDWR | os.O_CREAT, 0o644)
+        with self._locked():
+            # Under the lock, so only the first of several workers imports.
+            # The marker, not an empty index, says whether that happened:
+            # a log emptied later by deletes or archiving must stay empty
+            marker = path + '.imported'
+            if legacy_json_path and not os.path.exists(marker):
+                if not self._index and os.path.exists(legacy_json_path):
+                    self._import_legacy(legacy_json_path)
+                _write_marker(marker)
+
+    # ---------- file handling ----------
+
+    def _open(self):
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        self._inode = os.fstat(self._fd).st_ino
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive access across threads and processes, with the index up to date"""
+        with self._lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                if self._lock_depth == 1:
+                    self._follow(locked=True)
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and fcntl is not None:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _follow(self, locked: bool = False):
+        """Read records other processes appended, or rescan after they compacted"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            # Deleted under us: start a new log
+            st = None
+        if self._fd is None or st is None or st.st_ino != self._inode:
+            if self._fd is not None:
+                os.close(self._fd)
+            self._open()
+            self._recover(locked)
+        elif st.st_size > self._end:
+            self._scan(self._end, locked)
+
+    def _recover(self, locked: bool):
+        """Rebuild the index by scanning the whole log"""
+        self._index.clear()
+        self._secondary.clear()
+        self._expires.clear()
+        self._live_bytes = 0
+        self._dead_bytes = 0
+        self._end = 0
+        # One sort at the end instead of a bisect per record
+        self._indexing = False
+        try:
+            self._scan(0, locked)
+        finally:
+            self._indexing = True
+            self._secondary.rebuild()
+            self._rebuild_expiry()
+
+    def _scan(self, offset: int, locked: bool):
+        """Apply complete records from offset to the end of the file"""
+        # Through our own descriptor, so a compaction that swaps the file
+        # mid-scan can't mix the two files' offsets
+        with open(os.dup(self._fd), 'rb') as f:
+            f.seek(offset)
+            buf, pos, eof = b'', 0, False
+            while True:
+                length, payload = _parse(buf, pos, eof) if pos < len(buf) else (_NEED_MORE, None)
+                if length == _NEED_MORE:
+                    if not eof:
+                        chunk = f.read(_SCAN_CHUNK)
+                        eof = not chunk
+                        buf, offset, pos = buf[pos:] + chunk, offset + pos, 0
+                        continue
+                    skip = _next_record(buf, pos) if pos < len(buf) else None
+                    if skip is None:
+                        # Torn write at the tail, or another process mid-append
+                        break
+                    length = skip
+
+                if payload is None:
+                    # Damaged record in the middle: skip it, keep the rest
+                    self._dead_bytes += length
+                else:
+                    self._apply(payload[0], payload[1], offset + pos, length, payload[2])
+                pos += length
+        self._end = offset + pos
+
+        # Holding the lock, nobody else is appending: a partial record at
+        # the tail is a crashed write and is cut off before the next append
+        if locked and os.fstat(self._fd).st_size > self._end:
+            os.truncate(self.path, self._end)
+
+    def _apply(self, op: str, link_id: str, offset: int, length: int, fields: tuple = None):
+        """fields is (created, receiver, status, expires_at) for a put, see link_record.index_fields"""
+        previous = self._index.get(link_id)
+        if previous is not None:
+            self._live_bytes -= previous.length
+            self._dead_bytes += previous.length
+
+        if op == 'put':
+            created, receiver, status, expires_at = fields
+            self._track_expiry(link_id, expires_at if status == _UNUSED else None)
+            self._live_bytes += length
+            entry = IndexEntry(offset, length, created, receiver, status)
+            if previous is not None:
+                if previous.same_keys(entry):
+                    # Click counts and the like: only the position moves
+                    previous.offset = offset
+                    previous.length = length
+                    return
+                if self._indexing:
+                    self._secondary.remove(link_id, previous)
+            self._index[link_id] = entry
+            if self._indexing:
+                self._secondary.add(link_id, entry)
+        else:
+            # Tombstones are dead as soon as they are written
+            self._dead_bytes += length
+            self._track_expiry(link_id, None)
+            if previous is not None:
+                if self._indexing:
+                    self._secondary.remove(link_id, previous)
+                del self._index[link_id]
+
+    def _track_expiry(self, link_id: str, expires_at):
+        """expires_at of an unused link, or None once it can no longer expire"""
+        if expires_at is None:
+            self._expires.pop(link_id, None)
+        elif self._expires.get(link_id) != expires_at:
+            self._expires[link_id] = expires_at
+            if self._indexing:
+                heapq.heappush(self._expiry, (expires_at, link_id))
+
+    def _rebuild_expiry(self):
+        self._expiry = [(expires_at, link_id) for link_id, expires_at in self._expires.items()]
+        heapq.heapify(self._expiry)
+
+    def _next_expiry(self):
+        """Drop stale pairs off the heap; returns the live head or None"""
+        heap = self._expiry
+        # Links that were paid or deleted leave their pair behind; rebuild
+        # once those outnumber the live ones so the heap stays O(open links)
+        if len(heap) > 2 * len(self._expires) + 1024:
+            self._rebuild_expiry()
+            heap = self._expiry
+        while heap:
+            expires_at, link_id = heap[0]
+            if self._expires.get(link_id) == expires_at:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def _append(self, payloads: list) -> int:
+        """Append records in one write and update the index; returns the write number"""
+        chunks = [_encode_record(p) for p in payloads]
+        offset = self._end
+        data = b''.join(chunks)
+        written = os.write(self._fd, data)
+        if written != len(data):
+            # Disk full or similar: drop the partial record rather than
+            # leave it for the next append to land behind
+            os.truncate(self.path, offset)
+            raise OSError(f'Short write to {self.path}: {written} of {len(data)} bytes')
+
+        for payload, chunk in zip(payloads, chunks):
+            fields = index_fields(payload['rec']) if payload['op'] == 'put' else None
+            self._apply(payload['op'], payload['id'], offset, len(chunk), fields)
+            offset += len(chunk)
+        self._end = offset
+        self._seq += 1
+        seq = self._seq
+
+        self._maybe_compact()
+        return seq
+
+    def _sync(self) -> int:
+        """fdatasync the log; returns the number of the last write covered"""
+        with self._lock:
+            seq = self._seq
+            # A compaction may swap the file while we sync: keep our own fd
+            fd = os.dup(self._fd)
+        try:
+            os.fdatasync(fd)
+        finally:
+            os.close(fd)
+        return seq
+
+    def _durable(self, seq: int):
+        """Wait until write number seq is on disk (group commit)"""
+        if self._commit is not None and seq:
+            self._commit.wait(seq)
+
+    def sync_stats(self) -> dict:
+        """Writes made durable and the fdatasync calls it took"""
+        if self._commit is None:
+            return {'writes': 0, 'syncs': 0}
+        return {'writes': self._commit.writes, 'syncs': self._commit.syncs}
+
+    def _read(self, link_id: str):
+        entry = self._index.get(link_id)
+        if entry is None:
+            return None
+        return _decode_record(os.pread(self._fd, entry.length, entry.offset))['rec']
+
+    def _import_legacy(self, legacy_json_path: str):
+        """One-time import of the old whole-file JSON database"""
+        with open(legacy_json_path, 'r') as f:
+            data = json.load(f)
+        if data:
+            self._durable(self._append([{'op': 'put', 'id': link_id, 'rec': upgrade_record(record)}
+                                        for link_id, record in data.items()]))
+
+    # ---------- compaction ----------
+
+    def _maybe_compact(self):
+        if self._dead_bytes >= COMPACT_MIN_BYTES and self._dead_bytes > self._live_bytes:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the log with only the latest record of each live link"""
+        with self._locked():
+            tmp_path = self.path + '.compact'
+            placed = []
+            offset = 0
+            with open(tmp_path, 'wb') as out:
+                for entry in self._index.values():
+                    data = os.pread(self._fd, entry.length, entry.offset)
+                    if data[0] != _MARKER:
+                        # Text record from before the binary format
+                        data = _encode_record(_decode_text_record(data))
+                    out.write(data)
+                    placed.append((entry, offset, len(data)))
+                    offset += len(data)
+                out.flush()
+                os.fsync(out.fileno())
+
+            os.replace(tmp_path, self.path)
+            _fsync_dir(self.path)
+
+            os.close(self._fd)
+            self._open()
+            for entry, new_offset, length in placed:
+                entry.offset = new_offset
+                entry.length = length
+            self._live_bytes = offset
+            self._dead_bytes = 0
+            self._end = offset
+            # The new file was fsynced whole before the rename
+            if self._commit is not None:
+                self._commit.mark_synced(self._seq)
+
+    # ---------- public API ----------
+
+    def get(self, link_id: str):
+        with self._lock:
+            self._follow()
+            return self._read(link_id)
+
+    def contains(self, link_id: str) -> bool:
+        with self._lock:
+            self._follow()
+            return link_id in self._index
+
+    def put(self, link_id: str, record: dict):
+        with self._locked():
+            seq = self._append([{'op': 'put', 'id': link_id, 'rec': record}])
+        self._durable(seq)
+
+    def put_new(self, link_id: str, record: dict) -> bool:
+        """Write the record only if link_id is unused (in any process); returns False if taken"""
+        with self._locked():
+            if link_id in self._index:
+                return False
+            seq = self._append([{'op': 'put', 'id': link_id, 'rec': record}])
+        self._durable(seq)
+        return True
+
+    def put_many(self, records: dict, replace: bool = True) -> list:
+        """
+        Write many records with a single append
+
+        With replace=False existing link_ids are left alone; returns
+        the link_ids that were skipped.
+        """
+        seq = 0
+        with self._locked():
+            payloads, skipped = [], []
+            for link_id, record in records.items():
+                if replace or link_id not in self._index:
+                    payloads.append({'op': 'put', 'id': link_id, 'rec': record})
+                else:
+                    skipped.append(link_id)
+            if payloads:
+                seq = self._append(payloads)
+        self._durable(seq)
+        return skipped
+
+    def update(self, link_id: str, fields: dict) -> bool:
+        """Merge fields into an existing record; returns False if missing"""
+        with self._locked():
+            record = self._read(link_id)
+            if record is None:
+                return False
+            record.update(fields)
+            seq = self._append([{'op': 'put', 'id': link_id, 'rec': record}])
+        self._durable(seq)
+        return True
+
+    def increment(self, link_id: str, field: str, delta: int = 1) -> bool:
+        """Atomically add delta to a numeric field"""
+        with self._locked():
+            record = self._read(link_id)
+            if record is None:
+                return False
+            record[field] = record.get(field, 0) + delta
+            seq = self._append([{'op': 'put', 'id': link_id, 'rec': record}])
+        self._durable(seq)
+        return True
+
+    def increment_many(self, field: str, deltas: dict):
+        """Apply many increments with a single append; unknown links are skipped"""
+        seq = 0
+        with self._locked():
+            payloads = []
+            for link_id, delta in deltas.items():
+                record = self._read(link_id)
+                if record is not None:
+                    record[field] = record.get(field, 0) + delta
+                    payloads.append({'op': 'put', 'id': link_id, 'rec': record})
+            if payloads:
+                seq = self._append(payloads)
+        self._durable(seq)
+
+    def delete(self, link_id: str) -> bool:
+        with self._locked():
+            if link_id not in self._index:
+                return False
+            seq = self._append([{'op': 'del', 'id': link_id}])
+        self._durable(seq)
+        return True
+
+    def delete_unchanged(self, records: dict) -> list:
+        """
+        Delete, with one append, each link whose stored record still
+        equals the given one; returns the link_ids deleted
+        """
+        seq = 0
+        with self._locked():
+            deleted = [link_id for link_id, record in records.items()
+                       if link_id in self._index and self._read(link_id) == record]
+            if deleted:
+                seq = self._append([{'op': 'del', 'id': link_id} for link_id in deleted])
+        self._durable(seq)
+        return deleted
+
+    def expire_due(self, now: str, limit: int = 1000) -> list:
+        """
+        Mark up to limit unused links whose expires_at is at or before
+        now as 'expired', in one append; returns their link_ids
+        """
+        now = to_epoch_us(now)
+        seq = 0
+        with self._locked():
+            payloads = []
+            while len(payloads) < limit:
+                head = self._next_expiry()
+                if head is None or head[0] > now:
+                    break
+                heapq.heappop(self._expiry)
+                record = self._read(head[1])
+                record['status'] = 'expired'
+                payloads.append({'op': 'put', 'id': head[1], 'rec': record})
+            if payloads:
+                seq = self._append(payloads)
+        self._durable(seq)
+        return [payload['id'] for payload in payloads]
+
+    def next_expiry(self):
+        """Earliest expires_at among unused links, or None"""
+        with self._lock:
+            self._follow()
+            head = self._next_expiry()
+            return from_epoch_us(head[0]) if head else None
+
+    def page(self, receiver: str = None, status: str = None, created_from: str = None,
+             created_to: str = None, after: tuple = None, limit: int = 50) -> list:
+        """[(link_id, record)] newest first; see SecondaryIndex.page"""
+        # The indexes hold times as epoch microseconds and statuses as codes
+        if status is not None:
+            status = STATUS_CODES.get(status, status)
+        if created_from is not None:
+            created_from = created_key(created_from)
+        if created_to is not None:
+            created_to = created_key(created_to)
+        if after is not None:
+            after = (created_key(after[0]), after[1])
+        with self._lock:
+            self._follow()
+            link_ids = self._secondary.page(receiver, status, created_from, created_to,
+                                            after, limit)
+            return [(link_id, self._read(link_id)) for link_id in link_ids]
+
+    def all(self) -> dict:
+        with self._lock:
+            self._follow()
+            return {link_id: self._read(link_id) for link_id in self._index}
+
+    def __len__(self):
+        with self._lock:
+            self._follow()
+            return len(self._index)
+
+
+def _write_marker(path: str):
+    """Create an empty file and make it durable"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    _fsync_dir(path)
+
+
+def _fsync_dir(path: str):
+    """Make a rename durable by syncing the containing directory"""
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
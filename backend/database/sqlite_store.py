@@ -0,0 +1,329 @@
+# ============================================
+# FILE: backend/database/sqlite_store.py
+# ============================================
+"""
+SQLite storage engine for checkout links
+
+Selected with LINKS_BACKEND=sqlite. Uses WAL journaling so several
+gunicorn workers can read while one writes, and every write is a single
+statement or an IMMEDIATE transaction, so concurrent workers never lose
+each other's updates.
+
+One-shot migration from the old JSON file:
+    python -m backend.database.sqlite_store migrate links_database.json
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+from backend.database.link_record import upgrade_record
+
+# Columns in the order they are stored; link_id is the primary key
+COLUMNS = (
+    'amount_micro',
+    'receiver',
+    'description',
+    'created',
+    'status',
+    'txid',
+    'txn_timestamp',
+    'click_count',
+    'expires_at',
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS links (
+    link_id       TEXT PRIMARY KEY,
+    amount_micro  INTEGER NOT NULL,
+    receiver      TEXT NOT NULL,
+    description   TEXT NOT NULL DEFAULT '',
+    created       TEXT NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'unused',
+    txid          TEXT,
+    txn_timestamp TEXT,
+    click_count   INTEGER NOT NULL DEFAULT 0,
+    expires_at    TEXT
+) WITHOUT ROWID;
+"""
+
+# Created after _migrate(), which adds columns older databases lack
+_INDEXES = """
+DROP INDEX IF EXISTS idx_links_receiver;
+DROP INDEX IF EXISTS idx_links_status;
+CREATE INDEX IF NOT EXISTS idx_links_receiver_created ON links (receiver, created);
+CREATE INDEX IF NOT EXISTS idx_links_status_created ON links (status, created);
+CREATE INDEX IF NOT EXISTS idx_links_created ON links (created);
+CREATE INDEX IF NOT EXISTS idx_links_open_expiry ON links (expires_at)
+    WHERE status = 'unused' AND expires_at IS NOT NULL;
+"""
+
+# Secondary index entries of a WITHOUT ROWID table end with the primary
+# key, so each index above is really ordered by (..., created, link_id)
+# and serves the keyset pagination in page() without a sort. The partial
+# expiry index holds only open links that can expire, so expire_due()
+# and next_expiry() never touch the rest.
+
+# Statements are constant strings so sqlite3's statement cache reuses
+# the prepared form on every call
+_SELECT_ONE = 'SELECT link_id, %s FROM links WHERE link_id = ?' % ', '.join(COLUMNS)
+_SELECT_ALL = 'SELECT link_id, %s FROM links' % ', '.join(COLUMNS)
+_EXISTS = 'SELECT 1 FROM links WHERE link_id = ?'
+_INSERT = 'INSERT OR REPLACE INTO links (link_id, %s) VALUES (?, %s)' % (
+    ', '.join(COLUMNS), ', '.join('?' * len(COLUMNS)))
+_INSERT_IGNORE = _INSERT.replace('OR REPLACE', 'OR IGNORE')
+_INCREMENT = 'UPDATE links SET click_count = click_count + ? WHERE link_id = ?'
+_DELETE = 'DELETE FROM links WHERE link_id = ?'
+_COUNT = 'SELECT COUNT(*) FROM links'
+# INDEXED BY: without ANALYZE statistics the planner would rather walk
+# idx_links_status_created, i.e. every unused link
+_DUE = ("SELECT link_id FROM links INDEXED BY idx_links_open_expiry "
+        "WHERE status = 'unused' AND expires_at <= ? ORDER BY expires_at LIMIT ?")
+_EXPIRE = "UPDATE links SET status = 'expired' WHERE link_id = ?"
+_NEXT_EXPIRY = ("SELECT expires_at FROM links INDEXED BY idx_links_open_expiry "
+                "WHERE status = 'unused' AND expires_at IS NOT NULL ORDER BY expires_at LIMIT 1")
+
+# page() filters; joined in a fixed order so each combination is one
+# cached statement
+_PAGE_FILTERS = (
+    ('receiver', 'receiver = ?'),
+    ('status', 'status = ?'),
+    ('created_from', 'created >= ?'),
+    ('created_to', 'created < ?'),
+    ('after', '(created, link_id) < (?, ?)'),
+)
+
+
+def _migrate(conn):
+    """
+    Bring an older database up to the current columns: the REAL amount
+    (ALGO) column becomes amount_micro, and expires_at is added
+    """
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        # Checked inside the write lock, so only one process migrates
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(links)')}
+        if 'amount' in columns and 'amount_micro' not in columns:
+            conn.execute('ALTER TABLE links ADD COLUMN amount_micro INTEGER NOT NULL DEFAULT 0')
+            conn.execute('UPDATE links SET amount_micro = CAST(ROUND(amount * 1000000) AS INTEGER)')
+            conn.execute('ALTER TABLE links DROP COLUMN amount')
+        if 'expires_at' not in columns:
+            conn.execute('ALTER TABLE links ADD COLUMN expires_at TEXT')
+        conn.execute('COMMIT')
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def _row_to_record(row) -> dict:
+    return dict(zip(COLUMNS, row[1:]))
+
+
+def _record_to_row(link_id: str, record: dict) -> tuple:
+    return (link_id,) + tuple(
+        record.get(column, 0 if column == 'click_count' else None)
+        for column in COLUMNS
+    )
+
+
+class LinkSQLiteStore:
+    """SQLite-backed link store with one connection per thread"""
+
+    def __init__(self, path: str, legacy_json_path: str = None):
+        self.path = path
+        self._local = threading.local()
+
+        fresh = not os.path.exists(path)
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        _migrate(conn)
+        conn.executescript(_INDEXES)
+
+        if fresh and legacy_json_path and os.path.exists(legacy_json_path):
+            migrate_json(legacy_json_path, self)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit mode; multi-statement writes open their own transaction
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=30000')
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def get(self, link_id: str):
+        row = self._conn().execute(_SELECT_ONE, (link_id,)).fetchone()
+        return _row_to_record(row) if row else None
+
+    def contains(self, link_id: str) -> bool:
+        return self._conn().execute(_EXISTS, (link_id,)).fetchone() is not None
+
+    def put(self, link_id: str, record: dict):
+        self._conn().execute(_INSERT, _record_to_row(link_id, record))
+
+    def put_new(self, link_id: str, record: dict) -> bool:
+        """Insert only if link_id is unused (across all processes); returns False if taken"""
+        cursor = self._conn().execute(_INSERT_IGNORE, _record_to_row(link_id, record))
+        return cursor.rowcount > 0
+
+    def put_many(self, records: dict, replace: bool = True) -> list:
+        """
+        Write many records in one transaction
+
+        With replace=False existing link_ids are left alone; returns
+        the link_ids that were skipped.
+        """
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if replace:
+                conn.executemany(_INSERT, (_record_to_row(link_id, record)
+                                           for link_id, record in records.items()))
+                skipped = []
+            else:
+                skipped = [
+                    link_id for link_id, record in records.items()
+                    if conn.execute(_INSERT_IGNORE, _record_to_row(link_id, record)).rowcount == 0
+                ]
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return skipped
+
+    def update(self, link_id: str, fields: dict) -> bool:
+        """Merge fields into an existing record; returns False if missing"""
+        fields = {k: v for k, v in fields.items() if k in COLUMNS}
+        if not fields:
+            return self.contains(link_id)
+        # Column names come from COLUMNS, never from callers
+        sql = 'UPDATE links SET %s WHERE link_id = ?' % ', '.join(
+            '%s = ?' % column for column in fields)
+        cursor = self._conn().execute(sql, tuple(fields.values()) + (link_id,))
+        return cursor.rowcount > 0
+
+    def increment(self, link_id: str, field: str, delta: int = 1) -> bool:
+        """Atomically add delta to the click counter"""
+        if field != 'click_count':
+            raise ValueError(f'Cannot increment {field}')
+        return self._conn().execute(_INCREMENT, (delta, link_id)).rowcount > 0
+
+    def increment_many(self, field: str, deltas: dict):
+        """Apply many click increments in one transaction"""
+        if field != 'click_count':
+            raise ValueError(f'Cannot increment {field}')
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(_INCREMENT, ((delta, link_id) for link_id, delta in deltas.items()))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def delete(self, link_id: str) -> bool:
+        return self._conn().execute(_DELETE, (link_id,)).rowcount > 0
+
+    def delete_unchanged(self, records: dict) -> list:
+        """
+        Delete, in one transaction, each link whose stored record still
+        equals the given one; returns the link_ids deleted
+        """
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            deleted = []
+            for link_id, record in records.items():
+                row = conn.execute(_SELECT_ONE, (link_id,)).fetchone()
+                if row is not None and _row_to_record(row) == record:
+                    conn.execute(_DELETE, (link_id,))
+                    deleted.append(link_id)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return deleted
+
+    def expire_due(self, now: str, limit: int = 1000) -> list:
+        """
+        Mark up to limit unused links whose expires_at is at or before
+        now as 'expired', in one transaction; returns their link_ids
+        """
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            link_ids = [row[0] for row in conn.execute(_DUE, (now, limit))]
+            conn.executemany(_EXPIRE, ((link_id,) for link_id in link_ids))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return link_ids
+
+    def next_expiry(self):
+        """Earliest expires_at among unused links, or None"""
+        row = self._conn().execute(_NEXT_EXPIRY).fetchone()
+        return row[0] if row else None
+
+    def page(self, receiver: str = None, status: str = None, created_from: str = None,
+             created_to: str = None, after: tuple = None, limit: int = 50) -> list:
+        """[(link_id, record)] newest first, after the (created, link_id) cursor"""
+        given = {'receiver': receiver, 'status': status, 'created_from': created_from,
+                 'created_to': created_to, 'after': after}
+        clauses, params = [], []
+        for name, clause in _PAGE_FILTERS:
+            value = given[name]
+            if value is None:
+                continue
+            clauses.append(clause)
+            params.extend(value if name == 'after' else (value,))
+        sql = _SELECT_ALL
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY created DESC, link_id DESC LIMIT ?'
+        rows = self._conn().execute(sql, tuple(params) + (limit,)).fetchall()
+        return [(row[0], _row_to_record(row)) for row in rows]
+
+    def all(self) -> dict:
+        return {row[0]: _row_to_record(row) for row in self._conn().execute(_SELECT_ALL)}
+
+    def __len__(self):
+        return self._conn().execute(_COUNT).fetchone()[0]
+
+
+def migrate_json(json_path: str, store: LinkSQLiteStore) -> int:
+    """
+    Copy every link from the old JSON database into SQLite
+
+    Links that already exist in SQLite are left untouched, so the
+    migration is safe to run more than once.
+
+    Returns:
+        Number of links read from the JSON file
+    """
+    with open(json_path, 'r') as f:
+        data = json.load(f)
+    store.put_many({link_id: upgrade_record(record) for link_id, record in data.items()},
+                   replace=False)
+    return len(data)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3 or sys.argv[1] != 'migrate':
+        print('Usage: python -m backend.database.sqlite_store migrate <links_database.json>')
+        sys.exit(1)
+
+    from backend.database.links import SQLITE_FILE
+    count = migrate_json(sys.argv[2], LinkSQLiteStore(SQLITE_FILE))
+    print(f"✅ Migrated {count} links into {SQLITE_FILE}")
@@ -0,0 +1,111 @@
+# ============================================
+# FILE: backend/routes/analytics.py
+# ============================================
+"""
+Route: GET /api/merchants/:receiver/summary
+Route: GET /api/analytics
+
+Link counts, conversion and confirmed volume per merchant and over time
+Answered from the rollups in database/analytics.py
+"""
+
+from datetime import datetime
+
+from flask import Blueprint, request, jsonify
+from backend.database.analytics import analytics_series, merchant_summary
+from backend.utils.algorand import is_valid_address
+
+analytics_bp = Blueprint('analytics', __name__)
+
+
+@analytics_bp.route('/api/merchants/<receiver>/summary', methods=['GET'])
+def get_merchant_summary(receiver):
+    """
+    Totals for one receiver address
+
+    Response:
+    {
+        "success": true,
+        "receiver": "5U4DPE...",
+        "total": {"links": 12, "clicks": 40, "confirmed": 9, "conversion": 0.225, "volume_algo": 13.5},
+        "today": {...},
+        "last_24h": {...}
+    }
+    """
+    try:
+        if not is_valid_address(receiver):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid Algorand address format'
+            }), 400
+
+        return jsonify({'success': True, **merchant_summary(receiver)}), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@analytics_bp.route('/api/analytics', methods=['GET'])
+def get_analytics():
+    """
+    Time-bucketed counts for all merchants, or one
+
+    Query params:
+        ?bucket=hour|day (default hour)
+        ?since=2025-10-18T00:00:00 (default: 24 hours / 30 days ago)
+        ?until=2025-10-19T00:00:00 (default: now)
+        ?receiver=5U4DPE... (optional)
+
+    Response:
+    {
+        "success": true,
+        "bucket": "hour",
+        "buckets": [
+            {"start": "2025-10-18T22:00:00", "links": 3, "clicks": 7, "confirmed": 2,
+             "conversion": 0.286, "volume_algo": 3.0}
+        ]
+    }
+    """
+    try:
+        bucket = request.args.get('bucket', 'hour')
+        if bucket not in ('hour', 'day'):
+            return jsonify({
+                'success': False,
+                'error': "bucket must be 'hour' or 'day'"
+            }), 400
+
+        try:
+            since = _parse_time(request.args.get('since'))
+            until = _parse_time(request.args.get('until'))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'since/until must be ISO 8601 timestamps'
+            }), 400
+
+        receiver = request.args.get('receiver')
+        if receiver and not is_valid_address(receiver):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid Algorand address format'
+            }), 400
+
+        return jsonify({
+            'success': True,
+            'bucket': bucket,
+            'receiver': receiver,
+            'buckets': analytics_series(bucket, since, until, receiver)
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value) if value else None
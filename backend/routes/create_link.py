@@ -3,28 +3,72 @@
 # ============================================
 """
 Route: POST /api/create-link
+Route: POST /api/create-links/bulk
 
-Creates a new checkout link that users can share
+Creates new checkout links that users can share
 """
 
-from flask import Blueprint, request, jsonify
-from backend.database.links import create_link
-from backend.utils.algorand import is_valid_address
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from backend.database.links import create_link, create_links
+from backend.utils.algorand import is_valid_address, validate_addresses
+from backend.utils.amounts import MAX_MICROALGOS, algo_to_micro, micro_to_algo
+import json
 import os
 
+# Largest batch accepted by the bulk endpoint
+MAX_BULK_LINKS = int(os.getenv('MAX_BULK_LINKS', 100000))
+
+# Longest expires_in accepted, in seconds
+MAX_EXPIRES_IN = int(os.getenv('MAX_EXPIRES_IN', 365 * 24 * 3600))
+
 create_link_bp = Blueprint('create_link', __name__)
 
 
+def _parse_amount(entry: dict):
+    """
+    Returns (amount_micro, None) or (None, error)
+
+    Takes "amount" in ALGO, or "amount_micro" as an integer.
+    """
+    if 'amount_micro' in entry:
+        amount_micro = entry['amount_micro']
+        if type(amount_micro) is not int:
+            return None, 'amount_micro must be an integer'
+    else:
+        try:
+            amount_micro = algo_to_micro(entry.get('amount'))
+        except ValueError as e:
+            return None, str(e)
+    if amount_micro <= 0:
+        return None, 'Amount must be positive'
+    if amount_micro > MAX_MICROALGOS:
+        return None, 'Amount exceeds the total ALGO supply'
+    return amount_micro, None
+
+
+def _parse_expires_in(entry: dict):
+    """Returns (seconds or None, None) or (None, error)"""
+    expires_in = entry.get('expires_in')
+    if expires_in is None:
+        return None, None
+    if isinstance(expires_in, bool) or not isinstance(expires_in, (int, float)):
+        return None, 'expires_in must be a number of seconds'
+    if not 0 < expires_in <= MAX_EXPIRES_IN:
+        return None, f'expires_in must be between 0 and {MAX_EXPIRES_IN} seconds'
+    return expires_in, None
+
+
 @create_link_bp.route('/api/create-link', methods=['POST'])
 def create_checkout_link():
     """
     Creates a new payment link
     
-    Request body:
+    Request body ("amount" in ALGO, or "amount_micro" in microAlgos):
     {
         "amount": 1.5,
         "receiver_address": "5U4DPE4D5SRTBR36SV2L3MAFZM7VFGN6KQPHKGK4JM7BVGJKMHIKK65I3Y",
-        "description": "optional description"
+        "description": "optional description",
+        "expires_in": 3600 (optional, seconds)
     }
     
     Response:
@@ -32,7 +76,9 @@ def create_checkout_link():
         "success": true,
         "link_id": "abc123xy",
         "amount": 1.5,
-        "checkout_url": "http://localhost:8000?link=abc123xy"
+        "amount_micro": 1500000,
+        "checkout_url": "http://localhost:8000?link=abc123xy",
+        "expires_at": "2025-10-18T23:12:33.440310" (null if it never expires)
     }
     """
     try:
@@ -47,15 +93,22 @@ def create_checkout_link():
             }), 400
         
         # Extract fields
-        amount = data.get('amount')
         receiver_address = data.get('receiver_address')
         description = data.get('description', '')
         
         # Validate amount
-        if amount is None or amount <= 0:
+        amount_micro, error = _parse_amount(data)
+        if error:
             return jsonify({
                 'success': False,
-                'error': 'Amount must be positive'
+                'error': error
+            }), 400
+
+        expires_in, error = _parse_expires_in(data)
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
             }), 400
         
         # Validate receiver address
@@ -72,7 +125,7 @@ def create_checkout_link():
             }), 400
         
         # Create the link in database
-        link_data = create_link(amount, receiver_address, description)
+        link_data = create_link(amount_micro, receiver_address, description, expires_in)
         
         # Build checkout URL
         base_url = os.getenv('BASE_URL', 'http://localhost:8000')
@@ -81,12 +134,145 @@ def create_checkout_link():
         return jsonify({
             'success': True,
             'link_id': link_data['link_id'],
-            'amount': amount,
+            'amount': micro_to_algo(amount_micro),
+            'amount_micro': amount_micro,
             'receiver_address': receiver_address,
             'checkout_url': checkout_url,
-            'created': link_data['created']
+            'created': link_data['created'],
+            'expires_at': link_data['expires_at']
         }), 201
     
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def _read_bulk_entries():
+    """Parse the body as a JSON array or as NDJSON (one object per line)"""
+    if request.mimetype in ('application/x-ndjson', 'application/jsonlines'):
+        entries = []
+        for line in request.stream:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+        return entries
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise ValueError('Body must be a JSON array or NDJSON')
+    return data
+
+
+def _validate_entry(entry, valid_addresses: dict):
+    """Returns ((amount_micro, receiver, description, expires_in), None) or (None, error)"""
+    if not isinstance(entry, dict):
+        return None, 'Entry must be an object'
+
+    amount_micro, error = _parse_amount(entry)
+    if error:
+        return None, error
+
+    expires_in, error = _parse_expires_in(entry)
+    if error:
+        return None, error
+
+    receiver_address = entry.get('receiver_address')
+
+    if not receiver_address:
+        return None, 'Receiver address required'
+
+    if not valid_addresses.get(receiver_address):
+        return None, 'Invalid Algorand address format'
+
+    return (amount_micro, receiver_address, entry.get('description', ''), expires_in), None
+
+
+@create_link_bp.route('/api/create-links/bulk', methods=['POST'])
+def create_checkout_links_bulk():
+    """
+    Creates many payment links at once (e.g. a billing run)
+
+    Request body: JSON array, or NDJSON with
+    Content-Type: application/x-ndjson
+    [
+        {"amount": 1.5, "receiver_address": "5U4D...", "description": "Invoice 1",
+         "expires_in": 86400},
+        ...
+    ]
+
+    All entries are validated first; if any is invalid nothing is
+    created and the response lists every error. Otherwise all links are
+    written in one storage transaction.
+
+    Response (201, streamed NDJSON, one line per link in input order):
+    {"link_id": "abc123xy", "amount": 1.5, "amount_micro": 1500000,
+     "receiver_address": "5U4D...",
+     "checkout_url": "http://localhost:8000?link=abc123xy", "created": "...",
+     "expires_at": "..."}
+    """
+    try:
+        try:
+            entries = _read_bulk_entries()
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+
+        if not entries:
+            return jsonify({
+                'success': False,
+                'error': 'No links provided'
+            }), 400
+
+        if len(entries) > MAX_BULK_LINKS:
+            return jsonify({
+                'success': False,
+                'error': f'At most {MAX_BULK_LINKS} links per request'
+            }), 413
+
+        # Validate everything in one pass before writing anything;
+        # each distinct receiver address is checked only once
+        valid_addresses = validate_addresses(
+            entry.get('receiver_address') for entry in entries
+            if isinstance(entry, dict) and isinstance(entry.get('receiver_address'), str)
+        )
+        valid = []
+        errors = []
+        for index, entry in enumerate(entries):
+            parsed, error = _validate_entry(entry, valid_addresses)
+            if error:
+                errors.append({'index': index, 'error': error})
+            else:
+                valid.append(parsed)
+
+        if errors:
+            return jsonify({
+                'success': False,
+                'error': f'{len(errors)} invalid entries',
+                'errors': errors
+            }), 400
+
+        created = create_links(valid)
+        base_url = os.getenv('BASE_URL', 'http://localhost:8000')
+
+        def generate():
+            for link_data in created:
+                yield json.dumps({
+                    'link_id': link_data['link_id'],
+                    'amount': micro_to_algo(link_data['amount_micro']),
+                    'amount_micro': link_data['amount_micro'],
+                    'receiver_address': link_data['receiver'],
+                    'checkout_url': f"{base_url}?link={link_data['link_id']}",
+                    'created': link_data['created'],
+                    'expires_at': link_data['expires_at']
+                }) + '\n'
+
+        return Response(stream_with_context(generate()), status=201,
+                        mimetype='application/x-ndjson')
+
     except Exception as e:
         return jsonify({
             'success': False,
@@ -0,0 +1,146 @@
+# ============================================
+# FILE: backend/routes/events.py
+# ============================================
+"""
+Route: GET /api/links/:link_id/events
+
+Pushes a link's payment status to the browser as it changes
+(Server-Sent Events), or answers a long-poll once it changes
+Fed by the link event hub (utils/link_events.py); never calls algod
+"""
+
+import os
+import queue
+import time
+
+from flask import Blueprint, Response, request, jsonify
+from backend.database.links import get_link
+from backend.utils.link_events import (
+    SSE_KEEPALIVE, TERMINAL_STATUSES, hub, sse_message, status_event, wants_event_stream
+)
+from backend.routes.verify import WATCHER_FULL, check_txid
+from backend.utils.tx_watcher import WatcherFullError, watcher
+
+# Seconds between keep-alive comments on an idle SSE stream
+SSE_HEARTBEAT = 15
+
+# SSE streams are closed after this long; EventSource reconnects by itself
+SSE_MAX_SECONDS = float(os.getenv('SSE_MAX_SECONDS', 300))
+
+# Long-poll wait (seconds): default and upper bound for ?timeout=
+LONG_POLL_TIMEOUT = 25
+LONG_POLL_MAX_TIMEOUT = 60
+
+events_bp = Blueprint('events', __name__)
+
+
+@events_bp.route('/api/links/<link_id>/events', methods=['GET'])
+def link_events(link_id):
+    """
+    Streams or long-polls the payment status of a link
+
+    Query params:
+        ?txid=ABC123TRANSACTION (optional, watch this transaction for the link)
+        ?mode=sse|poll (default: sse for EventSource clients, else poll)
+        ?since=pending (long-poll: return as soon as the status differs)
+        ?timeout=25 (long-poll: seconds to wait, at most 60)
+
+    SSE:
+        event: status
+        data: {"link_id": "abc123xy", "status": "confirmed", "txid": "ABC123"}
+
+    Long-poll response:
+    {
+        "success": true,
+        "changed": true,
+        "link_id": "abc123xy",
+        "status": "confirmed",
+        "txid": "ABC123"
+    }
+    """
+    events = queue.SimpleQueue()
+    # Watch before reading the link so no change can slip in between
+    hub.watch(link_id, events.put)
+    streaming = False
+    try:
+        link = get_link(link_id)
+
+        if not link:
+            return jsonify({
+                'success': False,
+                'error': 'Checkout link not found'
+            }), 404
+
+        txid = request.args.get('txid')
+        if txid:
+            error = check_txid(txid)
+            if error:
+                return jsonify(error[0]), error[1]
+            try:
+                watcher.register(txid, link_id)
+            except WatcherFullError:
+                return jsonify(WATCHER_FULL[0]), WATCHER_FULL[1]
+
+        current = status_event(link_id, link['status'], link.get('txid'))
+
+        if wants_event_stream(request.headers.get('Accept'), request.args.get('mode')):
+            streaming = True
+            return Response(
+                _stream(link_id, events, current),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
+
+        since = request.args.get('since')
+        try:
+            timeout = min(float(request.args.get('timeout', LONG_POLL_TIMEOUT)),
+                          LONG_POLL_MAX_TIMEOUT)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'timeout must be a number of seconds'
+            }), 400
+
+        if since is None or since != current['status'] or current['status'] in TERMINAL_STATUSES:
+            changed = since is not None and since != current['status']
+            return jsonify({'success': True, 'changed': changed, **current}), 200
+
+        try:
+            event = events.get(timeout=max(0.0, timeout))
+        except queue.Empty:
+            return jsonify({'success': True, 'changed': False, **current}), 200
+        return jsonify({'success': True, 'changed': event['status'] != since, **event}), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+    finally:
+        if not streaming:
+            hub.unwatch(link_id, events.put)
+
+
+def _stream(link_id: str, events, current: dict):
+    """SSE generator; stops at a terminal status or after SSE_MAX_SECONDS"""
+    try:
+        yield sse_message(current)
+        if current['status'] in TERMINAL_STATUSES:
+            return
+
+        deadline = time.monotonic() + SSE_MAX_SECONDS
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                event = events.get(timeout=min(SSE_HEARTBEAT, remaining))
+            except queue.Empty:
+                yield SSE_KEEPALIVE
+                continue
+            yield sse_message(event)
+            if event['status'] in TERMINAL_STATUSES:
+                return
+    finally:
+        hub.unwatch(link_id, events.put)
@@ -0,0 +1,109 @@
+# ============================================
+# FILE: backend/routes/links.py
+# ============================================
+"""
+Route: GET /api/links
+
+Cursor-paginated link listing with receiver/status/time filters
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from flask import Blueprint, request, jsonify
+from backend.database.links import list_links_page
+from backend.utils.amounts import micro_to_algo
+
+# Page size: default and upper bound for ?limit=
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+links_bp = Blueprint('links', __name__)
+
+
+def encode_cursor(after: tuple) -> str:
+    raw = json.dumps(list(after), separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """(created, link_id) from an opaque cursor; raises ValueError if invalid"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created, link_id = json.loads(raw)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(created, str) or not isinstance(link_id, str):
+        raise ValueError('Invalid cursor')
+    return created, link_id
+
+
+@links_bp.route('/api/links', methods=['GET'])
+def get_links():
+    """
+    Lists links, newest first
+
+    Query params:
+        ?receiver=5U4DPE... (optional)
+        ?status=unused|confirmed (optional)
+        ?since=2025-10-18T00:00:00 (optional, created at or after)
+        ?until=2025-10-19T00:00:00 (optional, created before)
+        ?limit=50 (at most 200)
+        ?cursor=... (next_cursor from the previous page)
+
+    Response:
+    {
+        "success": true,
+        "links": [{"link_id": "abc123xy", "amount": 1.5, "amount_micro": 1500000,
+                   "receiver": "5U4D...", ...}],
+        "next_cursor": "WyIyMDI1LTEwLTE4VDIy..." (null on the last page)
+    }
+    """
+    try:
+        try:
+            limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+            since = _iso(request.args.get('since'))
+            until = _iso(request.args.get('until'))
+            cursor = request.args.get('cursor')
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid query parameter: {str(e)}'
+            }), 400
+
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            return jsonify({
+                'success': False,
+                'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'
+            }), 400
+
+        page, next_after = list_links_page(
+            receiver=request.args.get('receiver'),
+            status=request.args.get('status'),
+            created_from=since,
+            created_to=until,
+            after=after,
+            limit=limit
+        )
+
+        for link in page:
+            link['amount'] = micro_to_algo(link['amount_micro'])
+
+        return jsonify({
+            'success': True,
+            'links': page,
+            'next_cursor': encode_cursor(next_after) if next_after else None
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def _iso(value):
+    # Same string form as the stored 'created' timestamps, so they compare in order
+    return datetime.fromisoformat(value).isoformat() if value else None
@@ -8,10 +8,10 @@ Retrieves payment link details and creates transaction
 """
 
 from flask import Blueprint, request, jsonify
-from backend.database.links import get_link, update_link_status, increment_click_count
+from backend.database.links import get_link_for_payment, increment_click_count, is_expired
 from backend.utils.algorand import is_valid_address
-import base64
-import json
+from backend.utils.amounts import micro_to_algo
+from backend.utils.txn_builder import build_payment
 
 pay_bp = Blueprint('pay', __name__)
 
@@ -28,62 +28,103 @@ def get_payment_link(link_id):
     {
         "success": true,
         "amount": 1.5,
+        "amount_micro": 1500000,
         "receiver": "5U4DPE...",
         "sender": "user_address",
-        "deep_link": "algorand://sign?txn=...",
-        "transaction_id": "ABC123"
+        "deep_link": "algorand://send?receiver=...&amount=...",
+        "unsigned_txn": "base64 msgpack, ready for the wallet to sign",
+        "transaction_id": "ABC123",
+        "last_valid": 12346678
     }
     """
     try:
         # Get sender address from query params
         sender_address = request.args.get('user_address')
-        
-        if not sender_address:
-            return jsonify({
-                'success': False,
-                'error': 'user_address query parameter required'
-            }), 400
-        
-        if not is_valid_address(sender_address):
-            return jsonify({
-                'success': False,
-                'error': 'Invalid sender address'
-            }), 400
-        
-        # Look up link from database
-        link_data = get_link(link_id)
-        
-        if not link_data:
-            return jsonify({
-                'success': False,
-                'error': 'Checkout link not found'
-            }), 404
-        
-        if link_data['status'] == 'confirmed':
-            return jsonify({
-                'success': False,
-                'error': 'This link has already been used'
-            }), 410
-        
-        # Track that someone clicked this link
-        increment_click_count(link_id)
-        
-        # For MVP: Return simple transaction details
-        # Later: Build unsigned transaction with smart contract
-        
-        return jsonify({
-            'success': True,
-            'amount': link_data['amount'],
-            'receiver': link_data['receiver'],
-            'sender': sender_address,
-            'link_id': link_id,
-            'description': link_data['description'],
-            'deep_link': f"algorand://send?receiver={link_data['receiver']}&amount={int(link_data['amount'] * 1_000_000)}",
-            'transaction_id': None
-        }), 200
+
+        error = check_sender(sender_address)
+        if error:
+            return jsonify(error[0]), error[1]
+
+        # Look up link from database, never trusting a cached open status
+        body, status = payment_response(link_id, sender_address,
+                                        get_link_for_payment(link_id))
+        return jsonify(body), status
     
     except Exception as e:
         return jsonify({
             'success': False,
             'error': f'Failed to get payment details: {str(e)}'
         }), 500
+
+
+def check_sender(sender_address):
+    """(error body, status) if the sender address is missing or invalid, else None"""
+    if not sender_address:
+        return {
+            'success': False,
+            'error': 'user_address query parameter required'
+        }, 400
+    
+    if not is_valid_address(sender_address):
+        return {
+            'success': False,
+            'error': 'Invalid sender address'
+        }, 400
+    return None
+
+
+def payment_response(link_id: str, sender_address: str, link_data):
+    """
+    (body, status) for a looked-up link
+
+    Shared with the ASGI app, which does the link lookup without blocking.
+    """
+    if not link_data:
+        return {
+            'success': False,
+            'error': 'Checkout link not found'
+        }, 404
+    
+    if link_data['status'] == 'confirmed':
+        return {
+            'success': False,
+            'error': 'This link has already been used'
+        }, 410
+
+    if is_expired(link_data):
+        return {
+            'success': False,
+            'error': 'This link has expired'
+        }, 410
+    
+    # Track that someone clicked this link
+    increment_click_count(link_id, link_data['receiver'])
+    
+    amount_micro = link_data['amount_micro']
+
+    # Build the unsigned payment from cached network params; the deep
+    # link still works if the node is unreachable or an address is a
+    # placeholder that can't be encoded
+    try:
+        txn = build_payment(
+            sender_address,
+            link_data['receiver'],
+            amount_micro,
+            note=f"checkout:{link_id}".encode()
+        )
+    except Exception:
+        txn = {'transaction_id': None, 'unsigned_txn': None, 'last_valid': None}
+    
+    return {
+        'success': True,
+        'amount': micro_to_algo(amount_micro),
+        'amount_micro': amount_micro,
+        'receiver': link_data['receiver'],
+        'sender': sender_address,
+        'link_id': link_id,
+        'description': link_data['description'],
+        'deep_link': f"algorand://send?receiver={link_data['receiver']}&amount={amount_micro}",
+        'unsigned_txn': txn['unsigned_txn'],
+        'transaction_id': txn['transaction_id'],
+        'last_valid': txn['last_valid']
+    }, 200
@@ -5,11 +5,13 @@
 Route: GET /api/verify
 
 Verifies if a transaction was confirmed on blockchain
+Answers come from the background confirmation watcher (utils/tx_watcher.py)
 """
 
 from flask import Blueprint, request, jsonify
-from backend.database.links import get_link, update_link_status
 from backend.utils.algorand import algod_client
+from backend.utils.amounts import micro_to_algo
+from backend.utils.tx_watcher import WatcherFullError, is_valid_txid, watcher
 
 verify_bp = Blueprint('verify', __name__)
 
@@ -28,6 +30,7 @@ def verify_payment():
         "success": true,
         "status": "confirmed",
         "amount": 1.5,
+        "amount_micro": 1500000,
         "sender": "5U4D...",
         "receiver": "RECV...",
         "confirmed_round": 12345678
@@ -38,56 +41,92 @@ def verify_payment():
         txid = request.args.get('txid')
         link_id = request.args.get('link_id')
         
-        if not txid:
-            return jsonify({
-                'success': False,
-                'error': 'txid query parameter required'
-            }), 400
+        error = check_txid(txid)
+        if error:
+            return jsonify(error[0]), error[1]
         
-        # Query blockchain for transaction
+        # Hand the txid to the background watcher and answer from its
+        # result table; this request never waits on algod
         try:
-            pending_txn = algod_client.pending_transaction_info(txid)
-            
-            if pending_txn['confirmed-round'] is not None:
-                # Transaction was confirmed!
-                tx_details = pending_txn['txn']['txn']
-                
-                result = {
-                    'success': True,
-                    'status': 'confirmed',
-                    'confirmed_round': pending_txn['confirmed-round'],
-                    'amount': tx_details.get('amt', 0) / 1_000_000,  # Convert to ALGO
-                    'sender': tx_details.get('snd', 'unknown'),
-                    'receiver': tx_details.get('rcv', 'unknown'),
-                    'fee': tx_details.get('fee', 1000) / 1_000_000,  # Convert to ALGO
-                    'transaction_id': txid
-                }
-                
-                # Update database if link_id provided
-                if link_id:
-                    update_link_status(link_id, 'confirmed', txid)
-                
-                return jsonify(result), 200
-            else:
-                # Transaction still pending
-                return jsonify({
-                    'success': True,
-                    'status': 'pending',
-                    'message': 'Transaction submitted, waiting for confirmation',
-                    'transaction_id': txid
-                }), 200
-        
-        except Exception as e:
-            # Transaction not found
-            return jsonify({
-                'success': False,
-                'status': 'not_found',
-                'error': 'Transaction not found on blockchain',
-                'details': str(e)
-            }), 404
-    
+            watcher.register(txid, link_id)
+        except WatcherFullError:
+            return jsonify(WATCHER_FULL[0]), WATCHER_FULL[1]
+        body, status = verify_response(txid, watcher.lookup(txid), algod_client.breaker)
+        return jsonify(body), status
+
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+# Answer when the watcher already has MAX_PENDING txids
+WATCHER_FULL = ({
+    'success': False,
+    'status': 'unavailable',
+    'error': 'Too many transactions are being watched, try again shortly'
+}, 503)
+
+
+def check_txid(txid):
+    """(error body, status) if the txid is missing or malformed, else None"""
+    if not txid:
+        return {
+            'success': False,
+            'error': 'txid query parameter required'
+        }, 400
+
+    if not is_valid_txid(txid):
+        return {
+            'success': False,
+            'error': 'Invalid transaction ID'
+        }, 400
+    return None
+
+
+def verify_response(txid: str, result: dict, breaker):
+    """
+    (body, status) for the watcher's current result; shared with the ASGI app
+
+    breaker is the circuit breaker of the algod client the caller's
+    watcher follows rounds with.
+    """
+    if result['status'] == 'confirmed':
+        # Transaction was confirmed!
+        return {
+            'success': True,
+            'status': 'confirmed',
+            'confirmed_round': result['confirmed_round'],
+            'amount': micro_to_algo(result['amount']),
+            'amount_micro': result['amount'],
+            'sender': result['sender'],
+            'receiver': result['receiver'],
+            'fee': micro_to_algo(result['fee']),
+            'transaction_id': txid
+        }, 200
+
+    if result['status'] == 'not_found':
+        return {
+            'success': False,
+            'status': 'not_found',
+            'error': result['error'],
+            'details': result.get('details', '')
+        }, 404
+
+    if breaker.is_open:
+        # Node is down: fail fast rather than report a pending forever
+        return {
+            'success': False,
+            'status': 'unavailable',
+            'error': 'Algorand node unavailable, try again shortly',
+            'transaction_id': txid
+        }, 503
+
+    # Transaction still pending
+    return {
+        'success': True,
+        'status': 'pending',
+        'message': 'Transaction submitted, waiting for confirmation',
+        'transaction_id': txid
+    }, 200
\ No newline at end of file
@@ -0,0 +1,283 @@
+# ============================================
+# FILE: backend/utils/algod_pool.py
+# ============================================
+"""
+Shared algod client with keep-alive connections, retries and a circuit breaker
+
+Every module gets its client from get_algod_client() instead of building
+its own AlgodClient:
+  - each thread reuses one keep-alive HTTP connection per node
+  - every call has a deadline that also bounds its retries
+  - 429 and 5xx answers are retried with exponential backoff and full jitter
+  - after repeated failures the circuit opens and calls fail immediately
+    with AlgodUnavailableError until a cooldown has passed
+"""
+
+import http.client
+import json
+import os
+import random
+import re
+import threading
+import time
+from urllib import parse
+
+from algosdk import constants, error
+from algosdk.v2client import algod
+from dotenv import load_dotenv
+
+from backend.utils.metrics import histogram, register_gauges
+
+load_dotenv()
+
+ALGORAND_SERVER = os.getenv('ALGORAND_SERVER', 'https://testnet-api.algonode.cloud')
+ALGORAND_TOKEN = os.getenv('ALGORAND_TOKEN', '')  # Testnet doesn't need token
+
+# Upper bound for one call including retries (seconds)
+DEFAULT_DEADLINE = float(os.getenv('ALGOD_DEADLINE', 10))
+
+MAX_RETRIES = int(os.getenv('ALGOD_MAX_RETRIES', 4))
+BACKOFF_BASE = 0.1
+BACKOFF_MAX = 2.0
+
+# Open the circuit after this many consecutive failures, for this long
+BREAKER_THRESHOLD = int(os.getenv('ALGOD_BREAKER_THRESHOLD', 5))
+BREAKER_COOLDOWN = float(os.getenv('ALGOD_BREAKER_COOLDOWN', 15))
+
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Only these are safe to resend when the node may have acted on the request
+_POST_RETRY_STATUSES = {429, 503}
+
+# Txids, addresses and round numbers in paths, collapsed for metric labels
+_PATH_ID = re.compile(r'/(?:[A-Z2-7]{26,}|\d+)(?=/|$)')
+
+
+class AlgodUnavailableError(error.AlgodHTTPError):
+    """Raised without a network call while the circuit breaker is open"""
+
+    def __init__(self, msg: str = 'Algorand node unavailable'):
+        super().__init__(msg, 503)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe"""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return (self._opened_at is not None
+                    and time.monotonic() - self._opened_at < self.cooldown)
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown or self._probing:
+                return False
+            # Cooldown over: let one request through to test the node
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class PooledAlgodClient(algod.AlgodClient):
+    """AlgodClient whose requests go through pooled, retried connections"""
+
+    def __init__(self, algod_token: str, algod_address: str, headers: dict = None):
+        super().__init__(algod_token, algod_address, headers)
+        url = parse.urlsplit(algod_address)
+        self._scheme = url.scheme
+        self._netloc = url.netloc
+        self._base_path = url.path.rstrip('/')
+        self._local = threading.local()
+        self.breaker = CircuitBreaker()
+        self._histograms = {}
+        self.retries = 0
+        self.failures = 0
+
+    def _connection(self, timeout: float):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if self._scheme == 'https':
+                conn = http.client.HTTPSConnection(self._netloc, timeout=timeout)
+            else:
+                conn = http.client.HTTPConnection(self._netloc, timeout=timeout)
+            self._local.conn = conn
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn
+
+    def _drop_connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _send(self, method: str, path: str, data, headers: dict, timeout: float):
+        """One HTTP exchange; returns (status, body)"""
+        conn = self._connection(timeout)
+        try:
+            conn.request(method, path, body=data, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+        except (http.client.HTTPException, OSError):
+            # Stale keep-alive socket or network error: reconnect next time
+            self._drop_connection()
+            raise
+        if resp.will_close:
+            self._drop_connection()
+        return resp.status, body
+
+    def _histogram(self, method: str, requrl: str):
+        operation = method + ' ' + _PATH_ID.sub('/:id', requrl)
+        hist = self._histograms.get(operation)
+        if hist is None:
+            hist = self._histograms[operation] = histogram('checkout_algod_seconds',
+                                                           operation=operation)
+        return hist
+
+    def algod_request(self, method, requrl, params=None, data=None, headers=None,
+                      response_format='json', timeout=None):
+        """Same contract as AlgodClient.algod_request, with pooling and retries"""
+        hist = self._histogram(method, requrl)
+        started = time.perf_counter()
+        try:
+            return self._request(method, requrl, params, data, headers, response_format, timeout)
+        finally:
+            hist.observe(time.perf_counter() - started)
+
+    def _request(self, method, requrl, params, data, headers, response_format, timeout):
+        path, header = build_request(self, method, requrl, params, headers)
+        deadline = time.monotonic() + (timeout or DEFAULT_DEADLINE)
+        retry_statuses = _RETRY_STATUSES if method == 'GET' else _POST_RETRY_STATUSES
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise AlgodUnavailableError()
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise error.AlgodHTTPError('algod request deadline exceeded', 504)
+
+            try:
+                status, body = self._send(method, path, data, header, remaining)
+            except (http.client.HTTPException, OSError) as e:
+                status, body, failure = None, b'', e
+            else:
+                failure = None
+
+            if status is not None and status not in _RETRY_STATUSES:
+                # The node answered; 4xx is the caller's problem, not the node's
+                self.breaker.record_success()
+                break
+
+            self.breaker.record_failure()
+            self.failures += 1
+            retryable = (status is None and method == 'GET') or status in retry_statuses
+            if not retryable or attempt >= MAX_RETRIES:
+                break
+
+            delay = backoff_delay(attempt)
+            if time.monotonic() + delay >= deadline:
+                break
+            time.sleep(delay)
+            attempt += 1
+            self.retries += 1
+
+        return parse_response(status, body, failure, response_format)
+
+
+def build_request(client, method: str, requrl: str, params: dict, headers: dict):
+    """Full request path and headers for an algod API call; returns (path, headers)"""
+    header = {'User-Agent': 'py-algorand-sdk'}
+    if client.headers:
+        header.update(client.headers)
+    if headers:
+        header.update(headers)
+    if requrl not in constants.no_auth:
+        header[constants.algod_auth_header] = client.algod_token
+    if requrl not in constants.unversioned_paths:
+        requrl = '/v2' + requrl
+    path = client._base_path + requrl
+    if params:
+        path = path + '?' + parse.urlencode(params)
+    return path, header
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def parse_response(status, body: bytes, failure, response_format: str):
+    """Decoded algod answer, or the AlgodHTTPError the SDK would raise"""
+    if status is None:
+        raise error.AlgodHTTPError(f'algod unreachable: {failure}', 503)
+
+    if status >= 400:
+        message, payload = body.decode('utf-8', 'replace'), {}
+        try:
+            payload = json.loads(body)
+            message = payload['message']
+        except (ValueError, KeyError, TypeError):
+            pass
+        raise error.AlgodHTTPError(message, status, payload.get('data') if isinstance(payload, dict) else None)
+
+    if response_format == 'json':
+        if not body:
+            return {}
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise error.AlgodResponseError('Failed to parse JSON response from algod') from e
+    return body
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_algod_client(address: str = None, token: str = None) -> PooledAlgodClient:
+    """Shared client for a node; all callers of the same address share one breaker"""
+    address = address or ALGORAND_SERVER
+    token = ALGORAND_TOKEN if token is None else token
+    with _clients_lock:
+        client = _clients.get((address, token))
+        if client is None:
+            client = PooledAlgodClient(token, address)
+            _clients[(address, token)] = client
+        return client
+
+
+def _algod_metrics():
+    return {
+        'checkout_algod_retries_total': sum(c.retries for c in _clients.values()),
+        'checkout_algod_failures_total': sum(c.failures for c in _clients.values()),
+        'checkout_algod_breaker_open': sum(1 for c in _clients.values() if c.breaker.is_open)
+    }
+
+
+register_gauges(_algod_metrics)
@@ -5,52 +5,106 @@
 Algorand utilities for blockchain interaction
 """
 
-from algosdk.v2client import algod
-from algosdk.encoding import decode_address
+import functools
 import os
-from dotenv import load_dotenv
+import re
+
+from algosdk.encoding import decode_address
+
+from backend.utils.algod_pool import get_algod_client
+from backend.utils.metrics import register_gauges, timed
+from backend.utils.params_cache import SuggestedParamsCache
+
+# Shared algod client (pooled connections, retries, circuit breaker)
+algod_client = get_algod_client()
+
+# suggested_params refreshed once per round in the background
+params_cache = SuggestedParamsCache(algod_client)
+
+
+# Uppercase RFC 4648 base32, the only characters an address can contain
+_ADDRESS_PATTERN = re.compile(r'[A-Z2-7]{58}')
+
+# How many distinct addresses keep their validation result cached
+ADDRESS_CACHE_SIZE = int(os.getenv('ADDRESS_CACHE_SIZE', 65536))
+
+# For MVP, accept 58-char base32 strings as valid even if the checksum fails
+# In production, set STRICT_ADDRESS_VALIDATION=true
+STRICT_ADDRESS_VALIDATION = os.getenv('STRICT_ADDRESS_VALIDATION', 'false').lower() == 'true'
+
 
-load_dotenv()
+@functools.lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _check_address(address: str, strict: bool) -> bool:
+    """Format check, plus base32 decode + SHA-512/256 checksum when strict; memoized"""
+    # 58 base32 characters (valid Algorand address length and alphabet)
+    if _ADDRESS_PATTERN.fullmatch(address) is None:
+        return False
 
-# Connect to Algorand testnet
-ALGORAND_SERVER = os.getenv('ALGORAND_SERVER', 'https://testnet-api.algonode.cloud')
-ALGORAND_TOKEN = ''  # Testnet doesn't need token
+    if not strict:
+        return True
 
-# Create algod client (connection to blockchain)
-algod_client = algod.AlgodClient(ALGORAND_TOKEN, ALGORAND_SERVER)
+    # Try to decode as real Algorand address
+    try:
+        decode_address(address)
+        return True
+    except:
+        return False
 
 
+@timed('address', 'is_valid_address')
 def is_valid_address(address: str) -> bool:
     """
     Validate if address is properly formatted Algorand address
     Algorand addresses are 58 characters long and base32 encoded
     
     For MVP testing, we allow placeholder addresses
+
+    Anything with the wrong length or characters outside the base32
+    alphabet is rejected before decoding. Results are cached per address
+    and mode, so repeat addresses cost one dict lookup.
     """
-    if not address:
-        return False
-    
-    
-    # Check if it's 58 characters (valid Algorand address length)
-    if len(address) != 58:
-        return False
-    
-    # Try to decode as real Algorand address
-    try:
-        decode_address(address)
-        return True
-    except:
-        # For MVP, accept 58-char strings as valid even if decode fails
-        # In production, remove this and use strict validation
-        if len(address) == 58:
-            return True
+    if not address or not isinstance(address, str):
         return False
 
+    return _check_address(address, STRICT_ADDRESS_VALIDATION)
+
+
+@timed('address', 'validate_addresses')
+def validate_addresses(addresses) -> dict:
+    """
+    Validate many addresses at once (bulk paths)
+
+    Each distinct address is checked once, however often it repeats.
+
+    Returns:
+        Dictionary mapping each distinct address to True/False
+    """
+    return {address: is_valid_address(address) for address in set(addresses)}
+
+
+def address_cache_info():
+    """Hits, misses and size of the address validation cache"""
+    return _check_address.cache_info()
+
+
+def _address_cache_metrics():
+    info = _check_address.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'checkout_address_cache_hits_total': info.hits,
+        'checkout_address_cache_misses_total': info.misses,
+        'checkout_address_cache_size': info.currsize,
+        'checkout_address_cache_hit_ratio': info.hits / lookups if lookups else 0.0
+    }
+
+
+register_gauges(_address_cache_metrics)
+
 
 def get_network_params():
-    """Get current blockchain parameters"""
+    """Get current blockchain parameters (cached, refreshed every round)"""
     try:
-        params = algod_client.suggested_params()
+        params = params_cache.get()
         return params
     except Exception as e:
         raise Exception(f"Failed to get network parameters: {str(e)}")
@@ -0,0 +1,41 @@
+# ============================================
+# FILE: backend/utils/amounts.py
+# ============================================
+"""
+ALGO <-> microAlgo conversion at the JSON boundary
+
+Links are stored, indexed and compared in integer microAlgos
+('amount_micro'). ALGO decimals only exist in request and response
+bodies, and these are the only two places they are converted.
+"""
+
+import math
+from decimal import Decimal
+
+MICROALGOS_PER_ALGO = 1_000_000
+
+# Total ALGO supply; no single payment can be larger
+MAX_MICROALGOS = 10_000_000_000 * MICROALGOS_PER_ALGO
+
+
+def algo_to_micro(amount) -> int:
+    """
+    Exact microAlgos for an ALGO amount from a JSON body (1.5 -> 1500000)
+
+    Goes through the decimal text of the number, so 0.1 is 100000 and
+    not 99999. Raises ValueError for non-numbers and amounts finer
+    than one microAlgo.
+    """
+    if isinstance(amount, bool) or not isinstance(amount, (int, float)):
+        raise ValueError('Amount must be a number')
+    if isinstance(amount, float) and not math.isfinite(amount):
+        raise ValueError('Amount must be a number')
+    micro = Decimal(repr(amount)) * MICROALGOS_PER_ALGO
+    if micro != micro.to_integral_value():
+        raise ValueError('Amount can have at most 6 decimal places')
+    return int(micro)
+
+
+def micro_to_algo(micro: int) -> float:
+    """ALGO for a response body (1500000 -> 1.5)"""
+    return micro / MICROALGOS_PER_ALGO
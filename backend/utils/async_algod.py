@@ -0,0 +1,244 @@
+# ============================================
+# FILE: backend/utils/async_algod.py
+# ============================================
+"""
+asyncio algod client for the ASGI app (backend/asgi.py)
+
+Speaks HTTP/1.1 over asyncio streams with a pool of keep-alive
+connections, so thousands of outstanding calls cost coroutines rather
+than threads. Request building, retry policy, circuit breaker and error
+decoding are shared with the threaded client in algod_pool.py; only the
+transport differs.
+
+Implements the calls the background watchers need. A client belongs to
+the event loop it is first used on.
+"""
+
+import asyncio
+import ssl
+import time
+from urllib import parse
+
+from algosdk import error
+from algosdk.transaction import SuggestedParams
+
+from backend.utils.algod_pool import (
+    ALGORAND_SERVER, ALGORAND_TOKEN, DEFAULT_DEADLINE, MAX_RETRIES,
+    _POST_RETRY_STATUSES, _RETRY_STATUSES, AlgodUnavailableError, CircuitBreaker,
+    backoff_delay, build_request, parse_response, _PATH_ID
+)
+from backend.utils.metrics import histogram, register_gauges
+
+# Idle keep-alive connections kept per client
+MAX_IDLE_CONNECTIONS = 32
+
+
+class _ConnectionClosed(ConnectionError):
+    pass
+
+
+class AsyncAlgodClient:
+    """Non-blocking counterpart of PooledAlgodClient"""
+
+    def __init__(self, algod_token: str, algod_address: str, headers: dict = None):
+        self.algod_token = algod_token
+        self.algod_address = algod_address
+        self.headers = headers
+        url = parse.urlsplit(algod_address)
+        self._tls = url.scheme == 'https'
+        self._host = url.hostname
+        self._port = url.port or (443 if self._tls else 80)
+        self._netloc = url.netloc
+        self._base_path = url.path.rstrip('/')
+        self._idle = []
+        self.breaker = CircuitBreaker()
+        self._histograms = {}
+        self.retries = 0
+        self.failures = 0
+
+    # ---------- transport ----------
+
+    async def _open(self):
+        if self._tls:
+            return await asyncio.open_connection(
+                self._host, self._port, ssl=ssl.create_default_context(),
+                server_hostname=self._host)
+        return await asyncio.open_connection(self._host, self._port)
+
+    async def _exchange(self, method: str, path: str, data, headers: dict):
+        """One HTTP exchange; returns (status, body)"""
+        reused = bool(self._idle)
+        reader, writer = self._idle.pop() if reused else await self._open()
+        try:
+            lines = [f'{method} {path} HTTP/1.1', f'Host: {self._netloc}',
+                     f'Content-Length: {len(data) if data else 0}']
+            lines.extend(f'{k}: {v}' for k, v in headers.items())
+            writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+            if data:
+                writer.write(data)
+            await writer.drain()
+
+            status_line = await reader.readline()
+            if not status_line:
+                raise _ConnectionClosed('connection closed by algod')
+            status = int(status_line.split()[1])
+
+            length, chunked, keep_alive = None, False, True
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                name, value = name.strip().lower(), value.strip().lower()
+                if name == 'content-length':
+                    length = int(value)
+                elif name == 'transfer-encoding':
+                    chunked = 'chunked' in value
+                elif name == 'connection':
+                    keep_alive = value != 'close'
+
+            if chunked:
+                parts = []
+                while True:
+                    size = int((await reader.readline()).split(b';')[0], 16)
+                    if size == 0:
+                        await reader.readline()
+                        break
+                    parts.append(await reader.readexactly(size))
+                    await reader.readline()
+                body = b''.join(parts)
+            elif length is not None:
+                body = await reader.readexactly(length)
+            else:
+                body, keep_alive = await reader.read(), False
+        except BaseException as e:
+            writer.close()
+            if reused and isinstance(e, (_ConnectionClosed, asyncio.IncompleteReadError,
+                                         ConnectionResetError, BrokenPipeError)):
+                # Keep-alive socket closed by the node while idle: try a new one
+                return await self._exchange(method, path, data, headers)
+            raise
+
+        if keep_alive and len(self._idle) < MAX_IDLE_CONNECTIONS:
+            self._idle.append((reader, writer))
+        else:
+            writer.close()
+        return status, body
+
+    async def close(self):
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+    # ---------- requests ----------
+
+    def _histogram(self, method: str, requrl: str):
+        operation = method + ' ' + _PATH_ID.sub('/:id', requrl)
+        hist = self._histograms.get(operation)
+        if hist is None:
+            hist = self._histograms[operation] = histogram('checkout_algod_seconds',
+                                                           operation=operation)
+        return hist
+
+    async def algod_request(self, method, requrl, params=None, data=None, headers=None,
+                            response_format='json', timeout=None):
+        """Same contract as PooledAlgodClient.algod_request, awaitable"""
+        hist = self._histogram(method, requrl)
+        started = time.perf_counter()
+        try:
+            return await self._request(method, requrl, params, data, headers,
+                                       response_format, timeout)
+        finally:
+            hist.observe(time.perf_counter() - started)
+
+    async def _request(self, method, requrl, params, data, headers, response_format, timeout):
+        path, header = build_request(self, method, requrl, params, headers)
+        deadline = time.monotonic() + (timeout or DEFAULT_DEADLINE)
+        retry_statuses = _RETRY_STATUSES if method == 'GET' else _POST_RETRY_STATUSES
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise AlgodUnavailableError()
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise error.AlgodHTTPError('algod request deadline exceeded', 504)
+
+            try:
+                status, body = await asyncio.wait_for(
+                    self._exchange(method, path, data, header), remaining)
+            except (OSError, ValueError, IndexError, asyncio.IncompleteReadError,
+                    asyncio.TimeoutError) as e:
+                status, body, failure = None, b'', e
+            else:
+                failure = None
+
+            if status is not None and status not in _RETRY_STATUSES:
+                self.breaker.record_success()
+                break
+
+            self.breaker.record_failure()
+            self.failures += 1
+            retryable = (status is None and method == 'GET') or status in retry_statuses
+            if not retryable or attempt >= MAX_RETRIES:
+                break
+
+            delay = backoff_delay(attempt)
+            if time.monotonic() + delay >= deadline:
+                break
+            await asyncio.sleep(delay)
+            attempt += 1
+            self.retries += 1
+
+        return parse_response(status, body, failure, response_format)
+
+    # ---------- API calls (same names and results as AlgodClient) ----------
+
+    async def status(self):
+        return await self.algod_request('GET', '/status')
+
+    async def status_after_block(self, round_num: int, timeout: float = None):
+        return await self.algod_request('GET', f'/status/wait-for-block-after/{round_num}',
+                                        timeout=timeout)
+
+    async def pending_transaction_info(self, txid: str):
+        return await self.algod_request('GET', '/transactions/pending/' + txid,
+                                        params={'format': 'json'})
+
+    async def suggested_params(self) -> SuggestedParams:
+        res = await self.algod_request('GET', '/transactions/params')
+        return SuggestedParams(
+            res['fee'],
+            res['last-round'],
+            res['last-round'] + 1000,
+            res['genesis-hash'],
+            res['genesis-id'],
+            False,
+            res['consensus-version'],
+            res['min-fee']
+        )
+
+
+_clients = {}
+
+
+def get_async_algod_client(address: str = None, token: str = None) -> AsyncAlgodClient:
+    """Shared async client for a node"""
+    address = address or ALGORAND_SERVER
+    token = ALGORAND_TOKEN if token is None else token
+    client = _clients.get((address, token))
+    if client is None:
+        client = _clients[(address, token)] = AsyncAlgodClient(token, address)
+    return client
+
+
+def _async_algod_metrics():
+    return {
+        'checkout_async_algod_retries_total': sum(c.retries for c in _clients.values()),
+        'checkout_async_algod_failures_total': sum(c.failures for c in _clients.values()),
+        'checkout_async_algod_idle_connections': sum(len(c._idle) for c in _clients.values())
+    }
+
+
+register_gauges(_async_algod_metrics)
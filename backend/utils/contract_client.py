@@ -6,15 +6,33 @@
 Client for interacting with the smart contract on blockchain
 """
 
-from algosdk.v2client import algod
-from algosdk.account import Account
 from algosdk.mnemonic import to_private_key
 from algosdk import transaction
+import base64
 import os
 from dotenv import load_dotenv
 
+from backend.utils.algod_pool import get_algod_client
+from backend.utils.algorand import params_cache
+
 load_dotenv()
 
+# Global-state keys as algod returns them (base64) -> stats field
+GLOBAL_STATE_KEYS = {
+    base64.b64encode(b'trse').decode(): 'total_received',   # microAlgos received
+    base64.b64encode(b'pcnt').decode(): 'total_payments'    # payments processed
+}
+
+
+def decode_global_state(global_state: list) -> dict:
+    """Pick the known counters out of an application's global-state list"""
+    stats = {'total_received': 0, 'total_payments': 0}
+    for state in global_state:
+        field = GLOBAL_STATE_KEYS.get(state['key'])
+        if field is not None:
+            stats[field] = state['value'].get('uint', 0)
+    return stats
+
 
 class CheckoutContractClient:
     """Wrapper for smart contract interactions"""
@@ -22,11 +40,8 @@ class CheckoutContractClient:
     def __init__(self, app_id: int = None):
         """Initialize contract client"""
         
-        # Connect to Algorand testnet
-        self.algod_client = algod.AlgodClient(
-            token='',
-            address='https://testnet-api.algonode.cloud'
-        )
+        # Shared connection to the configured Algorand node
+        self.algod_client = get_algod_client()
         
         self.app_id = app_id or int(os.getenv('APP_ID', 0))
         
@@ -63,8 +78,8 @@ class CheckoutContractClient:
             # Get sender's private key
             sender_private_key = to_private_key(sender_mnemonic)
             
-            # Get current params
-            params = self.algod_client.suggested_params()
+            # Get current params (cached, no algod round trip)
+            params = params_cache.get()
             
             # Create transaction
             # This would call process_payment method
@@ -109,24 +124,9 @@ class CheckoutContractClient:
                     'contract_version': '1.0'
                 }
             
-            # Get application info
-            app_info = self.algod_client.application_info(self.app_id)
-            
-            # Extract global state
-            global_state = app_info['params']['global-state']
-            
-            total_received = 0
-            total_payments = 0
-            
-            for state in global_state:
-                key = state['key']
-                value = state['value']['uint']
-                
-                # Parse state keys
-                if key == 'dHJzZQ==':  # "trse" in base64
-                    total_received = value
-                elif key == 'cGNudA==':  # "pcnt" in base64
-                    total_payments = value
+            stats = self.read_global_state()
+            total_received = stats['total_received']
+            total_payments = stats['total_payments']
             
             return {
                 'total_algo_received': total_received / 1_000_000,
@@ -143,6 +143,12 @@ class CheckoutContractClient:
             }
     
     
+    def read_global_state(self):
+        """Decoded contract counters; raises if algod can't be reached"""
+        app_info = self.algod_client.application_info(self.app_id)
+        return decode_global_state(app_info['params'].get('global-state', []))
+    
+    
     def check_transaction_status(self, txid: str):
         """Check if transaction was confirmed"""
         try:
@@ -0,0 +1,118 @@
+# ============================================
+# FILE: backend/utils/contract_stats.py
+# ============================================
+"""
+In-memory snapshot behind /api/contract-stats
+
+The contract's counters can only change when a new round is committed,
+so the snapshot is re-read from algod at most once per round (the round
+comes from the suggested-params cache), or sooner after one of our links
+confirms. Every request in between is answered from memory with the
+response body and its ETag computed once per snapshot, so browsers and
+CDNs can revalidate with If-None-Match and get a 304.
+
+A stale snapshot is refreshed on a background thread while requests
+keep getting the previous one; only the very first request waits.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from backend.database.links import subscribe
+from backend.utils.algorand import params_cache
+from backend.utils.contract_client import CheckoutContractClient
+
+CONTRACT_VERSION = '1.0'
+
+# Re-read at least this often (seconds) even if no new round is known
+MAX_AGE = float(os.getenv('CONTRACT_STATS_MAX_AGE', 10))
+
+# Cache-Control max-age sent to browsers: about one block
+CLIENT_MAX_AGE = int(os.getenv('CONTRACT_STATS_CLIENT_MAX_AGE', 3))
+
+
+class StatsSnapshot:
+    __slots__ = ('body', 'etag', 'round', 'fetched_at')
+
+    def __init__(self, stats: dict, round_num: int):
+        # The ETag only depends on the counters, so it survives new rounds
+        self.body = json.dumps(stats, sort_keys=True, separators=(',', ':')).encode() + b'\n'
+        self.etag = hashlib.blake2b(self.body, digest_size=8).hexdigest()
+        self.round = round_num
+        self.fetched_at = time.monotonic()
+
+
+class ContractStatsCache:
+    """Round-refreshed, pre-serialized contract statistics"""
+
+    def __init__(self, app_id: int = None, max_age: float = MAX_AGE):
+        self.app_id = app_id if app_id is not None else int(os.getenv('APP_ID', 0))
+        self.max_age = max_age
+        self._client = None
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._refreshing = False
+        self._dirty = False
+
+    def _read(self) -> StatsSnapshot:
+        round_num = params_cache.last_round
+        if not self.app_id:
+            # Not deployed yet: same zeros the client reports
+            counters = {'total_received': 0, 'total_payments': 0}
+        else:
+            if self._client is None:
+                self._client = CheckoutContractClient(self.app_id)
+            counters = self._client.read_global_state()
+
+        return StatsSnapshot({
+            'success': True,
+            'total_algo_received': counters['total_received'] / 1_000_000,
+            'total_payments_processed': counters['total_payments'],
+            'contract_version': CONTRACT_VERSION
+        }, round_num)
+
+    def _stale(self, snapshot: StatsSnapshot) -> bool:
+        if self._dirty or time.monotonic() - snapshot.fetched_at > self.max_age:
+            return True
+        return params_cache.last_round > snapshot.round
+
+    def get(self) -> StatsSnapshot:
+        """Current snapshot; raises only if there has never been one"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._read()
+                return self._snapshot
+
+        if self._stale(snapshot):
+            with self._lock:
+                start = not self._refreshing
+                self._refreshing = True
+            if start:
+                threading.Thread(target=self._refresh, name='contract-stats',
+                                 daemon=True).start()
+        return snapshot
+
+    def _refresh(self):
+        self._dirty = False
+        try:
+            self._snapshot = self._read()
+        except Exception:
+            # Keep serving the old snapshot; retried on a later request
+            pass
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def on_link_change(self, event: str, link_id: str, fields):
+        """A confirmed payment may have moved the counters: re-read early"""
+        if event == 'updated' and fields.get('status') == 'confirmed':
+            self._dirty = True
+
+
+contract_stats = ContractStatsCache()
+subscribe(contract_stats.on_link_change)
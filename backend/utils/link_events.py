@@ -0,0 +1,165 @@
+# ============================================
+# FILE: backend/utils/link_events.py
+# ============================================
+"""
+In-process pub/sub for link status changes
+
+Browsers waiting on a payment (SSE or long-poll on
+/api/links/<link_id>/events) register a delivery callback here instead
+of polling /api/verify. The hub listens to the link store's change hook,
+so a single update_link_status() call - made by the confirmation watcher
+after one upstream check - reaches every watcher of that link at once,
+however many tabs are open.
+
+Changes made by other processes (the standalone payment indexer, other
+API workers) never pass through this process's change hook, so while
+any link is watched a background thread also re-reads the watched links
+from the shared store every POLL_INTERVAL seconds and publishes the
+ones whose status moved. The cost is one store read per watched link
+per interval, independent of how many tabs watch it.
+
+Callbacks run on the thread that changed the link (or the poller) and
+must not block: threaded views pass queue.put, the ASGI app a
+call_soon_threadsafe wrapper.
+"""
+
+import json
+import os
+import threading
+import time
+
+from backend.database.links import load_link, subscribe
+from backend.utils.metrics import register_gauges
+
+# Statuses after which the link will not change again
+TERMINAL_STATUSES = {'confirmed', 'expired', 'deleted'}
+
+# Seconds between looks at the store for changes made by other processes
+POLL_INTERVAL = float(os.getenv('LINK_EVENTS_POLL_INTERVAL', 1.0))
+
+# Stored link status -> status shown to the payer
+_PUBLIC_STATUS = {'unused': 'pending'}
+
+
+def status_event(link_id: str, status: str, txid: str = None) -> dict:
+    return {
+        'link_id': link_id,
+        'status': _PUBLIC_STATUS.get(status, status),
+        'txid': txid
+    }
+
+
+def sse_message(event: dict) -> str:
+    """One Server-Sent Events message"""
+    return f"event: status\ndata: {json.dumps(event)}\n\n"
+
+
+# Sent between events so proxies don't drop an idle stream
+SSE_KEEPALIVE = ': keep-alive\n\n'
+
+
+def wants_event_stream(accept: str, mode: str = None) -> bool:
+    """SSE if asked for explicitly or by an EventSource Accept header, else long-poll"""
+    if mode:
+        return mode == 'sse'
+    return 'text/event-stream' in (accept or '')
+
+
+class LinkEventHub:
+    """Fans link status changes out to everyone watching that link"""
+
+    def __init__(self, load_fn=None, poll_interval: float = POLL_INTERVAL):
+        """
+        Args:
+            load_fn: Reads a link from the store (bypassing any cache),
+                or None to rely on in-process changes only
+            poll_interval: Seconds between store reads of watched links
+        """
+        self._load_fn = load_fn
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._watchers = {}     # link_id -> set of delivery callbacks
+        self._published = {}    # link_id -> (status, txid) last published
+
+        self._wake = threading.Condition(self._lock)
+        self._thread = None
+
+    def watch(self, link_id: str, deliver):
+        with self._lock:
+            self._watchers.setdefault(link_id, set()).add(deliver)
+            if self._thread is None and self._load_fn is not None:
+                self._thread = threading.Thread(target=self._poll, name='link-events',
+                                                daemon=True)
+                self._thread.start()
+            self._wake.notify()
+
+    def unwatch(self, link_id: str, deliver):
+        with self._lock:
+            watchers = self._watchers.get(link_id)
+            if watchers is not None:
+                watchers.discard(deliver)
+                if not watchers:
+                    del self._watchers[link_id]
+                    self._published.pop(link_id, None)
+
+    def publish(self, link_id: str, event: dict):
+        with self._lock:
+            watchers = list(self._watchers.get(link_id, ()))
+            if watchers:
+                self._published[link_id] = (event['status'], event['txid'])
+        for deliver in watchers:
+            try:
+                deliver(event)
+            except Exception:
+                # One closed connection must not stop the others
+                pass
+
+    def watcher_count(self) -> int:
+        with self._lock:
+            return sum(len(w) for w in self._watchers.values())
+
+    def on_link_change(self, event: str, link_id: str, fields):
+        """links.subscribe() callback"""
+        if event == 'deleted':
+            self.publish(link_id, status_event(link_id, 'deleted'))
+        elif event == 'updated' and 'status' in fields:
+            self.publish(link_id, status_event(link_id, fields['status'], fields.get('txid')))
+
+    def poll_once(self):
+        """Publish watched links whose stored status differs from what was last sent"""
+        with self._lock:
+            watched = [(link_id, self._published.get(link_id)) for link_id in self._watchers]
+        for link_id, last in watched:
+            try:
+                link = self._load_fn(link_id)
+            except Exception:
+                continue
+            if link is None:
+                event = status_event(link_id, 'deleted')
+            else:
+                event = status_event(link_id, link['status'], link.get('txid'))
+            with self._lock:
+                # Unwatched, or published in-process while this read was
+                # in flight (then the read may be the older of the two)
+                if link_id not in self._watchers or self._published.get(link_id) is not last:
+                    continue
+            # Watchers have all seen an open link at least as 'pending'
+            if last is None and event['status'] == 'pending':
+                continue
+            if last != (event['status'], event['txid']):
+                self.publish(link_id, event)
+
+    def _poll(self):
+        while True:
+            with self._lock:
+                # Sleep without a timer while nothing is watched
+                while not self._watchers:
+                    self._wake.wait()
+            time.sleep(self.poll_interval)
+            self.poll_once()
+
+
+hub = LinkEventHub(load_link)
+subscribe(hub.on_link_change)
+
+register_gauges(lambda: {'checkout_link_event_watchers': hub.watcher_count()})
@@ -0,0 +1,115 @@
+# ============================================
+# FILE: backend/utils/params_cache.py
+# ============================================
+"""
+Cached suggested transaction parameters
+
+Fees and the genesis hash almost never change, and the validity window
+only moves once per round, so there is no reason to ask algod for
+suggested_params on every transaction build. A background thread
+refreshes the params once per round (it blocks on status_after_block
+between refreshes). Callers get a private copy, so they can change fee
+or validity without affecting anyone else.
+
+If the background thread can't keep up (node down, thread not started)
+a call to get() refreshes synchronously once the cached params are older
+than max_staleness seconds.
+"""
+
+import asyncio
+import copy
+import os
+import threading
+import time
+
+# Algorand lets a transaction be valid for up to 1000 rounds
+VALIDITY_ROUNDS = 1000
+
+MAX_STALENESS = float(os.getenv('ALGOD_PARAMS_MAX_STALENESS', 10))
+
+
+class SuggestedParamsCache:
+    """Round-refreshed suggested_params shared by every transaction builder"""
+
+    def __init__(self, client, max_staleness: float = MAX_STALENESS):
+        self.client = client
+        self.max_staleness = max_staleness
+        self._lock = threading.Lock()
+        self._params = None
+        self._fetched_at = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _refresh(self):
+        params = self.client.suggested_params()
+        with self._lock:
+            self._params = params
+            self._fetched_at = time.monotonic()
+        return params
+
+    def get(self):
+        """Copy of the current params with a fresh validity window"""
+        self._ensure_started()
+
+        with self._lock:
+            params, fetched_at = self._params, self._fetched_at
+
+        if params is None or time.monotonic() - fetched_at > self.max_staleness:
+            params = self._refresh()
+
+        params = copy.copy(params)
+        params.last = params.first + VALIDITY_ROUNDS
+        return params
+
+    @property
+    def stale(self) -> bool:
+        """True when get() would have to call algod before answering"""
+        with self._lock:
+            return (self._params is None
+                    or time.monotonic() - self._fetched_at > self.max_staleness)
+
+    @property
+    def last_round(self) -> int:
+        with self._lock:
+            return self._params.first if self._params is not None else 0
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='params-cache', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def start_async(self, client):
+        """Refresh from an AsyncAlgodClient on the running event loop instead of a thread"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = asyncio.get_running_loop().create_task(self._run_async(client))
+        return self._thread
+
+    async def _run_async(self, client):
+        while not self._stop.is_set():
+            try:
+                params = await client.suggested_params()
+                with self._lock:
+                    self._params = params
+                    self._fetched_at = time.monotonic()
+                await client.status_after_block(params.first)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                await asyncio.sleep(1)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                params = self._refresh()
+                # Sleeps inside algod until the next round is committed
+                self.client.status_after_block(params.first)
+            except Exception:
+                time.sleep(1)
@@ -0,0 +1,288 @@
+# ============================================
+# FILE: backend/utils/payment_indexer.py
+# ============================================
+"""
+Block-scanning payment indexer
+
+Confirms checkout links without the payer's browser calling /api/verify.
+Blocks are streamed from algod in msgpack form, and every payment
+transaction is matched against an in-memory index of open links keyed
+by (receiver public key, amount in microAlgos). The match is a single
+dict lookup per payment, so one core keeps up with mainnet easily.
+
+Links created by the API workers are picked up before every block from
+the store's status index (unused links created since the last look), so
+a link created and paid within one round still matches. A full reload
+every INDEXER_REFRESH_ROUNDS rounds drops links closed elsewhere.
+
+The last processed round is checkpointed to disk, so a restart resumes
+where it left off.
+
+Run it next to the API:
+    python -m backend.utils.payment_indexer
+
+Replay recorded blocks offline (one <round>.msgpack file per block):
+    python -m backend.utils.payment_indexer record <dir> <first> <last>
+    python -m backend.utils.payment_indexer replay <dir> [--apply]
+A replay only reports the links it would confirm; --apply writes them
+to the link store.
+"""
+
+import base64
+import json
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+import msgpack
+from algosdk.encoding import checksum, decode_address
+
+from backend.database.links import list_links_page, update_link_status
+from backend.utils.algorand import algod_client
+
+CHECKPOINT_FILE = os.getenv('INDEXER_CHECKPOINT_FILE', 'indexer_checkpoint.json')
+
+# Open links are reloaded this often, dropping the ones paid through
+# /api/verify, expired or deleted meanwhile
+REFRESH_ROUNDS = int(os.getenv('INDEXER_REFRESH_ROUNDS', 20))
+
+# Open links read from the store per page when reloading
+REFRESH_PAGE = 1000
+
+# New links are looked for from this many seconds before the previous
+# look, for writes that landed late (worker clocks, slow fsync)
+NEW_LINK_OVERLAP = float(os.getenv('INDEXER_NEW_LINK_OVERLAP', 30))
+
+# Write the checkpoint at most once per this many rounds
+CHECKPOINT_EVERY = 10
+
+
+class OpenLinkIndex:
+    """(receiver public key, microAlgos) -> open link_ids, oldest first"""
+
+    def __init__(self):
+        self._by_key = {}
+        self._key_of = {}
+
+    def __len__(self):
+        return len(self._key_of)
+
+    def add(self, link_id: str, receiver: str, amount_micro: int):
+        if link_id in self._key_of:
+            return
+        try:
+            public_key = decode_address(receiver)
+        except Exception:
+            # Placeholder address: nothing on chain can ever pay it
+            return
+        key = (public_key, amount_micro)
+        self._by_key.setdefault(key, deque()).append(link_id)
+        self._key_of[link_id] = key
+
+    def remove(self, link_id: str):
+        key = self._key_of.pop(link_id, None)
+        if key is None:
+            return
+        queue = self._by_key[key]
+        queue.remove(link_id)
+        if not queue:
+            del self._by_key[key]
+
+    def match(self, receiver_key: bytes, amount: int):
+        """Pop and return the oldest open link for this payment, if any"""
+        queue = self._by_key.get((receiver_key, amount))
+        if not queue:
+            return None
+        link_id = queue.popleft()
+        if not queue:
+            del self._by_key[(receiver_key, amount)]
+        del self._key_of[link_id]
+        return link_id
+
+    def load(self, links: list):
+        """Rebuild from link dicts (with link_id), keeping the unused ones"""
+        self._by_key.clear()
+        self._key_of.clear()
+        # Oldest first, so duplicate (receiver, amount) links match in order
+        for link in sorted(links, key=lambda link: (link.get('created') or '', link['link_id'])):
+            if link.get('status') == 'unused':
+                self.add(link['link_id'], link['receiver'], link['amount_micro'])
+
+
+def _txid(txn: dict, header: dict, has_genesis_id: bool) -> str:
+    """Recompute a transaction ID from its block-encoded form"""
+    txn = dict(txn)
+    txn['gh'] = header['gh']
+    if has_genesis_id:
+        txn['gen'] = header['gen']
+    encoded = msgpack.packb(dict(sorted(txn.items())), use_bin_type=True)
+    return base64.b32encode(checksum(b'TX' + encoded)).decode().rstrip('=')
+
+
+class PaymentIndexer:
+    """Matches block payments to open links and confirms them"""
+
+    def __init__(self, client=None, checkpoint_file: str = CHECKPOINT_FILE,
+                 confirm=update_link_status):
+        """
+        Args:
+            client: algod client blocks are fetched from
+            checkpoint_file: Where the last processed round is kept
+            confirm: Called with (link_id, 'confirmed', txid) for each
+                matched payment
+        """
+        self.client = client
+        self.checkpoint_file = checkpoint_file
+        self.confirm = confirm
+        self.index = OpenLinkIndex()
+        self.last_round = self._read_checkpoint()
+        self.confirmed = 0
+        self._looked_at = None      # when the store was last read for new links
+
+    # ---------- open link bookkeeping ----------
+
+    def _unused_links(self, created_from: str = None) -> list:
+        links, after = [], None
+        while True:
+            page, after = list_links_page(status='unused', created_from=created_from,
+                                          after=after, limit=REFRESH_PAGE)
+            links.extend(page)
+            if after is None:
+                return links
+
+    def refresh_open_links(self):
+        """Reload the unused links from the store's status index"""
+        self._looked_at = datetime.now()
+        self.index.load(self._unused_links())
+
+    def add_new_links(self):
+        """Add the unused links created since the last look at the store"""
+        if self._looked_at is None:
+            self.refresh_open_links()
+            return
+        since = self._looked_at - timedelta(seconds=NEW_LINK_OVERLAP)
+        self._looked_at = datetime.now()
+        for link in self._unused_links(since.isoformat()):
+            # Links already in the index are skipped
+            self.index.add(link['link_id'], link['receiver'], link['amount_micro'])
+
+    # ---------- block processing ----------
+
+    def process_block(self, round_num: int, block: dict):
+        """Confirm every open link paid in this block"""
+        header = block['block'] if 'block' in block else block
+        for stxn in header.get('txns') or ():
+            self._process_txn(stxn, stxn, header)
+        self.last_round = round_num
+
+    def _process_txn(self, stxn: dict, outer: dict, header: dict):
+        txn = stxn['txn']
+        if txn.get('type') == 'pay':
+            link_id = self.index.match(txn.get('rcv'), txn.get('amt', 0))
+            if link_id is not None:
+                txid = _txid(outer['txn'], header, outer.get('hgi', False))
+                self.confirm(link_id, 'confirmed', txid)
+                self.confirmed += 1
+
+        # Payments made by contracts show up as inner transactions
+        for inner in (stxn.get('dt') or {}).get('itx') or ():
+            self._process_txn(inner, outer, header)
+
+    def replay(self, blocks):
+        """Process an iterable of (round, decoded block) pairs"""
+        for round_num, block in blocks:
+            self.process_block(round_num, block)
+
+    def fetch_block(self, round_num: int) -> dict:
+        raw = self.client.block_info(round_num=round_num, response_format='msgpack')
+        return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+
+    def run(self):
+        """Follow the chain forever, one block at a time"""
+        if not self.last_round:
+            self.last_round = self.client.status()['last-round']
+        self.refresh_open_links()
+
+        while True:
+            try:
+                self.index_next_block()
+            except Exception as e:
+                print(f"⚠️  Indexer error at round {self.last_round + 1}: {e}")
+                time.sleep(1)
+
+    def index_next_block(self):
+        """Wait for the round after last_round if needed, then process its block"""
+        next_round = self.last_round + 1
+        status = self.client.status()
+        if status['last-round'] < next_round:
+            # Caught up: wait for the next block to be committed
+            self.client.status_after_block(self.last_round)
+
+        block = self.fetch_block(next_round)
+        # Any link paid in this block was created before it was committed
+        self.add_new_links()
+        self.process_block(next_round, block)
+
+        if next_round % CHECKPOINT_EVERY == 0:
+            self._write_checkpoint()
+        if next_round % REFRESH_ROUNDS == 0:
+            self.refresh_open_links()
+
+    # ---------- checkpoint ----------
+
+    def _read_checkpoint(self) -> int:
+        try:
+            with open(self.checkpoint_file, 'r') as f:
+                return int(json.load(f)['round'])
+        except (OSError, ValueError, KeyError):
+            return 0
+
+    def _write_checkpoint(self):
+        tmp_path = self.checkpoint_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'round': self.last_round}, f)
+        os.replace(tmp_path, self.checkpoint_file)
+
+
+def _fixture_blocks(directory: str):
+    rounds = sorted(int(name.split('.')[0]) for name in os.listdir(directory)
+                    if name.endswith('.msgpack'))
+    for round_num in rounds:
+        with open(os.path.join(directory, f'{round_num}.msgpack'), 'rb') as f:
+            yield round_num, msgpack.unpackb(f.read(), raw=False, strict_map_key=False)
+
+
+def _record_fixtures(directory: str, first: int, last: int):
+    os.makedirs(directory, exist_ok=True)
+    for round_num in range(first, last + 1):
+        raw = algod_client.block_info(round_num=round_num, response_format='msgpack')
+        with open(os.path.join(directory, f'{round_num}.msgpack'), 'wb') as f:
+            f.write(raw)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) in (3, 4) and sys.argv[1] == 'replay':
+        apply = sys.argv[3:] == ['--apply']
+        matches = []
+
+        def _report(link_id, status, txid):
+            matches.append((link_id, txid))
+
+        # Without --apply nothing is written to the link store
+        indexer = PaymentIndexer(checkpoint_file=os.devnull,
+                                 confirm=update_link_status if apply else _report)
+        indexer.refresh_open_links()
+        started = time.perf_counter()
+        indexer.replay(_fixture_blocks(sys.argv[2]))
+        elapsed = time.perf_counter() - started
+        for link_id, txid in matches:
+            print(f"   {link_id} <- {txid}")
+        print(f"✅ Replayed up to round {indexer.last_round} in {elapsed:.3f}s, "
+              f"{'confirmed' if apply else 'would confirm'} {indexer.confirmed} links")
+    elif len(sys.argv) == 5 and sys.argv[1] == 'record':
+        _record_fixtures(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+    else:
+        print(f"🔎 Indexing payments from {algod_client.algod_address}")
+        PaymentIndexer(algod_client).run()
@@ -0,0 +1,295 @@
+# ============================================
+# FILE: backend/utils/tx_watcher.py
+# ============================================
+"""
+Background watcher for transaction confirmations
+
+/api/verify registers a txid (and optionally its link_id) here and
+reads the answer from an in-memory result table, so the HTTP request
+never waits on algod. One background thread follows new rounds with
+status_after_block and, after each round, checks every pending txid in
+batches; txids registered since the last pass are also checked once
+before the wait, so a payment that is already confirmed is answered
+without waiting for a block. Confirmed links are flipped to 'confirmed'
+through update_link_status.
+"""
+
+import asyncio
+import base64
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.database.links import update_link_status
+from backend.utils.algorand import algod_client
+
+# How many pending txids are checked in parallel after each round
+BATCH_SIZE = 64
+CHECK_WORKERS = 8
+
+# A transaction can't confirm after its validity window (max 1000 rounds)
+MAX_PENDING_ROUNDS = 1000
+
+# Confirmed/not-found results are kept this long for repeat polls
+RESULT_TTL = 3600
+
+# Most txids watched at once; each is re-checked every round, so
+# registrations beyond this are refused instead of queued
+MAX_PENDING = int(os.getenv('TX_WATCHER_MAX_PENDING', 10000))
+
+
+class WatcherFullError(Exception):
+    """Raised by register() when MAX_PENDING txids are already being watched"""
+
+
+def is_valid_txid(txid) -> bool:
+    """True for a 52-character base32 transaction ID as algod prints them"""
+    if not isinstance(txid, str) or len(txid) != 52:
+        return False
+    try:
+        raw = base64.b32decode(txid + '====')
+    except ValueError:
+        return False
+    return base64.b32encode(raw).decode('ascii').rstrip('=') == txid
+
+
+class ConfirmationWatcher:
+    """Follows rounds and records which registered txids have confirmed"""
+
+    def __init__(self, client, max_pending: int = MAX_PENDING):
+        self.client = client
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending = {}      # txid -> {'link_id', 'registered_round'}
+        self._fresh = []        # txids registered since the last check
+        self._results = {}      # txid -> (recorded_at, result dict)
+        self._last_round = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=CHECK_WORKERS,
+                                        thread_name_prefix='tx-watcher-check')
+
+    # ---------- request side (O(1), never calls algod) ----------
+
+    def register(self, txid: str, link_id: str = None):
+        """
+        Start watching txid; link_id is confirmed once txid is
+
+        Raises ValueError for a malformed txid and WatcherFullError when
+        max_pending txids are already being watched.
+        """
+        if not is_valid_txid(txid):
+            raise ValueError('Invalid transaction ID')
+        with self._lock:
+            entry = self._results.get(txid)
+            if entry is not None:
+                result = entry[1]
+            else:
+                result = None
+                watched = self._pending.get(txid)
+                if watched is None:
+                    if len(self._pending) >= self.max_pending:
+                        raise WatcherFullError('Too many transactions are being watched')
+                    self._pending[txid] = {
+                        'link_id': link_id,
+                        'registered_round': self._last_round,
+                        'not_found': None
+                    }
+                    self._fresh.append(txid)
+                elif link_id and not watched['link_id']:
+                    watched['link_id'] = link_id
+
+        # Already confirmed before this link_id was known
+        if result is not None and link_id and result['status'] == 'confirmed':
+            update_link_status(link_id, 'confirmed', txid)
+
+        self._ensure_started()
+
+    def lookup(self, txid: str):
+        """
+        Current knowledge about txid
+
+        Returns:
+            Result dict with a 'status' of 'confirmed' or 'not_found',
+            {'status': 'pending'} while watched, or None if unknown
+        """
+        with self._lock:
+            entry = self._results.get(txid)
+            if entry is not None:
+                return entry[1]
+            watched = self._pending.get(txid)
+            if watched is None:
+                return None
+            # algod hasn't seen it (yet); keep watching in case it shows up
+            return watched['not_found'] or {'status': 'pending'}
+
+    # ---------- background side ----------
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='tx-watcher', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def start_async(self, client):
+        """
+        Follow rounds on the running event loop instead of a thread
+
+        Used by the ASGI app: client is an AsyncAlgodClient and the
+        per-round checks become concurrent coroutines. Returns the task.
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = asyncio.get_running_loop().create_task(self._run_async(client))
+        return self._thread
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if not self._last_round:
+                    self._last_round = self.client.status()['last-round']
+
+                with self._lock:
+                    fresh, self._fresh = self._fresh, []
+                if fresh:
+                    # New registrations are checked right away
+                    self._check(fresh)
+
+                status = self.client.status_after_block(self._last_round)
+                self._last_round = status['last-round']
+                self._check(self._take_pending())
+
+                self._expire()
+            except Exception:
+                # algod unreachable: back off briefly and keep going
+                time.sleep(1)
+
+    async def _run_async(self, client):
+        loop = asyncio.get_running_loop()
+        while not self._stop.is_set():
+            try:
+                if not self._last_round:
+                    self._last_round = (await client.status())['last-round']
+
+                with self._lock:
+                    fresh, self._fresh = self._fresh, []
+                if fresh:
+                    await self._check_async(client, loop, fresh)
+
+                status = await client.status_after_block(self._last_round)
+                self._last_round = status['last-round']
+                await self._check_async(client, loop, self._take_pending())
+
+                self._expire()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                await asyncio.sleep(1)
+
+    async def _check_async(self, client, loop, txids: list):
+        for start in range(0, len(txids), BATCH_SIZE):
+            batch = txids[start:start + BATCH_SIZE]
+            infos = await asyncio.gather(
+                *(client.pending_transaction_info(txid) for txid in batch),
+                return_exceptions=True)
+            # _record may write to the link store
+            await loop.run_in_executor(None, self._record_many, batch, infos)
+
+    def _take_pending(self) -> list:
+        """Every watched txid, for the per-round check"""
+        with self._lock:
+            # Registrations made during the wait are covered by this pass
+            self._fresh = []
+            return list(self._pending)
+
+    def _record_many(self, txids: list, infos: list):
+        for txid, info in zip(txids, infos):
+            self._record(txid, info)
+
+    def _check(self, txids: list):
+        for start in range(0, len(txids), BATCH_SIZE):
+            batch = txids[start:start + BATCH_SIZE]
+            for txid, info in zip(batch, self._pool.map(self._fetch, batch)):
+                self._record(txid, info)
+
+    def _fetch(self, txid: str):
+        try:
+            return self.client.pending_transaction_info(txid)
+        except Exception as e:
+            return e
+
+    def _record(self, txid: str, info):
+        if isinstance(info, Exception):
+            # algod answers 404 while a txid is neither in its pool nor
+            # recently confirmed; it may still arrive from another node
+            if getattr(info, 'code', None) == 404:
+                with self._lock:
+                    watched = self._pending.get(txid)
+                    if watched is not None:
+                        watched['not_found'] = {
+                            'status': 'not_found',
+                            'error': 'Transaction not found on blockchain',
+                            'details': str(info)
+                        }
+            return
+
+        if info.get('confirmed-round'):
+            tx_details = info['txn']['txn']
+            result = {
+                'status': 'confirmed',
+                'confirmed_round': info['confirmed-round'],
+                'amount': tx_details.get('amt', 0),
+                'sender': tx_details.get('snd', 'unknown'),
+                'receiver': tx_details.get('rcv', 'unknown'),
+                'fee': tx_details.get('fee', 1000)
+            }
+        elif info.get('pool-error'):
+            result = {
+                'status': 'not_found',
+                'error': 'Transaction rejected by the network',
+                'details': info['pool-error']
+            }
+        else:
+            with self._lock:
+                watched = self._pending.get(txid)
+                if watched is not None:
+                    watched['not_found'] = None
+            return
+
+        with self._lock:
+            watched = self._pending.pop(txid, None)
+            self._results[txid] = (time.monotonic(), result)
+
+        if result['status'] == 'confirmed' and watched and watched['link_id']:
+            update_link_status(watched['link_id'], 'confirmed', txid)
+
+    def _expire(self):
+        cutoff = time.monotonic() - RESULT_TTL
+        with self._lock:
+            # Results are inserted in time order, so the oldest are first
+            while self._results:
+                txid = next(iter(self._results))
+                if self._results[txid][0] >= cutoff:
+                    break
+                del self._results[txid]
+
+            for txid, watched in list(self._pending.items()):
+                if not watched['registered_round']:
+                    # Registered before the first round was known
+                    watched['registered_round'] = self._last_round
+                elif self._last_round - watched['registered_round'] > MAX_PENDING_ROUNDS:
+                    del self._pending[txid]
+                    self._results[txid] = (time.monotonic(), {
+                        'status': 'not_found',
+                        'error': 'Transaction not confirmed within its validity window'
+                    })
+
+
+watcher = ConfirmationWatcher(algod_client)
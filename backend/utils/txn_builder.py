@@ -0,0 +1,102 @@
+# ============================================
+# FILE: backend/utils/txn_builder.py
+# ============================================
+"""
+Fast builder for unsigned checkout transactions
+
+Produces the same canonical msgpack bytes as algosdk's PaymentTxn +
+encoding.msgpack_encode, but skips the object model: params come from
+the per-round cache, address bytes are decoded once and memoized, and
+the transaction is packed straight from a dict with keys already in
+canonical (sorted) order.
+"""
+
+import base64
+import functools
+
+import msgpack
+from algosdk.encoding import checksum, decode_address
+
+from backend.utils.algorand import params_cache
+
+# Placeholder signature for sizing the signed transaction, as algosdk's
+# estimate_size() does with a throwaway key
+_DUMMY_SIGNATURE = bytes(64)
+
+# algosdk's fallback when SuggestedParams carries no min_fee
+_MIN_TXN_FEE = 1000
+
+
+@functools.lru_cache(maxsize=65536)
+def address_bytes(address: str) -> bytes:
+    """32-byte public key for an address (raises ValueError if invalid)"""
+    try:
+        return decode_address(address)
+    except Exception:
+        raise ValueError(f"Invalid Algorand address: {address}")
+
+
+@functools.lru_cache(maxsize=16)
+def _genesis_hash_bytes(genesis_hash: str) -> bytes:
+    return base64.b64decode(genesis_hash)
+
+
+def _pack(fields: dict) -> bytes:
+    # Canonical encoding: sorted keys, zero/empty values omitted
+    return msgpack.packb({k: fields[k] for k in sorted(fields) if fields[k]},
+                         use_bin_type=True)
+
+
+def _signed_size(fields: dict) -> int:
+    """Encoded size of the transaction once wrapped with a signature"""
+    txn = {k: fields[k] for k in sorted(fields) if fields[k]}
+    return len(msgpack.packb({'sig': _DUMMY_SIGNATURE, 'txn': txn}, use_bin_type=True))
+
+
+def build_payment(sender: str, receiver: str, amount: int, note: bytes = None, params=None):
+    """
+    Build an unsigned payment transaction
+
+    Args:
+        sender: Payer address
+        receiver: Merchant address
+        amount: Amount in microAlgos
+        note: Optional note bytes
+        params: SuggestedParams; defaults to the per-round cache
+
+    Returns:
+        Dictionary with transaction_id, unsigned_txn (base64 msgpack)
+        and the validity window
+    """
+    sp = params or params_cache.get()
+
+    fields = {
+        'amt': amount,
+        'fee': 0,
+        'fv': sp.first,
+        'gen': sp.gen,
+        'gh': _genesis_hash_bytes(sp.gh),
+        'lv': sp.last,
+        'note': note,
+        'rcv': address_bytes(receiver),
+        'snd': address_bytes(sender),
+        'type': 'pay',
+    }
+
+    fields['fee'] = sp.fee
+    if not sp.flat_fee:
+        # Per-byte fee times the size of the signed transaction, sized
+        # with the per-byte fee in place, exactly as PaymentTxn does
+        min_fee = _MIN_TXN_FEE if sp.min_fee is None else sp.min_fee
+        fields['fee'] = max(_signed_size(fields) * sp.fee, min_fee)
+
+    encoded = _pack(fields)
+    txid = base64.b32encode(checksum(b'TX' + encoded)).decode().rstrip('=')
+
+    return {
+        'transaction_id': txid,
+        'unsigned_txn': base64.b64encode(encoded).decode(),
+        'fee': fields['fee'],
+        'first_valid': sp.first,
+        'last_valid': sp.last
+    }
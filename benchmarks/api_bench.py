@@ -0,0 +1,301 @@
+# ============================================
+# FILE: benchmarks/api_bench.py
+# ============================================
+"""
+Latency and throughput benchmark for the checkout API
+
+Runs fully offline against backend.app:app with algod replaced by a
+local stub. For each database size the store is pre-filled with that
+many links, then every scenario is driven either through the Flask test
+client (no network, measures the app itself) or through a real threaded
+WSGI server over keep-alive HTTP connections.
+
+Results (p50/p95/p99 latency in ms and requests per second) are written
+as JSON together with the git commit, so two runs can be compared with
+benchmarks/compare.py.
+
+Run:
+    python -m benchmarks.api_bench --sizes 10,1000,100000 --output before.json
+    python -m benchmarks.api_bench --mode wsgi --concurrency 16 --sizes 1000000
+    python -m benchmarks.api_bench --algod fake --algod-latency 0.02 --algod-error-rate 0.05
+"""
+
+import argparse
+import atexit
+import base64
+import http.client
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from algosdk import account
+
+# Storage must point at a scratch directory before backend modules load
+_WORKDIR = tempfile.mkdtemp(prefix='checkout-bench-')
+atexit.register(shutil.rmtree, _WORKDIR, ignore_errors=True)
+os.environ.setdefault('LINKS_LOG_FILE', os.path.join(_WORKDIR, 'links.log'))
+os.environ.setdefault('LINKS_SQLITE_FILE', os.path.join(_WORKDIR, 'links.sqlite3'))
+os.environ.setdefault('LINKS_ARCHIVE_DIR', os.path.join(_WORKDIR, 'links_archive'))
+
+from backend.app import app  # noqa: E402
+from backend.database import links  # noqa: E402
+from backend.utils.algod_pool import get_algod_client  # noqa: E402
+from benchmarks import algod_stub  # noqa: E402
+from benchmarks.fake_algod import FakeAlgod  # noqa: E402
+
+SCENARIOS = ('health', 'create_link', 'pay', 'verify')
+
+DEFAULT_SIZES = '10,1000,100000,1000000'
+
+# Links are pre-filled in chunks so 1M links don't need one giant dict
+_FILL_CHUNK = 50_000
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies: list, elapsed: float, errors: int) -> dict:
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1e3,
+        'p95_ms': percentile(latencies, 95) * 1e3,
+        'p99_ms': percentile(latencies, 99) * 1e3,
+        'max_ms': latencies[-1] * 1e3 if latencies else 0.0
+    }
+
+
+# ---------- fixtures ----------
+
+def reset_store(size: int, receivers: list) -> list:
+    """Fresh store with `size` links; returns a sample of their ids"""
+    links.flush_click_counts()
+    store = links._get_store()
+    if hasattr(store, 'close'):
+        store.close()
+    for path in (links.LOG_FILE, links.SQLITE_FILE):
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    links._store = None
+    links._cache.clear()
+
+    store = links._get_store()
+    created = datetime.now().isoformat()
+    sample = []
+    for start in range(0, size, _FILL_CHUNK):
+        chunk = {}
+        for i in range(start, min(size, start + _FILL_CHUNK)):
+            link_id = f'b{i:07x}'
+            chunk[link_id] = {
+                'amount_micro': 1_000_000 + (i % 1000) * 10_000,
+                'receiver': receivers[i % len(receivers)],
+                'description': f'bench {i}',
+                'created': created,
+                'status': 'unused',
+                'txid': None,
+                'txn_timestamp': None,
+                'click_count': 0,
+                'expires_at': None
+            }
+        store.put_many(chunk)
+        sample.extend(random.sample(list(chunk), min(len(chunk), 1000)))
+    return sample
+
+
+def build_requests(scenario: str, count: int, link_ids: list, receivers: list) -> list:
+    """(method, path, json body) tuples for one scenario"""
+    requests = []
+    for i in range(count):
+        if scenario == 'health':
+            requests.append(('GET', '/health', None))
+        elif scenario == 'create_link':
+            requests.append(('POST', '/api/create-link', {
+                'amount': 1.5,
+                'receiver_address': receivers[i % len(receivers)],
+                'description': f'bench create {i}'
+            }))
+        elif scenario == 'pay':
+            link_id = link_ids[i % len(link_ids)]
+            sender = receivers[(i + 1) % len(receivers)]
+            requests.append(('GET', f'/api/pay/{link_id}?user_address={sender}', None))
+        elif scenario == 'verify':
+            link_id = link_ids[i % len(link_ids)]
+            # Repeat polls for a small set of txids, like real browsers do
+            txid = base64.b32encode(b'BENCHTX%03d' % (i % 256) + bytes(22)).decode().rstrip('=')
+            requests.append(('GET', f'/api/verify?txid={txid}&link_id={link_id}', None))
+    return requests
+
+
+# ---------- drivers ----------
+
+def run_test_client(requests: list) -> dict:
+    client = app.test_client()
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for method, path, body in requests:
+        t0 = time.perf_counter()
+        resp = client.open(path, method=method, json=body)
+        latencies.append(time.perf_counter() - t0)
+        if resp.status_code >= 500:
+            errors += 1
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+class WSGIServer:
+    """Threaded werkzeug server with HTTP/1.1 keep-alive on a free port"""
+
+    def __init__(self):
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class KeepAliveHandler(WSGIRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self.server = make_server('127.0.0.1', 0, app, threaded=True,
+                                  request_handler=KeepAliveHandler)
+        self.port = self.server.socket.getsockname()[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+
+
+def run_wsgi(requests: list, port: int, concurrency: int) -> dict:
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    shares = [requests[i::concurrency] for i in range(concurrency)]
+
+    def worker(share):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        mine = []
+        failed = 0
+        for method, path, body in share:
+            data = json.dumps(body) if body is not None else None
+            headers = {'Content-Type': 'application/json'} if body is not None else {}
+            t0 = time.perf_counter()
+            conn.request(method, path, body=data, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            mine.append(time.perf_counter() - t0)
+            if resp.status >= 500:
+                failed += 1
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=worker, args=(share,)) for share in shares]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, time.perf_counter() - started, errors[0])
+
+
+# ---------- main ----------
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f'comma-separated database sizes (default {DEFAULT_SIZES})')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=2000, help='requests per scenario')
+    parser.add_argument('--mode', choices=('client', 'wsgi'), default='client')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads in wsgi mode')
+    parser.add_argument('--algod', choices=('stub', 'fake'), default='stub',
+                        help='in-process stub, or the fake algod HTTP server')
+    parser.add_argument('--algod-latency', type=float, default=0.0)
+    parser.add_argument('--algod-error-rate', type=float, default=0.0)
+    parser.add_argument('--round-time', type=float, default=2.8)
+    parser.add_argument('--output', help='write results JSON here')
+    args = parser.parse_args(argv)
+
+    fake = None
+    if args.algod == 'fake':
+        fake = FakeAlgod(latency=args.algod_latency, error_rate=args.algod_error_rate,
+                         round_time=args.round_time).start()
+        algod_stub.install(get_algod_client(fake.url))
+    else:
+        algod_stub.install(algod_stub.AlgodStub(round_time=args.round_time))
+    receivers = [account.generate_account()[1] for _ in range(100)]
+    scenarios = [s for s in args.scenarios.split(',') if s]
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'backend': links.LINKS_BACKEND,
+        'mode': args.mode,
+        'algod': args.algod,
+        'algod_latency': args.algod_latency,
+        'algod_error_rate': args.algod_error_rate,
+        'concurrency': args.concurrency if args.mode == 'wsgi' else 1,
+        'requests_per_scenario': args.requests,
+        'runs': []
+    }
+
+    server = WSGIServer().__enter__() if args.mode == 'wsgi' else None
+    try:
+        for size in (int(s) for s in args.sizes.split(',')):
+            fill_started = time.perf_counter()
+            link_ids = reset_store(size, receivers)
+            fill_seconds = time.perf_counter() - fill_started
+            print(f"\n📦 {size} links (filled in {fill_seconds:.1f}s)")
+
+            for scenario in scenarios:
+                requests = build_requests(scenario, args.requests, link_ids, receivers)
+                if server:
+                    stats = run_wsgi(requests, server.port, args.concurrency)
+                else:
+                    stats = run_test_client(requests)
+                results['runs'].append({'db_size': size, 'scenario': scenario, **stats})
+                print(f"  {scenario:12} {stats['rps']:9.0f} req/s   p50 {stats['p50_ms']:7.3f} ms   "
+                      f"p95 {stats['p95_ms']:7.3f} ms   p99 {stats['p99_ms']:7.3f} ms   "
+                      f"errors {stats['errors']}")
+    finally:
+        if server:
+            server.__exit__(None, None, None)
+        if fake:
+            fake.stop()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+    return results
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
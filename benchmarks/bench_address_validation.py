@@ -0,0 +1,92 @@
+# ============================================
+# FILE: benchmarks/bench_address_validation.py
+# ============================================
+"""
+Microbenchmark: per-call cost of Algorand address validation
+
+Compares the original is_valid_address (full base32 decode + checksum
+on every call) with the current one (alphabet pre-filter + memoized
+checksum), in both lenient (MVP) and strict mode.
+
+Run:
+    python -m benchmarks.bench_address_validation
+"""
+
+import timeit
+
+from algosdk import account
+from algosdk.encoding import decode_address
+
+from backend.utils import algorand
+
+CALLS = 200_000
+
+
+def legacy_is_valid_address(address: str) -> bool:
+    """is_valid_address as it was before the validation cache"""
+    if not address:
+        return False
+    if len(address) != 58:
+        return False
+    try:
+        decode_address(address)
+        return True
+    except:
+        if len(address) == 58:
+            return True
+        return False
+
+
+def _per_call_ns(fn, addresses, setup=lambda: None) -> float:
+    count = len(addresses)
+    loops = max(1, CALLS // count)
+
+    def run():
+        for address in addresses:
+            fn(address)
+
+    return min(timeit.repeat(run, setup=setup, number=loops, repeat=3)) / (loops * count) * 1e9
+
+
+def main():
+    hot = [account.generate_account()[1] for _ in range(1000)]
+    cold = [account.generate_account()[1] for _ in range(CALLS // 10)]
+    bad_alphabet = ['0' * 58, 'a' * 58, '!' * 58, '1' * 58] * 250
+
+    def strict(address):
+        algorand.STRICT_ADDRESS_VALIDATION = True
+        return algorand.is_valid_address(address)
+
+    scenarios = [
+        ('hot (1k repeating valid)', hot),
+        ('cold (20k distinct valid)', cold),
+        ('bad alphabet', bad_alphabet),
+    ]
+
+    print(f"{'scenario':28} {'legacy':>10} {'lenient':>10} {'strict':>10}   (ns/call)")
+    for name, addresses in scenarios:
+        algorand._check_address.cache_clear()
+        legacy = _per_call_ns(legacy_is_valid_address, addresses)
+
+        algorand.STRICT_ADDRESS_VALIDATION = False
+        lenient = _per_call_ns(algorand.is_valid_address, addresses)
+
+        # Every repeat starts with an empty cache
+        strict_ns = _per_call_ns(strict, addresses, setup=algorand._check_address.cache_clear)
+        algorand.STRICT_ADDRESS_VALIDATION = False
+
+        print(f"{name:28} {legacy:10.0f} {lenient:10.0f} {strict_ns:10.0f}")
+
+    batch = hot * 20
+    algorand._check_address.cache_clear()
+    algorand.STRICT_ADDRESS_VALIDATION = True
+    started = timeit.default_timer()
+    algorand.validate_addresses(batch)
+    elapsed = timeit.default_timer() - started
+    print(f"\nvalidate_addresses (strict): {len(batch)} addresses "
+          f"({len(set(batch))} distinct) in {elapsed * 1e3:.2f} ms")
+    print(f"cache: {algorand.address_cache_info()}")
+
+
+if __name__ == '__main__':
+    main()
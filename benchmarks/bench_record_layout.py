@@ -0,0 +1,172 @@
+# ============================================
+# FILE: benchmarks/bench_record_layout.py
+# ============================================
+"""
+Bytes per link on disk and in RAM, old record layouts vs the binary one
+
+Disk:
+    json file   - links_database.json as _save_database wrote it (indent=2)
+    text log    - log_store records before the binary format (crc + JSON line)
+    binary log  - current log_store records (link_record.py)
+
+RAM (tracemalloc, what stays allocated after loading):
+    dict per link - the whole JSON file loaded, as _load_database held it
+    text index    - the log store's in-memory index before IndexEntry:
+                    (offset, length) tuples, a (created, receiver, status)
+                    tuple of strings per link and the sorted key lists
+    binary index  - LinkLogStore opened on the binary log
+
+Also times recovery (opening the log) for the text and binary formats.
+
+Run:
+    python -m benchmarks.bench_record_layout --links 1000000
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+import zlib
+from bisect import insort
+from datetime import datetime, timedelta
+
+from algosdk import account
+
+from backend.database.log_store import LinkLogStore
+
+
+def make_links(count: int, receivers: int, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    addresses = [account.generate_account()[1] for _ in range(receivers)]
+    start = datetime(2025, 1, 1)
+    links = {}
+    for i in range(count):
+        created = start + timedelta(seconds=i * 7, microseconds=rng.randrange(1_000_000))
+        confirmed = rng.random() < 0.3
+        links['%012x' % (i * 2654435761 % (1 << 48))] = {
+            'amount_micro': rng.randrange(1, 50_000_000),
+            'receiver': rng.choice(addresses),
+            'description': f'Invoice #{i}',
+            'created': created.isoformat(),
+            'status': 'confirmed' if confirmed else 'unused',
+            'txid': (base64.b32encode(rng.randbytes(32)).decode().rstrip('=')
+                     if confirmed else None),
+            'txn_timestamp': (created + timedelta(minutes=3)).isoformat() if confirmed else None,
+            'click_count': rng.randrange(0, 20),
+            'expires_at': None
+        }
+    return links
+
+
+def _text_record(payload: dict) -> bytes:
+    """A log record as log_store wrote it before the binary format"""
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return b'%08x %s\n' % (zlib.crc32(body), body)
+
+
+def _text_index(path: str):
+    """The log store's in-memory index as it was before IndexEntry"""
+    index, meta, ordered, by_receiver, by_status = {}, {}, [], {}, {}
+    offset = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            payload = json.loads(line[9:-1])
+            record = payload['rec']
+            index[payload['id']] = (offset, len(line))
+            meta[payload['id']] = (record['created'], record['receiver'], record['status'])
+            key = (record['created'], payload['id'])
+            for entries in (ordered, by_receiver.setdefault(record['receiver'], []),
+                            by_status.setdefault(record['status'], [])):
+                if not entries or entries[-1] < key:
+                    entries.append(key)
+                else:
+                    insort(entries, key)
+            offset += len(line)
+    return index, meta, ordered, by_receiver, by_status
+
+
+def _retained(load):
+    """(bytes still allocated by load()'s result, seconds)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - started
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return retained, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--links', type=int, default=1_000_000)
+    parser.add_argument('--receivers', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"generating {args.links:,} links for {args.receivers:,} receivers...")
+    links = make_links(args.links, args.receivers)
+    workdir = tempfile.mkdtemp(prefix='checkout-layout-')
+    try:
+        json_path = os.path.join(workdir, 'links_database.json')
+        text_path = os.path.join(workdir, 'text.log')
+        binary_path = os.path.join(workdir, 'binary.log')
+
+        with open(json_path, 'w') as f:
+            json.dump(links, f, indent=2)
+        with open(text_path, 'wb') as f:
+            for link_id, record in links.items():
+                f.write(_text_record({'op': 'put', 'id': link_id, 'rec': record}))
+        store = LinkLogStore(binary_path, fsync='off')
+        items = list(links.items())
+        for i in range(0, len(items), 10_000):
+            store.put_many(dict(items[i:i + 10_000]))
+        store.close()
+        del items
+
+        # The text log must read back the same as the binary one
+        check = LinkLogStore(text_path, fsync='off')
+        sample = random.Random(2).sample(list(links), min(1000, len(links)))
+        assert all(check.get(link_id) == links[link_id] for link_id in sample)
+        check.close()
+        del check, links
+
+        count = args.links
+        print(f"\n{'disk':<14}{'bytes/link':>12}{'total MB':>12}")
+        for name, path in (('json file', json_path), ('text log', text_path),
+                           ('binary log', binary_path)):
+            size = os.path.getsize(path)
+            print(f"{name:<14}{size / count:>12.1f}{size / 1e6:>12.1f}")
+
+        def load_json():
+            with open(json_path) as f:
+                return json.load(f)
+
+        def open_store(path):
+            def load():
+                return LinkLogStore(path, fsync='off')
+            return load
+
+        print(f"\n{'ram':<14}{'bytes/link':>12}{'total MB':>12}{'load s':>10}")
+        for name, load in (('dict per link', load_json),
+                           ('text index', lambda: _text_index(text_path)),
+                           ('binary index', open_store(binary_path))):
+            retained, elapsed = _retained(load)
+            print(f"{name:<14}{retained / count:>12.1f}{retained / 1e6:>12.1f}{elapsed:>10.2f}")
+
+        print(f"\n{'recovery':<14}{'s':>12}")
+        for name, path in (('text log', text_path), ('binary log', binary_path)):
+            started = time.perf_counter()
+            LinkLogStore(path, fsync='off').close()
+            print(f"{name:<14}{time.perf_counter() - started:>12.2f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
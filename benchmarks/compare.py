@@ -0,0 +1,46 @@
+# ============================================
+# FILE: benchmarks/compare.py
+# ============================================
+"""
+Compare two api_bench result files
+
+Run:
+    python -m benchmarks.compare before.json after.json
+"""
+
+import json
+import sys
+
+
+def _index(results: dict) -> dict:
+    return {(run['db_size'], run['scenario']): run for run in results['runs']}
+
+
+def main(before_path: str, after_path: str):
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+
+    print(f"before: {before['commit']}   after: {after['commit']}\n")
+    print(f"{'size':>9} {'scenario':12} {'req/s':>18} {'p50 ms':>20} {'p99 ms':>20}")
+
+    old_runs = _index(before)
+    for key, new in _index(after).items():
+        old = old_runs.get(key)
+        if old is None:
+            continue
+
+        def cell(field):
+            change = (new[field] / old[field] - 1) * 100 if old[field] else 0.0
+            return f"{old[field]:8.2f}→{new[field]:8.2f} {change:+5.0f}%"
+
+        size, scenario = key
+        print(f"{size:9} {scenario:12} {cell('rps'):>18} {cell('p50_ms'):>20} {cell('p99_ms'):>20}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print('Usage: python -m benchmarks.compare <before.json> <after.json>')
+        sys.exit(1)
+    main(sys.argv[1], sys.argv[2])
@@ -0,0 +1,357 @@
+# ============================================
+# FILE: benchmarks/fake_algod.py
+# ============================================
+"""
+Local algod stand-in for offline performance testing
+
+A small HTTP server that speaks enough of the algod v2 REST API for the
+backend: the pooled client, retry logic, params cache, confirmation
+watcher and payment indexer can all be pointed at it and benchmarked on
+one machine.
+
+Endpoints:
+    GET  /health, /versions
+    GET  /v2/status
+    GET  /v2/status/wait-for-block-after/{round}
+    GET  /v2/transactions/params
+    GET  /v2/transactions/pending/{txid}
+    POST /v2/transactions                 (raw signed msgpack)
+    GET  /v2/accounts/{address}
+    GET  /v2/applications/{id}
+    GET  /v2/blocks/{round}?format=msgpack
+
+Knobs: added latency per request, error rate (answered with 503 or 429),
+and block production rate. Submitted transactions are included in the
+next block. Txids the server has never seen are reported as pending
+until auto_confirm_rounds have passed, then confirmed. That way
+verify-style polling works without real signed transactions.
+
+In-process:
+    server = FakeAlgod(round_time=1.0, latency=0.005).start()
+    client = get_algod_client(server.url)
+
+As a subprocess:
+    python -m benchmarks.fake_algod --port 4001 --latency 0.005 --error-rate 0.01
+"""
+
+import argparse
+import base64
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import parse
+
+import msgpack
+from algosdk.encoding import checksum, encode_address
+
+GENESIS_ID = 'fake-v1'
+GENESIS_HASH = b'\x02' * 32
+
+# Longest a wait-for-block-after call is held open, like algod's own limit
+MAX_BLOCK_WAIT = 60
+
+
+def _txid(txn: dict) -> str:
+    encoded = msgpack.packb(dict(sorted(txn.items())), use_bin_type=True)
+    return base64.b32encode(checksum(b'TX' + encoded)).decode().rstrip('=')
+
+
+def _json_txn(txn: dict) -> dict:
+    """Block-style txn dict -> the JSON shape algod uses in responses"""
+    out = {}
+    for key, value in txn.items():
+        if key in ('snd', 'rcv', 'close') and isinstance(value, bytes):
+            out[key] = encode_address(value)
+        elif isinstance(value, bytes):
+            out[key] = base64.b64encode(value).decode()
+        else:
+            out[key] = value
+    return out
+
+
+class FakeChain:
+    """Rounds, submitted transactions and blocks"""
+
+    def __init__(self, round_time: float, auto_confirm_rounds: int):
+        self.round_time = round_time
+        self.auto_confirm_rounds = auto_confirm_rounds
+        self.first_round = 1000
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.tick = threading.Condition(self.lock)
+
+        self.mempool = []           # signed txns waiting for the next block
+        self.blocks = {}            # round -> list of SignedTxnInBlock dicts
+        self.confirmed = {}         # txid -> (round, txn dict)
+        self.first_seen = {}        # unknown txid -> round first asked about
+        self.app_state = {'trse': 0, 'pcnt': 0}
+        self._produced = self.first_round
+
+    @property
+    def last_round(self) -> int:
+        return self.first_round + int((time.monotonic() - self.started) / self.round_time)
+
+    def produce_blocks(self):
+        """Seal blocks for every round that has elapsed"""
+        with self.lock:
+            target = self.last_round
+            while self._produced < target:
+                self._produced += 1
+                txns = []
+                for stxn in self.mempool:
+                    txn = dict(stxn['txn'])
+                    self.confirmed[_txid(txn)] = (self._produced, txn)
+                    if txn.get('type') == 'pay':
+                        self.app_state['trse'] += txn.get('amt', 0)
+                        self.app_state['pcnt'] += 1
+                    # Blocks carry txns with genesis fields stripped
+                    txn.pop('gh', None)
+                    has_gen = txn.pop('gen', None) is not None
+                    txns.append({'txn': txn, 'sig': stxn.get('sig', b''), 'hgi': has_gen})
+                self.mempool = []
+                self.blocks[self._produced] = txns
+                # Keep memory bounded on long runs
+                self.blocks.pop(self._produced - 1000, None)
+            self.tick.notify_all()
+
+    def submit(self, raw: bytes) -> str:
+        unpacker = msgpack.Unpacker(raw=False, strict_map_key=False)
+        unpacker.feed(raw)
+        txid = None
+        with self.lock:
+            for stxn in unpacker:
+                self.mempool.append(stxn)
+                txid = _txid(stxn['txn'])
+        return txid
+
+    def pending(self, txid: str):
+        with self.lock:
+            if txid in self.confirmed:
+                round_num, txn = self.confirmed[txid]
+                return {'confirmed-round': round_num, 'pool-error': '',
+                        'txn': {'txn': _json_txn(txn)}}
+            for stxn in self.mempool:
+                if _txid(stxn['txn']) == txid:
+                    return {'pool-error': '', 'txn': {'txn': _json_txn(stxn['txn'])}}
+
+            # Unknown txid: pretend it lands a few rounds after first asked about
+            seen = self.first_seen.setdefault(txid, self.last_round)
+            if self.auto_confirm_rounds < 0:
+                return None
+            if self.last_round - seen >= self.auto_confirm_rounds:
+                return {'confirmed-round': seen + self.auto_confirm_rounds, 'pool-error': '',
+                        'txn': {'txn': {'type': 'pay', 'amt': 1_000_000, 'fee': 1000,
+                                        'snd': encode_address(b'\x03' * 32),
+                                        'rcv': encode_address(b'\x04' * 32)}}}
+            return {'pool-error': '', 'txn': {'txn': {}}}
+
+    def block(self, round_num: int):
+        with self.lock:
+            txns = self.blocks.get(round_num)
+            if txns is None:
+                return None
+            return {'block': {'gen': GENESIS_ID, 'gh': GENESIS_HASH, 'rnd': round_num,
+                              'ts': int(time.time()), 'txns': txns}}
+
+
+class FakeAlgod:
+    """Threaded HTTP server wrapping a FakeChain"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503,
+                 round_time: float = 2.8, auto_confirm_rounds: int = 1):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.chain = FakeChain(round_time, auto_confirm_rounds)
+        self.requests = 0
+        self.errors_injected = 0
+
+        fake = self
+
+        class Handler(_Handler):
+            server_fake = fake
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.url = 'http://%s:%d' % self.httpd.server_address[:2]
+        self._threads = []
+
+    def start(self):
+        for target in (self.httpd.serve_forever, self._block_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _block_loop(self):
+        while True:
+            self.chain.produce_blocks()
+            time.sleep(min(0.05, self.chain.round_time / 4))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_fake = None
+
+    _ROUTES = [
+        ('GET', re.compile(r'^/health$'), '_health'),
+        ('GET', re.compile(r'^/versions$'), '_versions'),
+        ('GET', re.compile(r'^/v2/status$'), '_status'),
+        ('GET', re.compile(r'^/v2/status/wait-for-block-after/(\d+)$'), '_wait_for_block'),
+        ('GET', re.compile(r'^/v2/transactions/params$'), '_params'),
+        ('GET', re.compile(r'^/v2/transactions/pending/([A-Z2-7]+)$'), '_pending'),
+        ('POST', re.compile(r'^/v2/transactions$'), '_send'),
+        ('GET', re.compile(r'^/v2/accounts/([A-Z2-7]{58})$'), '_account'),
+        ('GET', re.compile(r'^/v2/applications/(\d+)$'), '_application'),
+        ('GET', re.compile(r'^/v2/blocks/(\d+)$'), '_block'),
+    ]
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method: str):
+        fake = self.server_fake
+        fake.requests += 1
+        url = parse.urlsplit(self.path)
+        self.query = dict(parse.parse_qsl(url.query))
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+        if fake.latency:
+            time.sleep(fake.latency)
+
+        if fake.error_rate and random.random() < fake.error_rate:
+            fake.errors_injected += 1
+            return self._reply(fake.error_status, {'message': 'injected failure'})
+
+        for route_method, pattern, handler in self._ROUTES:
+            match = pattern.match(url.path)
+            if match and route_method == method:
+                return getattr(self, handler)(body, *match.groups())
+        self._reply(404, {'message': 'route not found'})
+
+    def _reply(self, status: int, payload, msgpack_body: bool = False):
+        if msgpack_body:
+            data = msgpack.packb(payload, use_bin_type=True)
+            content_type = 'application/msgpack'
+        else:
+            data = json.dumps(payload).encode()
+            content_type = 'application/json'
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    # ---------- endpoints ----------
+
+    def _health(self, body):
+        self._reply(200, {})
+
+    def _versions(self, body):
+        self._reply(200, {'genesis_id': GENESIS_ID,
+                          'genesis_hash_b64': base64.b64encode(GENESIS_HASH).decode(),
+                          'versions': ['v2']})
+
+    def _status(self, body):
+        chain = self.server_fake.chain
+        self._reply(200, {'last-round': chain.last_round, 'time-since-last-round': 0,
+                          'catchup-time': 0, 'last-version': 'fake'})
+
+    def _wait_for_block(self, body, round_num):
+        chain = self.server_fake.chain
+        round_num = int(round_num)
+        deadline = time.monotonic() + MAX_BLOCK_WAIT
+        with chain.tick:
+            while chain._produced <= round_num and time.monotonic() < deadline:
+                chain.tick.wait(timeout=0.5)
+        self._status(body)
+
+    def _params(self, body):
+        chain = self.server_fake.chain
+        self._reply(200, {
+            'consensus-version': 'fake',
+            'fee': 0,
+            'min-fee': 1000,
+            'genesis-id': GENESIS_ID,
+            'genesis-hash': base64.b64encode(GENESIS_HASH).decode(),
+            'last-round': chain.last_round
+        })
+
+    def _pending(self, body, txid):
+        info = self.server_fake.chain.pending(txid)
+        if info is None:
+            return self._reply(404, {'message': 'txn does not exist'})
+        self._reply(200, info)
+
+    def _send(self, body):
+        try:
+            txid = self.server_fake.chain.submit(body)
+        except Exception as e:
+            return self._reply(400, {'message': f'could not decode transaction: {e}'})
+        self._reply(200, {'txId': txid})
+
+    def _account(self, body, address):
+        self._reply(200, {'address': address, 'amount': 10_000_000_000,
+                          'amount-without-pending-rewards': 10_000_000_000,
+                          'min-balance': 100_000, 'round': self.server_fake.chain.last_round,
+                          'status': 'Offline'})
+
+    def _application(self, body, app_id):
+        state = self.server_fake.chain.app_state
+        self._reply(200, {'id': int(app_id), 'params': {
+            'creator': encode_address(b'\x05' * 32),
+            'global-state': [
+                {'key': base64.b64encode(key.encode()).decode(),
+                 'value': {'type': 2, 'uint': value, 'bytes': ''}}
+                for key, value in state.items()
+            ]
+        }})
+
+    def _block(self, body, round_num):
+        block = self.server_fake.chain.block(int(round_num))
+        if block is None:
+            return self._reply(404, {'message': 'block not available'})
+        if self.query.get('format') == 'msgpack':
+            return self._reply(200, block, msgpack_body=True)
+        self._reply(200, {'block': {k: (base64.b64encode(v).decode() if isinstance(v, bytes) else v)
+                                    for k, v in block['block'].items() if k != 'txns'}})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fake algod for offline benchmarks')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=4001)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added per request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests that fail')
+    parser.add_argument('--error-status', type=int, default=503, choices=(429, 500, 502, 503, 504))
+    parser.add_argument('--round-time', type=float, default=2.8, help='seconds per block')
+    parser.add_argument('--auto-confirm-rounds', type=int, default=1,
+                        help='rounds until unknown txids confirm (-1: answer 404)')
+    args = parser.parse_args(argv)
+
+    fake = FakeAlgod(args.host, args.port, args.latency, args.error_rate, args.error_status,
+                     args.round_time, args.auto_confirm_rounds).start()
+    print(f"🧪 Fake algod listening on {fake.url} (ALGORAND_SERVER={fake.url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == '__main__':
+    main()
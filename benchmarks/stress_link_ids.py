@@ -0,0 +1,154 @@
+# ============================================
+# FILE: benchmarks/stress_link_ids.py
+# ============================================
+"""
+Stress test for the link ID generator (backend/database/link_ids.py)
+
+ids mode generates millions of IDs from several processes x threads
+and checks that IDs never repeat within a process, that each thread
+sees strictly increasing IDs, and that IDs decode back to the time they
+were made. It also counts cross-process repeats: separate processes
+share no state, so a few are expected at high rates and are exactly
+what the store's insert-if-absent check exists for.
+
+store mode creates links through links.create_links() from several
+processes sharing one SQLite database, and checks that no link was
+lost to an ID collision. --force-collisions makes every process start
+each millisecond's counter at 0 with no random bits, so the processes
+collide constantly
+and the store's insert-if-absent check has to resolve every one.
+
+Run:
+    python -m benchmarks.stress_link_ids ids --count 5000000 --processes 4 --threads 4
+    python -m benchmarks.stress_link_ids store --count 200000 --processes 4 --force-collisions
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+# Fresh interpreters, like separate gunicorn workers; a forked child
+# would inherit the parent's store connection
+_spawn = multiprocessing.get_context('spawn')
+
+
+def _generate(count: int, threads: int, force_collisions: bool):
+    """Runs in a worker process; returns (ids, ordered and unique, seconds)"""
+    from backend.database import link_ids
+    if force_collisions:
+        link_ids._START_MASK = link_ids._RANDOM_MASK = 0
+
+    per_thread = [None] * threads
+
+    def work(slot):
+        made = [link_ids.new_link_id() for _ in range(count // threads)]
+        per_thread[slot] = made
+
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    # IDs from one generator interleave between threads, but each
+    # thread's own sequence must still be strictly increasing
+    ordered = all(all(a < b for a, b in zip(ids, ids[1:])) for ids in per_thread)
+    made = [i for ids in per_thread for i in ids]
+    return made, ordered and len(set(made)) == len(made), elapsed
+
+
+def run_ids(args):
+    per_process = args.count // args.processes
+    with _spawn.Pool(args.processes) as pool:
+        results = pool.starmap(_generate, [(per_process, args.threads, args.force_collisions)]
+                               * args.processes)
+
+    from backend.database.link_ids import ID_LENGTH, created_ms
+    all_ids = [i for ids, _, _ in results for i in ids]
+    unique = len(set(all_ids))
+    slowest = max(elapsed for _, _, elapsed in results)
+    now_ms = time.time() * 1000
+
+    print(f"generated   {len(all_ids):,} ids in {slowest:.2f}s "
+          f"({len(all_ids) / slowest:,.0f} ids/s over {args.processes} processes)")
+    print(f"length      {ID_LENGTH} chars, e.g. {all_ids[0]}")
+    ordered = all(ordered for _, ordered, _ in results)
+    recent = all(abs(created_ms(i) - now_ms) < 3_600_000 for i in all_ids[::997])
+    print(f"per process ordered and unique: {ordered}")
+    print(f"timestamps  {recent}")
+    print(f"repeats     {len(all_ids) - unique:,} across processes "
+          f"(resolved by the store check, see store mode)")
+    return 0 if ordered and recent else 1
+
+
+def _create(db_path: str, count: int, batch: int, force_collisions: bool):
+    os.environ['LINKS_BACKEND'] = 'sqlite'
+    os.environ['LINKS_SQLITE_FILE'] = db_path
+    os.environ['LINKS_ARCHIVE_DIR'] = os.path.join(os.path.dirname(db_path), 'links_archive')
+    from backend.database import link_ids, links
+    if force_collisions:
+        link_ids._START_MASK = link_ids._RANDOM_MASK = 0
+
+    receiver = 'A' * 58
+    created = []
+    for start in range(0, count, batch):
+        size = min(batch, count - start)
+        created.extend(link['link_id'] for link in
+                       links.create_links([(1_000_000, receiver, '')] * size))
+    return created
+
+
+def run_store(args):
+    workdir = tempfile.mkdtemp(prefix='checkout-ids-')
+    try:
+        db_path = os.path.join(workdir, 'links.sqlite3')
+        # Create the schema once before the workers race
+        from backend.database.sqlite_store import LinkSQLiteStore
+        LinkSQLiteStore(db_path).close()
+
+        per_process = args.count // args.processes
+        started = time.perf_counter()
+        with _spawn.Pool(args.processes) as pool:
+            results = pool.starmap(_create, [(db_path, per_process, args.batch,
+                                              args.force_collisions)] * args.processes)
+        elapsed = time.perf_counter() - started
+
+        stored = len(LinkSQLiteStore(db_path))
+        returned = [i for ids in results for i in ids]
+
+        print(f"created     {len(returned):,} links in {elapsed:.2f}s "
+              f"({len(returned) / elapsed:,.0f} links/s over {args.processes} processes)")
+        print(f"stored      {stored:,}")
+        print(f"unique ids  {len(set(returned)):,}")
+        return 0 if stored == len(returned) == len(set(returned)) else 1
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('mode', choices=('ids', 'store'))
+    parser.add_argument('--count', type=int, default=None,
+                        help='total IDs (default 5,000,000) or links (default 200,000)')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4, help='threads per process (ids mode)')
+    parser.add_argument('--batch', type=int, default=1000, help='links per create_links call')
+    parser.add_argument('--force-collisions', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.mode == 'ids':
+        args.count = args.count or 5_000_000
+        return run_ids(args)
+    args.count = args.count or 200_000
+    return run_store(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
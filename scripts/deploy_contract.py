@@ -6,12 +6,16 @@ Deploy the smart contract to Algorand testnet
 Run this once to deploy, then save the App ID
 """
 
-from algosdk.v2client import algod
-from algosdk.mnemonic import to_private_key
 from algosdk import mnemonic
 import os
+import sys
 from dotenv import load_dotenv
 
+# Run as `python scripts/deploy_contract.py`: make the backend package importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.algod_pool import get_algod_client  # noqa: E402
+
 load_dotenv()
 
 
@@ -23,10 +27,7 @@ def deploy_contract():
     try:
         # Connect to Algorand testnet
         print("📡 Connecting to Algorand testnet...")
-        client = algod.AlgodClient(
-            algod_token='',
-            algod_address='https://testnet-api.algonode.cloud'
-        )
+        client = get_algod_client()
         
         # Get testnet parameters
         params = client.suggested_params()
@@ -45,9 +46,6 @@ def deploy_contract():
         
         print(f"👤 Creator address: {creator_address}\n")
         
-        # Import contract
-        from smart_contracts.instant_checkout import app
-        
         # Create application
         print("📝 Creating application...\n")
         
@@ -0,0 +1,19 @@
+"""Keeps every file the backend would create inside a scratch directory"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+# Set before any backend module reads its configuration
+_WORKDIR = tempfile.mkdtemp(prefix='checkout-tests-')
+atexit.register(shutil.rmtree, _WORKDIR, ignore_errors=True)
+for name, filename in (('LINKS_LOG_FILE', 'links.log'),
+                       ('LINKS_SQLITE_FILE', 'links.sqlite3'),
+                       ('LINKS_ARCHIVE_DIR', 'links_archive'),
+                       ('LINKS_ANALYTICS_FILE', 'links.analytics.sqlite3'),
+                       ('INDEXER_CHECKPOINT_FILE', 'indexer_checkpoint.json')):
+    os.environ.setdefault(name, os.path.join(_WORKDIR, filename))
+# Tests drive expiry and archiving themselves
+os.environ.setdefault('LINKS_REAPER', '0')
+os.environ.setdefault('LINKS_ARCHIVE', '0')
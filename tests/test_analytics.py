@@ -0,0 +1,91 @@
+"""Analytics rollups shared through SQLite"""
+
+from datetime import datetime, timedelta
+
+from backend.database.analytics import AnalyticsRollups
+
+RECEIVER = 'R' * 58
+
+
+def _rollups(path, links=()):
+    return AnalyticsRollups(str(path), flush_interval=3600,
+                            source=lambda: [(str(i), link) for i, link in enumerate(links)])
+
+
+def _record(created, status='unused', clicks=0, amount_micro=1_000_000, txn_timestamp=None):
+    return {'receiver': RECEIVER, 'created': created.isoformat(), 'status': status,
+            'click_count': clicks, 'amount_micro': amount_micro,
+            'txn_timestamp': txn_timestamp.isoformat() if txn_timestamp else None}
+
+
+def test_backfill_runs_once_and_skips_what_it_counted(tmp_path):
+    now = datetime.now()
+    old = [_record(now - timedelta(days=3), 'confirmed', clicks=4, amount_micro=2_500_000,
+                   txn_timestamp=now - timedelta(days=2)),
+           _record(now - timedelta(minutes=5), clicks=1)]
+    worker = _rollups(tmp_path / 'a.sqlite3', old)
+
+    # Queued before the backfill and already in the records: not counted twice
+    worker.on_link_change('created', '1', old[1])
+    total = worker.summary(RECEIVER)['total']
+    assert (total['links'], total['clicks'], total['confirmed'], total['volume_algo']) == \
+        (2, 5, 1, 2.5)
+
+    # A second process sharing the file does not backfill again
+    other = _rollups(tmp_path / 'a.sqlite3', old + old)
+    assert other.summary(RECEIVER)['total']['links'] == 2
+
+
+def test_records_written_after_the_scan_are_counted_once(tmp_path):
+    now = datetime.now()
+    scanned = _record(now - timedelta(seconds=30), 'confirmed',
+                      txn_timestamp=now - timedelta(seconds=20))
+    worker = _rollups(tmp_path / 'a.sqlite3', [scanned])
+    worker.summary(RECEIVER)
+
+    # Stamped before the backfill but written after its scan
+    late = _record(now - timedelta(seconds=10), 'confirmed', amount_micro=2_000_000,
+                   txn_timestamp=now - timedelta(seconds=5))
+    worker.on_link_change('created', 'late', late)
+    worker.on_link_change('updated', 'late', late)
+    # The scanned link's own changes, flushed by a slower process
+    worker.on_link_change('created', '0', scanned)
+    worker.on_link_change('updated', '0', scanned)
+
+    total = worker.summary(RECEIVER)['total']
+    assert (total['links'], total['confirmed'], total['volume_algo']) == (2, 2, 3.0)
+
+
+def test_changes_from_every_process_are_shared(tmp_path):
+    api = _rollups(tmp_path / 'a.sqlite3')
+    indexer = _rollups(tmp_path / 'a.sqlite3')
+    api.summary(RECEIVER)
+
+    api.on_link_change('created', 'x', _record(datetime.now()))
+    api.on_link_change('clicked', 'x', {'receiver': RECEIVER})
+    api.on_link_change('clicked', 'x', None)
+    indexer.on_link_change('updated', 'x', {
+        'status': 'confirmed', 'txid': 'TX', 'txn_timestamp': datetime.now().isoformat(),
+        'receiver': RECEIVER, 'amount_micro': 1_500_000})
+    indexer.flush()
+
+    summary = api.summary(RECEIVER)
+    for period in ('total', 'today', 'last_24h'):
+        assert summary[period] == {'links': 1, 'clicks': 1, 'confirmed': 1,
+                                   'conversion': 1.0, 'volume_algo': 1.5}
+    assert api.summary('S' * 58)['total']['links'] == 0
+
+    everyone = api.series(86400, datetime.now().timestamp() - 86400, datetime.now().timestamp())
+    assert [bucket['links'] for bucket in everyone] == [1]
+
+
+def test_old_buckets_are_pruned(tmp_path):
+    now = datetime.now()
+    rollups = AnalyticsRollups(str(tmp_path / 'a.sqlite3'), source=lambda: [
+        ('x', _record(now - timedelta(days=10)))], hourly_retention=24, daily_retention=30)
+
+    series = rollups.series(3600, (now - timedelta(days=11)).timestamp(), now.timestamp())
+    assert series == []
+    daily = rollups.series(86400, (now - timedelta(days=11)).timestamp(), now.timestamp())
+    assert [bucket['links'] for bucket in daily] == [1]
+    assert rollups.summary(RECEIVER)['total']['links'] == 1
@@ -0,0 +1,79 @@
+"""Link lifecycle: expire -> archive -> restore, on both storage engines"""
+
+import time
+
+import pytest
+
+from backend.database import links
+from backend.database.archive import LinkArchive
+from backend.database.log_store import LinkLogStore
+from backend.database.sqlite_store import LinkSQLiteStore
+
+RECEIVER = 'R' * 58
+
+
+@pytest.fixture(params=['log', 'sqlite'])
+def store(request, tmp_path, monkeypatch):
+    if request.param == 'log':
+        store = LinkLogStore(str(tmp_path / 'links.log'), fsync='off')
+    else:
+        store = LinkSQLiteStore(str(tmp_path / 'links.sqlite3'))
+    archive = LinkArchive(str(tmp_path / 'archive'))
+    monkeypatch.setattr(links, '_store', store)
+    monkeypatch.setattr(links, '_archive', archive)
+    monkeypatch.setattr(links, 'ARCHIVE_AFTER', 0)
+    links._cache.clear()
+    yield store
+    links.flush_click_counts()
+    links._cache.clear()
+    store.close()
+    archive.close()
+
+
+def test_expiring_links_expire_and_refuse_payment(store):
+    expiring = links.create_link(1_000_000, RECEIVER, expires_in=0.01)['link_id']
+    open_link = links.create_link(1_000_000, RECEIVER, expires_in=3600)['link_id']
+    forever = links.create_link(1_000_000, RECEIVER)['link_id']
+    time.sleep(0.02)
+
+    # Past expires_at is enough, before the reaper gets to it
+    assert links.is_expired(links.get_link(expiring))
+    assert links.expire_due_links() == [expiring]
+    assert links.expire_due_links() == []
+
+    assert links.get_link(expiring)['status'] == 'expired'
+    assert links.get_link(open_link)['status'] == 'unused'
+    assert not links.is_expired(links.get_link(forever))
+
+
+def test_closed_links_move_to_the_archive_and_back(store):
+    expired = links.create_link(1_000_000, RECEIVER, expires_in=0.01)['link_id']
+    paid = links.create_link(2_000_000, RECEIVER)['link_id']
+    unused = links.create_link(3_000_000, RECEIVER)['link_id']
+    time.sleep(0.02)
+    links.expire_due_links()
+    links.update_link_status(paid, 'confirmed', 'T' * 52)
+    links.increment_click_count(paid, RECEIVER)
+    links.flush_click_counts()
+    paid_record = links.get_link(paid)
+
+    assert links.archive_closed_links() == 2
+    assert links.archive_closed_links() == 0
+
+    # Gone from the live store, still found by link_id
+    assert store.get(paid) is None and store.get(expired) is None
+    assert store.get(unused) is not None
+    assert links.get_link(paid) == paid_record
+    assert links.get_link(expired)['status'] == 'expired'
+    assert set(links.list_links()) == {unused}
+    assert set(links.list_links(include_archived=True)) == {expired, paid, unused}
+
+    # Paid after it expired: the archived link comes back to life
+    links.update_link_status(expired, 'confirmed', 'U' * 52)
+    restored = store.get(expired)
+    assert restored['status'] == 'confirmed' and restored['txid'] == 'U' * 52
+    assert links.get_link(expired) == restored
+
+    assert links.delete_link(paid)
+    assert links.get_link(paid) is None
+    assert paid not in links.list_links(include_archived=True)
@@ -0,0 +1,38 @@
+"""Cached link reads and changes made by other workers"""
+
+import pytest
+
+from backend.database import links
+from backend.database.log_store import LinkLogStore
+
+RECEIVER = 'R' * 58
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = LinkLogStore(str(tmp_path / 'links.log'), fsync='off')
+    monkeypatch.setattr(links, '_store', store)
+    links._cache.clear()
+    yield store
+    links.flush_click_counts()
+    links._cache.clear()
+    store.close()
+
+
+def test_payment_check_reads_open_links_from_the_store(store):
+    link_id = links.create_link(1_000_000, RECEIVER)['link_id']
+    assert links.get_link(link_id)['status'] == 'unused'
+
+    # Confirmed by another worker: this process's cache is not told
+    store.update(link_id, {'status': 'confirmed', 'txid': 'T' * 52})
+    assert links.get_link(link_id)['status'] == 'unused'
+    assert links.get_link_for_payment(link_id)['status'] == 'confirmed'
+
+
+def test_closed_links_are_answered_from_the_cache(store, monkeypatch):
+    link_id = links.create_link(1_000_000, RECEIVER)['link_id']
+    links.update_link_status(link_id, 'confirmed', 'T' * 52)
+    assert links.get_link(link_id)['status'] == 'confirmed'
+
+    monkeypatch.setattr(links, 'load_link', lambda link_id: pytest.fail('store read'))
+    assert links.get_link_for_payment(link_id)['status'] == 'confirmed'
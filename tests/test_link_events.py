@@ -0,0 +1,66 @@
+"""Link event hub: fan-out and changes made by other processes"""
+
+from backend.utils.link_events import LinkEventHub, status_event
+
+
+class _Store:
+    """Stands in for the shared store another process writes to"""
+
+    def __init__(self, **links):
+        self.links = links
+
+    def load(self, link_id):
+        link = self.links.get(link_id)
+        return dict(link) if link else None
+
+
+def test_in_process_change_reaches_every_watcher():
+    hub = LinkEventHub()
+    first, second = [], []
+    hub.watch('abc', first.append)
+    hub.watch('abc', second.append)
+
+    hub.on_link_change('updated', 'abc', {'status': 'confirmed', 'txid': 'TX'})
+    hub.on_link_change('clicked', 'abc', None)
+
+    assert first == second == [status_event('abc', 'confirmed', 'TX')]
+
+
+def test_poll_publishes_changes_from_other_processes():
+    store = _Store(abc={'status': 'unused', 'txid': None})
+    hub = LinkEventHub(store.load, poll_interval=3600)
+    seen = []
+    hub.watch('abc', seen.append)
+
+    # Still open: the watcher already showed 'pending'
+    hub.poll_once()
+    assert seen == []
+
+    store.links['abc'] = {'status': 'confirmed', 'txid': 'TX'}
+    hub.poll_once()
+    hub.poll_once()
+    assert seen == [status_event('abc', 'confirmed', 'TX')]
+
+
+def test_poll_skips_what_was_published_in_process():
+    store = _Store(abc={'status': 'expired', 'txid': None})
+    hub = LinkEventHub(store.load, poll_interval=3600)
+    seen = []
+    hub.watch('abc', seen.append)
+
+    hub.on_link_change('updated', 'abc', {'status': 'expired'})
+    hub.poll_once()
+    store.links.clear()
+    hub.poll_once()
+
+    assert [event['status'] for event in seen] == ['expired', 'deleted']
+
+
+def test_unwatched_links_are_not_read():
+    reads = []
+    hub = LinkEventHub(lambda link_id: reads.append(link_id), poll_interval=3600)
+    hub.watch('abc', print)
+    hub.unwatch('abc', print)
+
+    hub.poll_once()
+    assert reads == [] and hub.watcher_count() == 0
@@ -0,0 +1,37 @@
+"""Time-ordered link IDs"""
+
+import time
+
+from backend.database.link_ids import (
+    ALPHABET, ID_LENGTH, RANDOM_BITS, LinkIdGenerator, created_ms
+)
+
+
+def _value(link_id):
+    value = 0
+    for char in link_id:
+        value = (value << 5) | ALPHABET.index(char)
+    return value
+
+
+def test_ids_are_ordered_and_carry_their_time():
+    generator = LinkIdGenerator()
+    before = time.time() * 1000
+    ids = [generator.next() for _ in range(5000)]
+
+    assert all(len(i) == ID_LENGTH and set(i) <= set(ALPHABET) for i in ids)
+    assert ids == sorted(ids) and len(set(ids)) == len(ids)
+    assert before - 1 <= created_ms(ids[0]) <= created_ms(ids[-1]) <= time.time() * 1000 + 1000
+
+
+def test_same_millisecond_ids_are_not_consecutive():
+    generator = LinkIdGenerator()
+    values = [_value(generator.next()) for _ in range(2000)]
+    gaps = [b - a for a, b in zip(values, values[1:])]
+    assert sum(gap == 1 for gap in gaps) < len(gaps) // 100
+    assert len({value & ((1 << RANDOM_BITS) - 1) for value in values}) > 1000
+
+
+def test_older_ids_have_no_time():
+    assert created_ms('abc123xy') is None
+    assert created_ms('ABCDEFGHIJKL') is None
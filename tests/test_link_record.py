@@ -0,0 +1,97 @@
+"""ALGO amounts and the binary link record format"""
+
+import json
+from datetime import datetime
+
+import pytest
+from algosdk import account
+
+from backend.database.link_record import (
+    JSON_RECORD, decode_record, encode_record, index_fields, peek_index_fields
+)
+from backend.utils.amounts import MAX_MICROALGOS, algo_to_micro, micro_to_algo
+
+RECEIVER = account.generate_account()[1]
+TXID = 'A' * 51 + 'Q'
+
+
+def _record(**changes):
+    record = {
+        'amount_micro': 1_500_000,
+        'receiver': RECEIVER,
+        'description': 'Coffee ☕',
+        'created': datetime(2026, 10, 1, 12, 30, 15, 123456).isoformat(),
+        'status': 'unused',
+        'txid': None,
+        'txn_timestamp': None,
+        'click_count': 0,
+        'expires_at': None,
+    }
+    record.update(changes)
+    return record
+
+
+@pytest.mark.parametrize('amount, micro', [
+    (1, 1_000_000), (1.5, 1_500_000), (0.1, 100_000), (0.000001, 1),
+    (2.675, 2_675_000), (10_000_000_000, MAX_MICROALGOS),
+])
+def test_algo_to_micro_is_exact(amount, micro):
+    assert algo_to_micro(amount) == micro
+    assert micro_to_algo(micro) == amount
+
+
+@pytest.mark.parametrize('amount', [None, '1.5', True, float('nan'), float('inf'), 0.0000001])
+def test_algo_to_micro_rejects(amount):
+    with pytest.raises(ValueError):
+        algo_to_micro(amount)
+
+
+@pytest.mark.parametrize('record', [
+    _record(),
+    _record(status='confirmed', txid=TXID, click_count=7,
+            txn_timestamp=datetime(2026, 10, 1, 12, 31).isoformat()),
+    _record(status='expired', expires_at=datetime(2026, 10, 2).isoformat()),
+    _record(receiver='PLACEHOLDER', txid='not-a-hash'),
+])
+def test_compact_round_trip(record):
+    data = encode_record(record)
+    assert data[0] != JSON_RECORD
+    assert decode_record(data) == record
+    assert peek_index_fields(data) == index_fields(record)
+
+
+@pytest.mark.parametrize('record', [
+    _record(status='refunded'),
+    _record(extra='field'),
+    _record(amount_micro=2 ** 63),
+    _record(click_count=-2 ** 64),
+    _record(created='2026-10-01 12:30'),
+])
+def test_records_outside_the_schema_are_kept_as_json(record):
+    data = encode_record(record)
+    assert data[0] == JSON_RECORD
+    assert decode_record(data) == record
+    assert peek_index_fields(data) == index_fields(record)
+
+
+def test_legacy_records_are_upgraded():
+    legacy = {key: value for key, value in _record().items()
+              if key not in ('amount_micro', 'expires_at')}
+    legacy['amount'] = 0.3
+    data = bytes([JSON_RECORD]) + json.dumps(legacy).encode()
+    assert decode_record(data) == _record(amount_micro=300_000)
+
+
+@pytest.mark.parametrize('body, error', [
+    ({'amount_micro': MAX_MICROALGOS + 1}, 'Amount exceeds the total ALGO supply'),
+    ({'amount': 1e300}, 'Amount exceeds the total ALGO supply'),
+    ({'amount_micro': 2 ** 80}, 'Amount exceeds the total ALGO supply'),
+    ({'amount': -1}, 'Amount must be positive'),
+    ({'amount_micro': 1.5}, 'amount_micro must be an integer'),
+])
+def test_create_link_rejects_bad_amounts(body, error):
+    from backend.app import app
+    response = app.test_client().post('/api/create-link', json={
+        'receiver_address': RECEIVER, **body})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == error
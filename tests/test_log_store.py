@@ -0,0 +1,178 @@
+"""Append-only log store: recovery, compaction and sharing between processes"""
+
+import json
+import os
+import zlib
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.database.log_store import LinkLogStore
+
+
+def _record(n, status='unused', receiver='R' * 58, **changes):
+    record = {
+        'amount_micro': 1_000_000 + n,
+        'receiver': receiver,
+        'description': f'link {n}',
+        'created': (datetime(2026, 10, 1) + timedelta(seconds=n)).isoformat(),
+        'status': status,
+        'txid': None,
+        'txn_timestamp': None,
+        'click_count': 0,
+        'expires_at': None,
+    }
+    record.update(changes)
+    return record
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return str(tmp_path / 'links.log')
+
+
+def _open(path, **kwargs):
+    return LinkLogStore(path, fsync='off', **kwargs)
+
+
+def test_writes_survive_reopening(log_path):
+    store = _open(log_path)
+    for n in range(20):
+        store.put(f'id{n}', _record(n))
+    store.update('id3', {'status': 'confirmed', 'txid': 'TX'})
+    store.increment('id4', 'click_count', 5)
+    store.delete('id5')
+    store.close()
+
+    reopened = _open(log_path)
+    assert len(reopened) == 19
+    assert reopened.get('id3') == _record(3, status='confirmed', txid='TX')
+    assert reopened.get('id4')['click_count'] == 5
+    assert reopened.get('id5') is None
+    assert [link_id for link_id, _ in reopened.page(status='confirmed')] == ['id3']
+
+
+def test_torn_tail_is_dropped_and_cut_off(log_path):
+    store = _open(log_path)
+    store.put('a', _record(1))
+    store.put('b', _record(2))
+    store.close()
+    size = os.path.getsize(log_path)
+
+    # Crash halfway through appending a third record
+    with open(log_path, 'rb') as f:
+        data = f.read()
+    with open(log_path, 'ab') as f:
+        f.write(data[:len(data) // 3])
+
+    recovered = _open(log_path)
+    assert recovered.all() == {'a': _record(1), 'b': _record(2)}
+    recovered.put('c', _record(3))
+    recovered.close()
+
+    assert os.path.getsize(log_path) > size
+    assert set(_open(log_path).all()) == {'a', 'b', 'c'}
+
+
+def test_damaged_record_in_the_middle_is_skipped(log_path):
+    store = _open(log_path)
+    for n in range(3):
+        store.put(f'id{n}', _record(n))
+    store.close()
+
+    with open(log_path, 'r+b') as f:
+        data = bytearray(f.read())
+        middle = len(data) // 2
+        data[middle] ^= 0xff
+        f.seek(0)
+        f.write(data)
+
+    recovered = _open(log_path)
+    assert recovered.get('id0') == _record(0)
+    assert recovered.get('id1') is None
+    assert recovered.get('id2') == _record(2)
+
+
+def test_compaction_keeps_latest_records(log_path):
+    store = _open(log_path)
+    for n in range(50):
+        store.put(f'id{n}', _record(n))
+    for n in range(50):
+        store.increment(f'id{n}', 'click_count', n)
+    for n in range(0, 50, 2):
+        store.delete(f'id{n}')
+    expected = store.all()
+    before = os.path.getsize(log_path)
+
+    store.compact()
+
+    assert os.path.getsize(log_path) < before
+    assert store.all() == expected
+    assert _open(log_path).all() == expected
+    assert not os.path.exists(log_path + '.compact')
+
+
+def test_second_process_follows_appends_and_compaction(log_path):
+    writer = _open(log_path)
+    reader = _open(log_path)
+    writer.put('a', _record(1))
+    assert reader.get('a') == _record(1)
+
+    writer.update('a', {'status': 'confirmed'})
+    writer.put('b', _record(2))
+    writer.compact()
+    assert reader.get('a')['status'] == 'confirmed'
+    assert set(reader.all()) == {'a', 'b'}
+
+    # The reader appends to the compacted file, not the old one
+    reader.put('c', _record(3))
+    assert set(writer.all()) == {'a', 'b', 'c'}
+
+
+def test_text_records_from_older_logs_are_read_and_rewritten(log_path):
+    legacy = _record(1)
+    legacy['amount'] = 2.5
+    del legacy['amount_micro'], legacy['expires_at']
+    lines = []
+    for payload in ({'op': 'put', 'id': 'old', 'rec': legacy},
+                    {'op': 'put', 'id': 'gone', 'rec': _record(2)},
+                    {'op': 'del', 'id': 'gone'}):
+        body = json.dumps(payload).encode()
+        lines.append(b'%08x %s\n' % (zlib.crc32(body), body))
+    with open(log_path, 'wb') as f:
+        f.write(b''.join(lines))
+
+    store = _open(log_path)
+    assert store.all() == {'old': _record(1, amount_micro=2_500_000)}
+    store.compact()
+    with open(log_path, 'rb') as f:
+        assert f.read(1) == b'\xa7'
+    assert _open(log_path).all() == {'old': _record(1, amount_micro=2_500_000)}
+
+
+def test_legacy_json_is_imported_once(log_path, tmp_path):
+    legacy_path = str(tmp_path / 'links_database.json')
+    with open(legacy_path, 'w') as f:
+        json.dump({'abc123xy': _record(1)}, f)
+
+    store = _open(log_path, legacy_json_path=legacy_path)
+    assert store.get('abc123xy') == _record(1)
+    store.delete('abc123xy')
+    store.close()
+
+    # Emptied later: the marker keeps the JSON file from coming back
+    assert len(_open(log_path, legacy_json_path=legacy_path)) == 0
+
+
+def test_expire_due_only_touches_due_unused_links(log_path):
+    store = _open(log_path)
+    store.put('due', _record(1, expires_at='2026-10-01T10:00:00'))
+    store.put('later', _record(2, expires_at='2026-10-03T10:00:00'))
+    store.put('paid', _record(3, status='confirmed', expires_at='2026-10-01T09:00:00'))
+    store.put('never', _record(4))
+
+    assert store.next_expiry() == '2026-10-01T10:00:00'
+    assert store.expire_due('2026-10-02T00:00:00') == ['due']
+    assert store.get('due')['status'] == 'expired'
+    assert store.next_expiry() == '2026-10-03T10:00:00'
+    assert _open(log_path).next_expiry() == '2026-10-03T10:00:00'
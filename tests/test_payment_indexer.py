@@ -0,0 +1,163 @@
+"""Payment indexer: matching block payments to open links"""
+
+import base64
+from datetime import datetime, timedelta
+
+import msgpack
+from algosdk import account
+from algosdk.encoding import decode_address
+from algosdk.transaction import PaymentTxn, SuggestedParams
+
+from backend.utils import payment_indexer
+from backend.utils.payment_indexer import OpenLinkIndex, PaymentIndexer
+
+GENESIS_ID = 'testnet-v1.0'
+GENESIS_HASH = base64.b64encode(bytes(range(32))).decode()
+
+
+def _address():
+    return account.generate_account()[1]
+
+
+def _link(link_id, receiver, amount_micro, created, status='unused'):
+    return {'link_id': link_id, 'receiver': receiver, 'amount_micro': amount_micro,
+            'created': created, 'status': status}
+
+
+def _payment(sender, receiver, amount_micro, note=b''):
+    params = SuggestedParams(fee=1000, first=100, last=1100, gh=GENESIS_HASH,
+                             gen=GENESIS_ID, flat_fee=True)
+    return PaymentTxn(sender, params, receiver, amount_micro, note=note or None)
+
+
+def _block(*payments):
+    """A decoded block holding payments, in algod's block encoding"""
+    txns = []
+    for txn in payments:
+        fields = txn.dictify()
+        # Blocks leave out the genesis fields; 'hgi' says gen was signed
+        del fields['gh'], fields['gen']
+        txns.append({'txn': fields, 'hgi': True})
+    return {'block': {'gh': base64.b64decode(GENESIS_HASH), 'gen': GENESIS_ID, 'txns': txns}}
+
+
+class _Recorder:
+    def __init__(self):
+        self.confirmed = []
+
+    def __call__(self, link_id, status, txid):
+        self.confirmed.append((link_id, status, txid))
+
+
+def _indexer(monkeypatch, links):
+    def fake_page(status=None, created_from=None, after=None, limit=50):
+        assert status == 'unused'
+        return [link for link in links if link['status'] == 'unused'
+                and (created_from is None or link['created'] >= created_from)], None
+
+    monkeypatch.setattr(payment_indexer, 'list_links_page', fake_page)
+    recorder = _Recorder()
+    indexer = PaymentIndexer(checkpoint_file='/dev/null', confirm=recorder)
+    indexer.refresh_open_links()
+    return indexer, recorder
+
+
+def test_match_by_receiver_and_amount():
+    receiver, other = _address(), _address()
+    index = OpenLinkIndex()
+    index.load([_link('a', receiver, 1_500_000, '2026-10-01T00:00:00'),
+                _link('b', other, 1_500_000, '2026-10-01T00:00:01')])
+
+    assert index.match(decode_address(receiver), 1_499_999) is None
+    assert index.match(decode_address(receiver), 1_500_000) == 'a'
+    assert index.match(decode_address(receiver), 1_500_000) is None
+    assert index.match(decode_address(other), 1_500_000) == 'b'
+    assert len(index) == 0
+
+
+def test_equal_amount_links_match_oldest_first():
+    receiver = _address()
+    index = OpenLinkIndex()
+    index.load([_link('newer', receiver, 2_000_000, '2026-10-02T00:00:00'),
+                _link('older', receiver, 2_000_000, '2026-10-01T00:00:00'),
+                _link('paid', receiver, 2_000_000, '2026-09-30T00:00:00', status='confirmed')])
+
+    key = decode_address(receiver)
+    assert [index.match(key, 2_000_000) for _ in range(3)] == ['older', 'newer', None]
+
+
+def test_remove_and_placeholder_receivers():
+    receiver = _address()
+    index = OpenLinkIndex()
+    index.add('a', receiver, 1)
+    index.add('b', receiver, 1)
+    index.add('placeholder', 'NOT-AN-ADDRESS', 1)
+    index.remove('a')
+
+    assert len(index) == 1
+    assert index.match(decode_address(receiver), 1) == 'b'
+
+
+def test_process_block_confirms_with_onchain_txid(monkeypatch):
+    sender, receiver = _address(), _address()
+    indexer, recorder = _indexer(monkeypatch, [
+        _link('first', receiver, 1_000_000, '2026-10-01T00:00:00'),
+        _link('second', receiver, 1_000_000, '2026-10-01T00:00:05'),
+        _link('other', receiver, 3_000_000, '2026-10-01T00:00:10'),
+    ])
+    # Two payments of the same amount: one link each, oldest first
+    payments = [_payment(sender, receiver, 1_000_000, note=b'1'),
+                _payment(sender, receiver, 1_000_000, note=b'2'),
+                _payment(sender, _address(), 3_000_000)]
+
+    indexer.process_block(101, _block(*payments))
+
+    assert recorder.confirmed == [('first', 'confirmed', payments[0].get_txid()),
+                                  ('second', 'confirmed', payments[1].get_txid())]
+    assert indexer.confirmed == 2
+    assert indexer.last_round == 101
+
+
+def test_ambiguous_payment_beyond_open_links_is_ignored(monkeypatch):
+    sender, receiver = _address(), _address()
+    indexer, recorder = _indexer(monkeypatch, [
+        _link('only', receiver, 500_000, '2026-10-01T00:00:00'),
+    ])
+
+    indexer.process_block(7, _block(_payment(sender, receiver, 500_000, note=b'a'),
+                                    _payment(sender, receiver, 500_000, note=b'b')))
+
+    assert [link_id for link_id, _, _ in recorder.confirmed] == ['only']
+
+
+class _Algod:
+    """Serves one block, already committed"""
+
+    def __init__(self, round_num, block):
+        self.round_num = round_num
+        self.block = msgpack.packb(block, use_bin_type=True)
+
+    def status(self):
+        return {'last-round': self.round_num}
+
+    def block_info(self, round_num, response_format):
+        assert round_num == self.round_num and response_format == 'msgpack'
+        return self.block
+
+
+def test_link_created_and_paid_between_refreshes_is_matched(monkeypatch):
+    sender, receiver = _address(), _address()
+    links = [_link('old', receiver, 1_000_000, '2026-10-01T00:00:00')]
+    indexer, recorder = _indexer(monkeypatch, links)
+
+    # Created by an API worker after the last full reload, paid in the next block
+    created = (datetime.now() - timedelta(seconds=1)).isoformat()
+    links.append(_link('new', receiver, 4_200_000, created))
+    payment = _payment(sender, receiver, 4_200_000)
+    indexer.client = _Algod(41, _block(payment))
+    indexer.last_round = 40
+
+    indexer.index_next_block()
+
+    assert recorder.confirmed == [('new', 'confirmed', payment.get_txid())]
+    assert indexer.last_round == 41
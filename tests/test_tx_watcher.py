@@ -0,0 +1,132 @@
+"""Confirmation watcher: every pending txid is re-checked each round"""
+
+import asyncio
+import base64
+import threading
+import time
+
+import pytest
+
+from backend.utils import tx_watcher
+from backend.utils.tx_watcher import ConfirmationWatcher
+
+EXPIRED = {'status': 'not_found',
+           'error': 'Transaction not confirmed within its validity window'}
+
+
+def _txid(n):
+    return base64.b32encode(b'TX%06d' % n + bytes(24)).decode().rstrip('=')
+
+
+class _Chain:
+    """Stands in for algod: a block every few ms, txids confirm at a given round"""
+
+    def __init__(self, confirm_at):
+        self.round = 100
+        self.confirm_at = confirm_at
+        self.checks = {}
+        self.on_check = None
+        self.lock = threading.Lock()
+
+    def status(self):
+        return {'last-round': self.round}
+
+    def next_block(self, round_num):
+        with self.lock:
+            self.round = max(self.round, round_num) + 1
+            return {'last-round': self.round}
+
+    def status_after_block(self, round_num):
+        time.sleep(0.005)
+        return self.next_block(round_num)
+
+    def pending_transaction_info(self, txid):
+        if self.on_check:
+            self.on_check(txid)
+        with self.lock:
+            self.checks[txid] = self.checks.get(txid, 0) + 1
+            confirmed = self.confirm_at.get(txid)
+            if confirmed is None or self.round < confirmed:
+                # Still in the pool
+                return {}
+        return {'confirmed-round': confirmed,
+                'txn': {'txn': {'amt': 1, 'snd': 'SENDER', 'rcv': 'RECEIVER'}}}
+
+
+class _AsyncChain:
+    def __init__(self, chain):
+        self.chain = chain
+
+    async def status(self):
+        return self.chain.status()
+
+    async def status_after_block(self, round_num):
+        await asyncio.sleep(0.005)
+        return self.chain.next_block(round_num)
+
+    async def pending_transaction_info(self, txid):
+        return self.chain.pending_transaction_info(txid)
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    monkeypatch.setattr(tx_watcher, 'MAX_PENDING_ROUNDS', 20)
+    # The first txid confirms a few rounds in, the second never does
+    return _Chain({_txid(0): 105})
+
+
+def _keep_registering(watcher, chain):
+    """Have every check of the newest txid register another one"""
+    newest = [1]
+
+    def register_next(txid):
+        if txid == _txid(newest[0]):
+            newest[0] += 1
+            watcher.register(_txid(newest[0]))
+
+    chain.on_check = register_next
+    watcher.register(_txid(0))
+    watcher.register(_txid(1))
+
+
+def _settled(watcher):
+    return (watcher.lookup(_txid(0))['status'] == 'confirmed'
+            and watcher.lookup(_txid(1)) == EXPIRED)
+
+
+def _wait(watcher):
+    deadline = time.monotonic() + 5
+    while not _settled(watcher) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def _check_older_txids(watcher, chain):
+    assert watcher.lookup(_txid(0))['status'] == 'confirmed'
+    assert watcher.lookup(_txid(1)) == EXPIRED
+    assert chain.checks[_txid(1)] > 1
+    assert chain.round > 120
+
+
+def test_new_registrations_do_not_hold_up_rounds(chain):
+    watcher = ConfirmationWatcher(chain)
+    # There is always a new txid waiting when a check finishes
+    _keep_registering(watcher, chain)
+    _wait(watcher)
+    watcher.stop()
+
+    _check_older_txids(watcher, chain)
+
+
+def test_async_loop_keeps_following_rounds(chain):
+    watcher = ConfirmationWatcher(chain)
+
+    async def main():
+        task = watcher.start_async(_AsyncChain(chain))
+        _keep_registering(watcher, chain)
+        deadline = time.monotonic() + 5
+        while not _settled(watcher) and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(main())
+    _check_older_txids(watcher, chain)
@@ -0,0 +1,52 @@
+"""Fast payment builder vs algosdk's PaymentTxn"""
+
+import base64
+
+import pytest
+from algosdk import account, encoding
+from algosdk.transaction import PaymentTxn, SuggestedParams
+
+from backend.utils.txn_builder import build_payment
+
+GENESIS_HASH = base64.b64encode(bytes(range(32))).decode()
+
+
+def _params(fee, flat_fee, min_fee=None):
+    return SuggestedParams(fee=fee, first=1000, last=2000, gh=GENESIS_HASH,
+                           gen='testnet-v1.0', flat_fee=flat_fee, min_fee=min_fee)
+
+
+@pytest.mark.parametrize('fee, flat_fee, min_fee', [
+    (1000, True, None),      # flat fee
+    (0, True, None),         # flat zero fee
+    (0, False, 1000),        # per-byte fee of zero: minimum fee
+    (0, False, None),        # no min_fee in params: algosdk's default
+    (5, False, 1000),        # per-byte fee above the minimum
+    (1, False, 1000),        # per-byte fee below the minimum
+    (25, False, 1000),
+])
+@pytest.mark.parametrize('note', [None, b'checkout abc123xy'])
+def test_matches_algosdk(fee, flat_fee, min_fee, note):
+    sender, receiver = account.generate_account()[1], account.generate_account()[1]
+    sp = _params(fee, flat_fee, min_fee)
+
+    built = build_payment(sender, receiver, 1_234_567, note=note, params=sp)
+    expected = PaymentTxn(sender, sp, receiver, 1_234_567, note=note)
+
+    assert built['fee'] == expected.fee
+    assert built['unsigned_txn'] == encoding.msgpack_encode(expected)
+    assert built['transaction_id'] == expected.get_txid()
+    assert (built['first_valid'], built['last_valid']) == (1000, 2000)
+
+
+def test_per_byte_fee_counts_signature():
+    sender, receiver = account.generate_account()[1], account.generate_account()[1]
+    built = build_payment(sender, receiver, 1, params=_params(5, False, 1000))
+    # A signed payment is well over 200 bytes, so 5 per byte beats the minimum
+    assert built['fee'] > 1000
+
+
+def test_invalid_address():
+    with pytest.raises(ValueError):
+        build_payment('NOT-AN-ADDRESS', account.generate_account()[1], 1,
+                      params=_params(1000, True))
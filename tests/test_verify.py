@@ -0,0 +1,52 @@
+"""/api/verify answers: a pending txid reports 503 only while the caller's node is down"""
+
+import asyncio
+
+from backend import asgi
+from backend.routes.verify import verify_response
+from backend.utils.algod_pool import CircuitBreaker
+from backend.utils.algorand import algod_client
+from backend.utils.async_algod import get_async_algod_client
+
+TXID = 'A' * 52
+PENDING = {'status': 'pending'}
+
+
+def _open_breaker():
+    breaker = CircuitBreaker(threshold=1, cooldown=60)
+    breaker.record_failure()
+    return breaker
+
+
+def test_pending_uses_the_given_breaker():
+    body, status = verify_response(TXID, PENDING, CircuitBreaker())
+    assert (status, body['status']) == (200, 'pending')
+
+    body, status = verify_response(TXID, PENDING, _open_breaker())
+    assert (status, body['status']) == (503, 'unavailable')
+
+
+class _Watcher:
+    def lookup(self, txid):
+        return PENDING
+
+
+async def _no_register(txid, link_id):
+    return None
+
+
+def test_asgi_verify_reads_the_async_clients_breaker(monkeypatch):
+    monkeypatch.setattr(asgi, 'watcher', _Watcher())
+    monkeypatch.setattr(asgi, '_register', _no_register)
+    client = get_async_algod_client()
+
+    # Only the threaded client is down: the ASGI watcher still follows rounds
+    monkeypatch.setattr(algod_client, 'breaker', _open_breaker())
+    monkeypatch.setattr(client, 'breaker', CircuitBreaker())
+    body, status = asyncio.run(asgi._verify({}, {'txid': TXID}))
+    assert (status, body['status']) == (200, 'pending')
+
+    monkeypatch.setattr(algod_client, 'breaker', CircuitBreaker())
+    monkeypatch.setattr(client, 'breaker', _open_breaker())
+    body, status = asyncio.run(asgi._verify({}, {'txid': TXID}))
+    assert (status, body['status']) == (503, 'unavailable')